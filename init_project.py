@@ -44,9 +44,8 @@ def init_project():
         "data/materials.json": [],
         "data/tags.json": [],
         "data/collections.json": [],
-        "data/costs.json": {
+        "data/costs_summary.json": {
             "total_cost": 0.0,
-            "sessions": [],
             "last_updated": None
         }
     }
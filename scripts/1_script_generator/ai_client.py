@@ -9,17 +9,19 @@ import time
 import re
 from typing import Dict, Any, Optional
 import requests
+from requests.adapters import HTTPAdapter
 
 
 class AIClient:
     """AI API客户端"""
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], session: Optional[requests.Session] = None):
         """
         初始化AI客户端
 
         Args:
             config: AI配置字典，包含provider, model, api_key等
+            session: 共享的HTTP会话（可选，默认创建带连接池的会话）
         """
         self.provider = config.get('provider', 'openai')
         self.model = config.get('model', 'gpt-4')
@@ -31,6 +33,18 @@ class AIClient:
         if not self.api_key:
             raise ValueError("API key未设置！请在config/settings.json中配置api_key，或设置环境变量OPENAI_API_KEY")
 
+        # 复用HTTP连接：多次调用（如逐章节语义分析）共享同一个TLS连接池
+        self.session = session or self._create_session(config.get('http_pool_size', 16))
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        """创建带连接池的HTTP会话（线程安全地用于并发请求）"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """
         调用AI生成内容
@@ -80,7 +94,7 @@ class AIClient:
                 base = self.base_url.rstrip('/')
                 url = f'{base}/chat/completions'
 
-                response = requests.post(
+                response = self.session.post(
                     url,
                     headers=headers,
                     json=data,
@@ -145,7 +159,7 @@ class AIClient:
             data['system'] = system_prompt
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 f'{self.base_url}/messages',
                 headers=headers,
                 json=data,
@@ -191,7 +205,7 @@ class AIClient:
                 base = self.base_url.rstrip('/')
                 url = f'{base}/chat/completions'
 
-                response = requests.post(
+                response = self.session.post(
                     url,
                     headers=headers,
                     json=data,
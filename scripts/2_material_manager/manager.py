@@ -6,11 +6,18 @@
 import json
 import os
 import shutil
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import hashlib
 from pathlib import Path
 
+# 可选：orjson 加速JSON读写
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class MaterialManager:
     """素材管理器"""
@@ -311,6 +318,42 @@ class MaterialManager:
         print(f"❌ 未找到素材: {material_id}")
         return False
 
+    def bulk_update_tags(self, pairs: List[Tuple[str, List[str]]]) -> int:
+        """
+        批量更新多个素材的标签(只读写一次素材库)
+
+        Args:
+            pairs: [(素材ID, 新标签列表), ...]
+
+        Returns:
+            实际更新的素材数量
+        """
+        if not pairs:
+            return 0
+
+        materials = self._load_json(self.materials_db)
+        index = {material['id']: material for material in materials}
+
+        now = datetime.now().isoformat()
+        all_tags = []
+        updated = 0
+        for material_id, tags in pairs:
+            material = index.get(material_id)
+            if material is None:
+                print(f"❌ 未找到素材: {material_id}")
+                continue
+
+            material['tags'] = tags
+            material['updated_at'] = now
+            all_tags.extend(tags)
+            updated += 1
+
+        if updated:
+            self._save_json(self.materials_db, materials)
+            self._update_tags(all_tags)
+
+        return updated
+
     def delete_material(self, material_id: str, delete_file: bool = True) -> bool:
         """
         删除素材
@@ -480,12 +523,21 @@ class MaterialManager:
     def _load_json(self, file_path: str) -> List:
         """加载JSON文件"""
         try:
+            if ORJSON_AVAILABLE:
+                with open(file_path, 'rb') as f:
+                    return orjson.loads(f.read())
             with open(file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
             return []
 
     def _save_json(self, file_path: str, data: List):
-        """保存JSON文件"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        """保存JSON文件(先写临时文件再替换,中途中断不会损坏原文件)"""
+        tmp_path = f"{file_path}.tmp"
+        if ORJSON_AVAILABLE:
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, file_path)
@@ -6,6 +6,7 @@ V5.1 新增: 四级智能获取策略 (本地 → Pexels → Unsplash → DALL-E
 
 import json
 from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import sys
 import os
 
@@ -66,6 +67,9 @@ class MaterialRecommender:
         # V5.6: 初始化AI语义匹配器（延迟加载）
         self._ai_semantic_matcher = None
 
+        # 批量推荐期间共享的本地素材检索快照（见recommend_for_script_sections）
+        self._search_index = None
+
         # 智能获取配置
         self.smart_fetch_config = self.config.get('smart_material_fetch', {
             'enable': True,
@@ -157,7 +161,7 @@ class MaterialRecommender:
         print("   📁 [1/4] 搜索本地素材库...")
         keywords = material_requirements.get('keywords', [])
         for keyword in keywords:
-            materials = self.material_manager.search_materials(keyword)
+            materials = self._search_local(keyword)
             recommendations.extend(materials)
 
         # 基于标签搜索
@@ -234,6 +238,76 @@ class MaterialRecommender:
 
         return final_materials[:limit]
 
+    def recommend_for_script_sections(
+        self,
+        sections: List[Dict[str, Any]],
+        limit: int = 5,
+        enable_smart_fetch: bool = True
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        批量为多个章节推荐素材
+
+        素材库只加载一次并预建检索文本，所有章节的本地关键词搜索共享该快照
+        （逐章节调用时每个关键词都会重新读取materials.json）；
+        外部获取和AI匹配等网络请求仍按章节并发执行。
+
+        Args:
+            sections: 脚本章节列表
+            limit: 每个章节的推荐数量
+            enable_smart_fetch: 是否启用智能获取 (从外部API)
+
+        Returns:
+            章节索引 -> 推荐素材列表
+        """
+        results: Dict[int, List[Dict[str, Any]]] = {}
+        if not sections:
+            return results
+
+        self._search_index = [
+            (
+                material,
+                material.get('name', '').lower(),
+                material.get('description', '').lower(),
+                ' '.join(material.get('tags', [])).lower()
+            )
+            for material in self.material_manager.list_materials()
+        ]
+
+        try:
+            with ThreadPoolExecutor(max_workers=min(8, len(sections))) as executor:
+                future_to_idx = {
+                    executor.submit(
+                        self.recommend_for_script_section,
+                        section,
+                        limit,
+                        enable_smart_fetch
+                    ): i
+                    for i, section in enumerate(sections)
+                }
+                for future in as_completed(future_to_idx):
+                    idx = future_to_idx[future]
+                    try:
+                        results[idx] = future.result()
+                    except Exception as e:
+                        print(f"   ⚠️  章节 {idx + 1} 素材推荐失败: {str(e)}")
+                        results[idx] = []
+        finally:
+            self._search_index = None
+
+        return results
+
+    def _search_local(self, keyword: str) -> List[Dict[str, Any]]:
+        """本地素材关键词搜索（批量推荐期间使用共享快照）"""
+        if self._search_index is None:
+            return self.material_manager.search_materials(keyword)
+
+        keyword_lower = keyword.lower()
+        return [
+            material
+            for material, name, description, tags in self._search_index
+            if keyword_lower in name or keyword_lower in description or keyword_lower in tags
+        ]
+
     def _apply_ai_review_and_generation(
         self,
         materials: List[Dict[str, Any]],
@@ -931,10 +1005,11 @@ class MaterialRecommender:
                           'algorithm', 'software']
         }
 
-        # 匹配分类
+        # 匹配分类(按整词匹配,'base'不会命中'baseline')
+        word_set = set(words)
         matched_categories = []
         for category, keywords_list in category_keywords.items():
-            if any(kw in keyword.lower() for kw in keywords_list):
+            if any(kw.lower() in word_set for kw in keywords_list):
                 matched_categories.append(category)
                 tags.append(category)
 
@@ -952,7 +1027,7 @@ class MaterialRecommender:
         }
 
         for feature, feature_keywords in visual_keywords.items():
-            if any(kw in keyword.lower() for kw in feature_keywords):
+            if any(kw in word_set for kw in feature_keywords):
                 tags.append(feature)
 
         # 6. 添加类型标签
@@ -1310,7 +1385,7 @@ class MaterialRecommender:
         candidates = []
 
         for keyword in all_keywords:
-            materials = self.material_manager.search_materials(keyword)
+            materials = self._search_local(keyword)
             candidates.extend(materials)
 
         # 去重
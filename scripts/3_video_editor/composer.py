@@ -55,6 +55,10 @@ class VideoComposer:
         self.default_image_duration = self.video_config.get('default_image_duration', 5.0)
         self.default_transition_duration = self.video_config.get('transition_duration', 1.0)
 
+        # 目标画布尺寸在一次合成中不会变化，预先算好（NVENC 需要偶数分辨率）
+        self._target_w, self._target_h = self._resolve_target_dims()
+        self._target_ratio = self._target_w / self._target_h if self._target_h else 0.0
+
     def compose_from_script(
         self,
         script: Dict[str, Any],
@@ -304,6 +308,15 @@ class VideoComposer:
         style['margin'] = '100'
         return style
 
+    def _get_subtitle_style(self) -> Dict[str, str]:
+        subtitle_cfg = self.config.get('subtitle', {})
+        return {
+            'fontsize': str(subtitle_cfg.get('font_size', 48)),
+            'fontcolor': subtitle_cfg.get('font_color', 'white'),
+            'bg_color': subtitle_cfg.get('bg_color', 'black'),
+            'bg_opacity': str(subtitle_cfg.get('bg_opacity', 0.5)),
+        }
+
     def _build_audio_plan(
         self,
         *,
@@ -366,6 +379,13 @@ class VideoComposer:
             width, height = resolution
         return width, height
 
+    def _resolve_target_dims(self) -> Tuple[int, int]:
+        """目标画布尺寸（向下取偶数）；未配置分辨率时返回 (0, 0)"""
+        width, height = self._get_resolution()
+        if not width or not height:
+            return 0, 0
+        return max(2, (int(width) // 2) * 2), max(2, (int(height) // 2) * 2)
+
     def _render_with_ffmpeg(
         self,
         *,
@@ -455,13 +475,7 @@ class VideoComposer:
         # 构建字幕样式配置
         subtitle_style = None
         if subtitle_file and os.path.exists(subtitle_file):
-            subtitle_cfg = self.config.get('subtitle', {})
-            subtitle_style = {
-                'fontsize': str(subtitle_cfg.get('font_size', 48)),
-                'fontcolor': subtitle_cfg.get('font_color', 'white'),
-                'bg_color': subtitle_cfg.get('bg_color', 'black'),
-                'bg_opacity': str(subtitle_cfg.get('bg_opacity', 0.5)),
-            }
+            subtitle_style = self._get_subtitle_style()
             print(f"   📝 使用字幕文件: {os.path.basename(subtitle_file)}")
 
         render_kwargs = dict(
@@ -867,13 +881,7 @@ class VideoComposer:
     def _ensure_target_resolution(self, clip):
         """确保剪辑符合目标分辨率（Letterbox 适配）。"""
         try:
-            resolution = self.video_config.get('resolution', {'width': 1920, 'height': 1080})
-            if isinstance(resolution, dict):
-                target_width = int(resolution.get('width', 1920))
-                target_height = int(resolution.get('height', 1080))
-            else:
-                target_width, target_height = resolution
-
+            target_width, target_height = self._target_w, self._target_h
             if not target_width or not target_height:
                 return clip
 
@@ -881,17 +889,12 @@ class VideoComposer:
             if clip_width is None or clip_height is None:
                 return clip
 
-            # NVENC 需要偶数分辨率
-            target_width = max(2, (target_width // 2) * 2)
-            target_height = max(2, (target_height // 2) * 2)
-
             if clip_width == target_width and clip_height == target_height:
                 return clip
 
             clip_ratio = clip_width / clip_height
-            target_ratio = target_width / target_height
 
-            if clip_ratio >= target_ratio:
+            if clip_ratio >= self._target_ratio:
                 new_width = target_width
                 new_height = int(round(target_width / clip_ratio))
             else:
@@ -904,6 +907,10 @@ class VideoComposer:
 
             resized_clip = clip.resized(new_size=(new_width, new_height))
 
+            # 宽高比一致（如16:9素材→16:9输出）时缩放后已铺满画布，无需黑边合成
+            if new_width == target_width and new_height == target_height:
+                return resized_clip
+
             return resized_clip.with_background_color(
                 size=(target_width, target_height),
                 color=(0, 0, 0),
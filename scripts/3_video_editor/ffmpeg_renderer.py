@@ -145,6 +145,135 @@ class FFmpegTimelineRenderer:
 
         self._run(cmd, description="FFmpeg rendering")
 
+    def render_audio(self, plan: AudioPlan, output_path: str) -> None:
+        """Render an audio plan to a standalone file in one FFmpeg call.
+
+        TTS segments sharing codec/sample rate/channels are read through the
+        concat demuxer; mixed formats go through the concat filter. BGM is
+        looped, trimmed and mixed in the same invocation.
+        """
+        tts_list_path = None
+        if plan.use_tts and len(plan.tts_inputs) > 1:
+            formats = {self._probe_audio_format(path) for path in plan.tts_inputs}
+            if len(formats) == 1 and None not in formats:
+                tts_list_path = os.path.splitext(output_path)[0] + "_list.txt"
+                self._write_concat_list(plan.tts_inputs, tts_list_path)
+
+        inputs, audio_label, filters = self._build_audio_filters(0, plan, tts_list_path)
+        if not audio_label:
+            raise ValueError("audio plan has no inputs")
+
+        cmd: List[str] = [
+            self.ffmpeg_path,
+            "-y",
+            "-loglevel",
+            "error",
+        ]
+        for input_args in inputs:
+            cmd.extend(input_args)
+        cmd.extend([
+            "-filter_complex",
+            ";".join(filters),
+            "-map",
+            audio_label,
+            "-c:a",
+            plan.audio_codec,
+            output_path,
+        ])
+
+        self._run(cmd, description="FFmpeg audio render")
+
+    def concat_segments(self, segment_paths: Sequence[str], output_path: str) -> None:
+        """Join pre-rendered segments with the concat demuxer (stream copy).
+
+        All segments must share codec, resolution, fps and pixel format;
+        no frame is decoded or re-encoded.
+        """
+        if not segment_paths:
+            raise ValueError("segment_paths must not be empty")
+
+        list_path = os.path.splitext(output_path)[0] + "_list.txt"
+        self._write_concat_list(segment_paths, list_path)
+
+        cmd = [
+            self.ffmpeg_path,
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-c",
+            "copy",
+            output_path,
+        ]
+        self._run(cmd, description="FFmpeg concat")
+
+    def mux_audio(
+        self,
+        video_path: str,
+        output_path: str,
+        *,
+        audio_plan: Optional[AudioPlan],
+        video_args: Optional[List[str]] = None,
+        video_input_args: Optional[List[str]] = None,
+        reencode: bool = False,
+        subtitle_file: Optional[str] = None,
+        subtitle_style: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Attach the audio plan (TTS concat + BGM amix) to a rendered video.
+
+        The video stream is copied untouched unless ``reencode`` is set or
+        subtitles have to be burned in, in which case ``video_args`` selects
+        the encoder. ``video_input_args`` are placed before the video input
+        (e.g. ``-hwaccel cuda``).
+        """
+        audio_inputs, audio_label, audio_filters = self._build_audio_filters(1, audio_plan)
+
+        filters: List[str] = []
+        video_label = "0:v"
+        if subtitle_file and os.path.exists(subtitle_file):
+            filters.append(
+                self._build_subtitle_filter("[0:v]", subtitle_file, subtitle_style)
+            )
+            video_label = "[vfinal]"
+        filters.extend(audio_filters)
+
+        cmd: List[str] = [
+            self.ffmpeg_path,
+            "-y",
+            "-loglevel",
+            "error",
+        ]
+        if video_input_args:
+            cmd.extend(video_input_args)
+        cmd.extend(["-i", video_path])
+        for input_args in audio_inputs:
+            cmd.extend(input_args)
+
+        if filters:
+            cmd.extend(["-filter_complex", ";".join(filters)])
+
+        cmd.extend(["-map", video_label])
+        if video_label == "0:v" and not reencode:
+            cmd.extend(["-c:v", "copy"])
+        else:
+            cmd.extend(video_args or ["-c:v", "libx264", "-pix_fmt", "yuv420p"])
+
+        if audio_plan and audio_label:
+            cmd.extend(["-map", audio_label, "-c:a", audio_plan.audio_codec])
+
+        cmd.extend([
+            "-movflags",
+            "+faststart",
+            output_path,
+        ])
+
+        self._run(cmd, description="FFmpeg audio mux")
+
     # ------------------------------------------------------------------
     # Video filter construction
     # ------------------------------------------------------------------
@@ -266,7 +395,13 @@ class FFmpegTimelineRenderer:
         self,
         video_input_count: int,
         plan: Optional[AudioPlan],
+        tts_list_path: Optional[str] = None,
     ) -> Tuple[List[List[str]], str, List[str]]:
+        """Build audio inputs/filters for a plan.
+
+        When ``tts_list_path`` is given, the TTS segments are read through a
+        single concat-demuxer input instead of one input per segment.
+        """
         if plan is None:
             return [], "", []
 
@@ -276,18 +411,26 @@ class FFmpegTimelineRenderer:
 
         tts_labels: List[str] = []
 
-        for idx, audio_path in enumerate(plan.tts_inputs):
-            inputs.append(["-i", audio_path])
-            tts_labels.append(f"[{video_input_count + idx}:a]")
+        if tts_list_path:
+            inputs.append(["-f", "concat", "-safe", "0", "-i", tts_list_path])
+            tts_labels.append(f"[{video_input_count}:a]")
+        else:
+            for idx, audio_path in enumerate(plan.tts_inputs):
+                inputs.append(["-i", audio_path])
+                tts_labels.append(f"[{video_input_count + idx}:a]")
 
         bgm_label: Optional[str] = None
         if plan.bgm_path:
             inputs.append(["-stream_loop", "-1", "-i", plan.bgm_path])
-            bgm_label = f"[{video_input_count + len(plan.tts_inputs)}:a]"
+            bgm_label = f"[{video_input_count + len(tts_labels)}:a]"
 
         current_label: Optional[str] = None
 
-        if plan.use_tts and tts_labels:
+        if plan.use_tts and tts_list_path:
+            concat_label = "[atts]"
+            filters.append(f"{tts_labels[0]}asetpts=N/SR/TB{concat_label}")
+            current_label = concat_label
+        elif plan.use_tts and tts_labels:
             concat_label = "[atts]"
             filters.append(
                 "".join(tts_labels)
@@ -424,6 +567,44 @@ class FFmpegTimelineRenderer:
         escaped = escaped.replace("\r", "")  # 移除回车符
         return escaped
 
+    @staticmethod
+    def _write_concat_list(paths: Sequence[str], list_path: str) -> None:
+        """Write a concat-demuxer list file (single quotes escaped)."""
+        with open(list_path, "w", encoding="utf-8") as list_file:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                list_file.write(f"file '{escaped}'\n")
+
+    def _probe_audio_format(self, path: str) -> Optional[Tuple[str, int, int]]:
+        """Return (codec, sample_rate, channels) of the first audio stream."""
+        cmd = [
+            self.ffprobe_path,
+            "-v",
+            "error",
+            "-select_streams",
+            "a:0",
+            "-show_streams",
+            "-of",
+            "json",
+            path,
+        ]
+        try:
+            result = subprocess.run(
+                cmd,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+            stream = json.loads(result.stdout)["streams"][0]
+            return (
+                stream["codec_name"],
+                int(stream["sample_rate"]),
+                int(stream["channels"]),
+            )
+        except (OSError, subprocess.CalledProcessError, ValueError, KeyError, IndexError):
+            return None
+
     def _is_duration_sufficient(self, path: str, target: float) -> bool:
         duration = self._probe_duration(path)
         if duration is None:
@@ -3,8 +3,104 @@ Ken Burns效果生成器
 为静态图片添加动态缩放和平移效果
 """
 
+import math
+from functools import lru_cache
 from typing import Dict, Any
 
+import numpy as np
+
+# 可选：OpenCV的warpAffine（SIMD实现），不可用时回退到Pillow
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ImportError:
+    CV2_AVAILABLE = False
+
+
+@lru_cache(maxsize=256)
+def _cached_movement_type(energy: float, emotion: str) -> str:
+    """按 (能量, 情绪) 缓存运动类型决策（能量需先离散到0.1精度）"""
+    if energy >= 8.5:
+        return 'zoom_in_fast'      # 极高能量 → 快速放大
+    elif energy >= 7.5:
+        return 'diagonal_zoom'     # 高能量 → 对角缩放
+    elif energy >= 6.0:
+        return 'zoom_in_slow'      # 中高能量 → 缓慢放大
+    elif energy >= 4.5:
+        return 'pan_left'          # 中等能量 → 水平平移
+    elif emotion == 'satisfied':
+        return 'zoom_out'          # 满足感 → 拉远
+    elif energy >= 3.0:
+        return 'pan_right'         # 低能量 → 缓慢平移
+    else:
+        return 'static'            # 极低能量 → 静止
+
+
+def _affine_table(movement_type: str, width: int, height: int, num_frames: int) -> np.ndarray:
+    """
+    一次性预计算整段运动的仿射矩阵表
+
+    每帧的变换为"绕画面中心缩放s倍后平移(tx, ty)"，表中存储的是
+    输出像素 → 源像素的逆映射，可直接用于warpAffine(WARP_INVERSE_MAP)
+    和PIL的Image.transform(AFFINE)。
+
+    Returns:
+        (num_frames, 2, 3) float32数组；static返回None
+    """
+    progress = np.linspace(0.0, 1.0, num_frames, dtype=np.float64)
+    zero = np.zeros_like(progress)
+
+    if movement_type == 'zoom_in_slow':
+        scale, tx, ty = 1.0 + 0.15 * progress, zero, zero
+    elif movement_type == 'zoom_in_fast':
+        scale, tx, ty = 1.0 + 0.3 * progress, zero, zero
+    elif movement_type == 'zoom_out':
+        scale, tx, ty = 1.2 - 0.2 * progress, zero, zero
+    elif movement_type in ('pan_left', 'pan_right'):
+        # 先放大1.15倍避免边缘黑边，再在±4%宽度内平移
+        sign = -1.0 if movement_type == 'pan_left' else 1.0
+        scale = np.full_like(progress, 1.15)
+        tx, ty = sign * width * 0.08 * (progress - 0.5), zero
+    elif movement_type == 'diagonal_zoom':
+        # 放大的同时向左上移动（从右下角放大）
+        scale = 1.0 + 0.2 * progress
+        tx, ty = -width * 0.05 * progress, -height * 0.05 * progress
+    else:
+        return None
+
+    cx, cy = width / 2.0, height / 2.0
+    inv = 1.0 / scale
+
+    table = np.zeros((num_frames, 2, 3), dtype=np.float32)
+    table[:, 0, 0] = inv
+    table[:, 1, 1] = inv
+    table[:, 0, 2] = cx - (cx + tx) * inv
+    table[:, 1, 2] = cy - (cy + ty) * inv
+    return table
+
+
+def _warp_frame(src: np.ndarray, affine: np.ndarray) -> np.ndarray:
+    """按逆映射矩阵对整帧做双线性仿射变换"""
+    # ColorClip等生成的帧可能是int64，warpAffine/Pillow都需要uint8
+    if src.dtype != np.uint8:
+        src = src.astype(np.uint8)
+    height, width = src.shape[:2]
+
+    if CV2_AVAILABLE:
+        return cv2.warpAffine(
+            src, affine, (width, height),
+            flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP
+        )
+
+    from PIL import Image
+
+    return np.asarray(Image.fromarray(src).transform(
+        (width, height),
+        Image.AFFINE,
+        data=tuple(float(v) for v in affine.reshape(-1)),
+        resample=Image.BILINEAR
+    ))
+
 
 class KenBurnsGenerator:
     """Ken Burns效果生成器"""
@@ -52,6 +148,48 @@ class KenBurnsGenerator:
         else:  # static
             return clip
 
+    def apply_ken_burns_fast(
+        self,
+        frame: np.ndarray,
+        analysis: Dict[str, Any],
+        duration: float,
+        fps: int = 24
+    ):
+        """
+        Ken Burns快速路径：直接作用于已解码的RGB帧
+
+        整段运动的仿射矩阵在这里一次算好，逐帧只做一次warpAffine，
+        不再经过moviepy的resize/position回调。
+
+        Args:
+            frame: 已适配目标分辨率的RGB数组 (H, W, 3)
+            analysis: 章节语义分析结果
+            duration: 持续时长
+            fps: 输出帧率（决定矩阵表长度）
+
+        Returns:
+            moviepy VideoClip对象
+        """
+        from moviepy import ImageClip, VideoClip
+
+        movement_type = self._decide_movement_type(
+            analysis['energy_level'],
+            analysis['emotion']
+        )
+
+        height, width = frame.shape[:2]
+        num_frames = max(1, int(math.ceil(duration * fps)))
+        table = _affine_table(movement_type, width, height, num_frames)
+
+        if table is None:
+            return ImageClip(frame).with_duration(duration)
+
+        def frame_function(t):
+            index = min(max(int(t * fps), 0), num_frames - 1)
+            return _warp_frame(frame, table[index])
+
+        return VideoClip(frame_function=frame_function, duration=duration)
+
     def _decide_movement_type(self, energy: float, emotion: str) -> str:
         """
         决定运动类型
@@ -70,20 +208,7 @@ class KenBurnsGenerator:
         Returns:
             运动类型
         """
-        if energy >= 8.5:
-            return 'zoom_in_fast'      # 极高能量 → 快速放大
-        elif energy >= 7.5:
-            return 'diagonal_zoom'     # 高能量 → 对角缩放
-        elif energy >= 6.0:
-            return 'zoom_in_slow'      # 中高能量 → 缓慢放大
-        elif energy >= 4.5:
-            return 'pan_left'          # 中等能量 → 水平平移
-        elif emotion == 'satisfied':
-            return 'zoom_out'          # 满足感 → 拉远
-        elif energy >= 3.0:
-            return 'pan_right'         # 低能量 → 缓慢平移
-        else:
-            return 'static'            # 极低能量 → 静止
+        return _cached_movement_type(round(energy * 10) / 10, emotion)
 
     def _zoom_in_slow(self, clip, duration: float):
         """
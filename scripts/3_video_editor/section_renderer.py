@@ -0,0 +1,369 @@
+"""
+章节渲染器
+多进程worker调用的章节渲染函数（素材解码、Letterbox、Ken Burns、转场、写中间文件）
+
+本模块通过常规import加载（而不是spec_from_file_location），
+函数可按 section_renderer.<名字> 被pickle，ProcessPoolExecutor能在worker中找到它们。
+worker只接收可pickle的参数（路径、分析字典、配置字典），不持有composer实例。
+"""
+
+import os
+import hashlib
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+# 可选：Numba JIT加速静态图片的缩放+Letterbox
+# 内核以cache=True编译,结果缓存在__pycache__;目录不可写时可用NUMBA_CACHE_DIR指定缓存位置
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+from ken_burns import KenBurnsGenerator
+from transitions import TransitionLibrary
+
+# FFmpeg路径由editor模块写入环境变量，worker进程启动时继承
+try:
+    from moviepy import ImageClip, VideoFileClip, ColorClip
+    from moviepy.video.fx import Loop
+    MOVIEPY_AVAILABLE = True
+except ImportError:
+    MOVIEPY_AVAILABLE = False
+
+# worker只接收可pickle的参数（路径、分析字典、配置字典），不持有composer实例
+
+_IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp'})
+_VIDEO_EXTS = frozenset({'.mp4', '.avi', '.mov', '.mkv'})
+
+
+def _material_kind(material_path: str) -> str:
+    """按扩展名判断素材类型：image / video / other"""
+    ext = os.path.splitext(material_path)[1].lower()
+    if ext in _IMAGE_EXTS:
+        return 'image'
+    if ext in _VIDEO_EXTS:
+        return 'video'
+    return 'other'
+
+
+@lru_cache(maxsize=64)
+def _letterbox_geometry(
+    src_w: int,
+    src_h: int,
+    tgt_w: int,
+    tgt_h: int
+) -> Tuple[int, int, int, int]:
+    """
+    计算Letterbox几何参数（同一次渲染中素材宽高比种类很少，结果可复用）
+
+    Returns:
+        (缩放后宽, 缩放后高, 画布宽, 画布高)，均为偶数（NVENC要求）
+    """
+    canvas_w = max(2, (tgt_w // 2) * 2)
+    canvas_h = max(2, (tgt_h // 2) * 2)
+
+    if src_w == canvas_w and src_h == canvas_h:
+        return src_w, src_h, canvas_w, canvas_h
+
+    src_ratio = src_w / src_h
+    if src_ratio >= canvas_w / canvas_h:
+        new_w = canvas_w
+        new_h = int(round(canvas_w / src_ratio))
+    else:
+        new_h = canvas_h
+        new_w = int(round(canvas_h * src_ratio))
+
+    return max(2, (new_w // 2) * 2), max(2, (new_h // 2) * 2), canvas_w, canvas_h
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _resize_and_letterbox_numba(src, new_w, new_h, canvas_w, canvas_h):
+        """双线性缩放src到(new_w, new_h)并居中贴到黑色画布上"""
+        out = np.zeros((canvas_h, canvas_w, 3), dtype=np.uint8)
+        src_h, src_w = src.shape[0], src.shape[1]
+        off_x = (canvas_w - new_w) // 2
+        off_y = (canvas_h - new_h) // 2
+        scale_x = src_w / new_w
+        scale_y = src_h / new_h
+
+        for y in numba.prange(new_h):
+            fy = min(max((y + 0.5) * scale_y - 0.5, 0.0), src_h - 1.0)
+            y0 = int(fy)
+            y1 = min(y0 + 1, src_h - 1)
+            wy = fy - y0
+            for x in range(new_w):
+                fx = min(max((x + 0.5) * scale_x - 0.5, 0.0), src_w - 1.0)
+                x0 = int(fx)
+                x1 = min(x0 + 1, src_w - 1)
+                wx = fx - x0
+                for c in range(3):
+                    top = src[y0, x0, c] * (1.0 - wx) + src[y0, x1, c] * wx
+                    bottom = src[y1, x0, c] * (1.0 - wx) + src[y1, x1, c] * wx
+                    out[off_y + y, off_x + x, c] = np.uint8(top * (1.0 - wy) + bottom * wy + 0.5)
+
+        return out
+
+
+def _load_letterboxed_image(material_path: str, target_size) -> np.ndarray:
+    """
+    解码图片并一次性缩放+Letterbox到目标分辨率
+
+    静态图片的每一帧都相同，预先算好RGB数组后直接构造ImageClip，
+    不必经过moviepy的resized/with_background_color逐帧管线。
+    """
+    from PIL import Image
+
+    with Image.open(material_path) as img:
+        src = np.asarray(img.convert('RGB'))
+
+    src_h, src_w = src.shape[:2]
+    new_w, new_h, canvas_w, canvas_h = _letterbox_geometry(
+        src_w, src_h, int(target_size[0]), int(target_size[1])
+    )
+
+    if NUMBA_AVAILABLE:
+        return _resize_and_letterbox_numba(src, new_w, new_h, canvas_w, canvas_h)
+
+    if (new_w, new_h) != (src_w, src_h):
+        src = np.asarray(Image.fromarray(src).resize((new_w, new_h), Image.BILINEAR))
+    out = np.zeros((canvas_h, canvas_w, 3), dtype=np.uint8)
+    off_x = (canvas_w - new_w) // 2
+    off_y = (canvas_h - new_h) // 2
+    out[off_y:off_y + new_h, off_x:off_x + new_w] = src
+    return out
+
+
+def _probe_and_cache(
+    paths,
+    target_size
+) -> Tuple[List[shared_memory.SharedMemory], Dict[str, Tuple[str, Tuple[int, ...], str]]]:
+    """
+    预先解码所有图片素材并写入共享内存，供worker进程复用
+
+    同一张图片可能被多个章节选中，每个worker各自解码+缩放会重复读盘；
+    这里在父进程中只做一次，worker按名字attach即可。视频素材不缓存。
+
+    Returns:
+        (共享内存句柄列表（由调用方close+unlink）, {路径: (共享内存名, shape, dtype)})
+    """
+    handles = []
+    shared_frames = {}
+
+    for path in sorted(p for p in paths if p):
+        if _material_kind(path) != 'image' or not os.path.exists(path):
+            continue
+
+        try:
+            frame = _load_letterboxed_image(path, target_size)
+        except Exception as e:
+            print(f"   ⚠️  预解码素材失败: {os.path.basename(path)} ({e})")
+            continue
+
+        digest = hashlib.md5(path.encode('utf-8')).hexdigest()[:12]
+        shm = shared_memory.SharedMemory(
+            name=f"mat_{os.getpid()}_{digest}",
+            create=True,
+            size=frame.nbytes
+        )
+        np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)[:] = frame
+        handles.append(shm)
+        shared_frames[path] = (shm.name, frame.shape, frame.dtype.str)
+
+    return handles, shared_frames
+
+
+def _material_frame(
+    material_path: str,
+    target_size,
+    shared_frames: Optional[Dict[str, Tuple[str, Tuple[int, ...], str]]] = None
+) -> np.ndarray:
+    """获取已Letterbox的图片帧：优先从共享内存拷贝，否则现场解码"""
+    entry = (shared_frames or {}).get(material_path)
+    if entry is None:
+        return _load_letterboxed_image(material_path, target_size)
+
+    shm_name, shape, dtype = entry
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        frame = view.copy()
+        del view
+    finally:
+        shm.close()
+    return frame
+
+
+
+def _ensure_target_resolution(clip, target_size):
+    """确保剪辑符合目标分辨率（Letterbox 适配）。"""
+    try:
+        target_width, target_height = target_size
+        if not target_width or not target_height:
+            return clip
+
+        clip_width, clip_height = clip.size
+        if clip_width is None or clip_height is None:
+            return clip
+
+        new_width, new_height, target_width, target_height = _letterbox_geometry(
+            clip_width, clip_height, int(target_width), int(target_height)
+        )
+
+        if clip_width == target_width and clip_height == target_height:
+            return clip
+
+        resized_clip = clip.resized(new_size=(new_width, new_height))
+
+        # 宽高比一致（如16:9素材→16:9输出）时缩放后已铺满画布，无需黑边合成
+        if new_width == target_width and new_height == target_height:
+            return resized_clip
+
+        return resized_clip.with_background_color(
+            size=(target_width, target_height),
+            color=(0, 0, 0),
+            pos='center'
+        )
+    except Exception as e:
+        print(f"   ⚠️  调整分辨率失败: {e}")
+        return clip
+
+
+def _create_base_clip(
+    material_path: Optional[str],
+    duration: float,
+    target_size,
+    shared_frames: Optional[Dict[str, Tuple[str, Tuple[int, ...], str]]] = None
+):
+    """创建基础clip（已适配目标分辨率）"""
+    clip = None
+    if material_path and os.path.exists(material_path):
+        kind = _material_kind(material_path)
+        if kind == 'image':
+            # 图片已预先适配目标分辨率，无需再走_ensure_target_resolution
+            frame = _material_frame(material_path, target_size, shared_frames)
+            return ImageClip(frame).with_duration(duration)
+        elif kind == 'video':
+            video_clip = VideoFileClip(material_path)
+
+            # 移除音频（因为我们会使用TTS音频）
+            video_clip = video_clip.without_audio()
+
+            if video_clip.duration < duration:
+                clip = video_clip.with_effects([Loop(duration=duration)])
+            else:
+                clip = video_clip.subclipped(0, duration)
+        else:
+            print(f"   ⚠️  不支持的格式: {os.path.splitext(material_path)[1].lower()}")
+
+    if clip is None:
+        clip = ColorClip(size=tuple(target_size), color=(0, 0, 0), duration=duration)
+
+    return _ensure_target_resolution(clip, target_size)
+
+
+def _apply_transition(clip, transition: Dict[str, Any]):
+    """
+    应用转场效果到clip
+
+    TransitionLibrary的入场转场都直接作用于帧像素，不改变clip尺寸、不引入mask或位置动画：
+    章节既能单独写成中间文件，也能用chain方式直接首尾拼接。
+    效果与在黑色画布上合成一致（crossfade在无重叠拼接时即为从黑淡入）。
+    """
+    trans_type = transition['type']
+    duration = transition['duration']
+    params = transition.get('params', {})
+
+    if trans_type in ('fade', 'crossfade'):
+        return TransitionLibrary.fade_in(clip, duration)
+    elif trans_type == 'zoom_in':
+        return TransitionLibrary.zoom_in(clip, duration, params.get('zoom_ratio', 1.3))
+    elif trans_type == 'zoom_out':
+        return TransitionLibrary.zoom_out(clip, duration, params.get('zoom_ratio', 1.3))
+    elif trans_type == 'slide_left':
+        return TransitionLibrary.slide_in(clip, 'left', duration)
+    elif trans_type == 'slide_right':
+        return TransitionLibrary.slide_in(clip, 'right', duration)
+    else:  # hard_cut / 未知类型：无转场
+        return clip
+
+
+def _build_section_clip(
+    material_path: Optional[str],
+    duration: float,
+    analysis: Dict[str, Any],
+    transition: Optional[Dict[str, Any]],
+    cfg: Dict[str, Any],
+    ken_burns: KenBurnsGenerator
+):
+    """
+    构建单个章节的完整clip（基础素材 + Ken Burns + 转场）
+
+    Returns:
+        (clip, Ken Burns运动类型或None)
+    """
+    clip = None
+    movement_type = None
+    if cfg['ken_burns'] and material_path and os.path.exists(material_path):
+        if _material_kind(material_path) == 'image':
+            movement_type = ken_burns._decide_movement_type(
+                analysis['energy_level'],
+                analysis['emotion']
+            )
+            frame = _material_frame(material_path, cfg['size'], cfg.get('shared_frames'))
+            clip = ken_burns.apply_ken_burns_fast(frame, analysis, duration, cfg['fps'])
+
+    if clip is None:
+        clip = _create_base_clip(
+            material_path, duration, cfg['size'], cfg.get('shared_frames')
+        )
+
+    if transition is not None:
+        clip = _apply_transition(clip, transition)
+
+    return clip, movement_type
+
+
+def _render_section_to_tempfile(
+    index: int,
+    material_path: Optional[str],
+    duration: float,
+    analysis: Dict[str, Any],
+    transition: Optional[Dict[str, Any]],
+    cfg: Dict[str, Any],
+    tmpdir: str
+) -> str:
+    """
+    在worker进程中渲染单个章节为中间mp4
+
+    所有章节使用相同的编码参数（libx264/fps/yuv420p），
+    以便父进程用FFmpeg concat demuxer直接流复制拼接。
+    转场已由父进程决策（带缓存）后传入。
+
+    Returns:
+        中间文件路径
+    """
+    clip, _ = _build_section_clip(
+        material_path, duration, analysis, transition,
+        cfg, KenBurnsGenerator()
+    )
+
+    output_path = os.path.join(tmpdir, f"seg_{index:04d}.mp4")
+    try:
+        clip.write_videofile(
+            output_path,
+            fps=cfg['fps'],
+            codec='libx264',
+            preset='ultrafast',
+            ffmpeg_params=['-crf', '18'],
+            audio=False,
+            logger=None
+        )
+    finally:
+        clip.close()
+
+    return output_path
@@ -6,6 +6,7 @@ AI语义分析器
 import sys
 import os
 from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 # 导入AI客户端
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '1_script_generator'))
@@ -15,16 +16,23 @@ from ai_client import AIClient
 class SemanticAnalyzer:
     """章节语义分析器"""
 
-    def __init__(self, ai_client: Optional[AIClient] = None, use_ai: bool = True):
+    def __init__(
+        self,
+        ai_client: Optional[AIClient] = None,
+        use_ai: bool = True,
+        max_workers: int = 4
+    ):
         """
         初始化语义分析器
 
         Args:
             ai_client: AI客户端实例（可选）
             use_ai: 是否使用AI增强分析
+            max_workers: AI分析时的并发请求数
         """
         self.ai_client = ai_client
         self.use_ai = use_ai and ai_client is not None
+        self.max_workers = max(1, max_workers)
 
         # 章节类型特征库
         self.section_profiles = {
@@ -301,13 +309,15 @@ class SemanticAnalyzer:
         Returns:
             分析结果列表
         """
-        analyses = []
         for i, section in enumerate(sections, 1):
             print(f"   分析章节 {i}/{len(sections)}: {section.get('section_name', 'N/A')}")
-            analysis = self.analyze_section(section)
-            analyses.append(analysis)
 
-        return analyses
+        # 规则分析是纯本地计算，只有AI分析（网络请求）才值得并发
+        if not self.use_ai or len(sections) <= 1:
+            return [self.analyze_section(section) for section in sections]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(sections))) as executor:
+            return list(executor.map(self.analyze_section, sections))
 
 
 # 测试代码
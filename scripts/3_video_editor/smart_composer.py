@@ -8,8 +8,14 @@ import os
 import sys
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import multiprocessing
+import queue
+import shutil
 import threading
+import tempfile
+import hashlib
+from functools import partial
 
 # 导入基础合成器
 sys.path.insert(0, os.path.dirname(__file__))
@@ -19,13 +25,118 @@ from composer import VideoComposer
 from semantic_analyzer import SemanticAnalyzer
 from transition_engine import TransitionDecisionEngine
 from ken_burns import KenBurnsGenerator
-from transitions import TransitionLibrary
+from ffmpeg_renderer import AudioPlan, FFmpegRenderError, FFmpegTimelineRenderer
+
+# 章节渲染函数放在常规import的模块中，多进程worker才能按名字pickle
+from section_renderer import (
+    _apply_transition, _build_section_clip, _create_base_clip,
+    _ensure_target_resolution, _probe_and_cache, _render_section_to_tempfile
+)
+
+# moviepy在editor模块设置好FFmpeg路径之后再导入（composer已间接导入editor）
+try:
+    from moviepy import (
+        TextClip, CompositeVideoClip, concatenate_videoclips,
+        AudioFileClip, concatenate_audioclips, CompositeAudioClip
+    )
+    from moviepy.audio.fx import AudioLoop
+    from moviepy.video.tools.subtitles import SubtitlesClip
+    MOVIEPY_AVAILABLE = True
+except ImportError:
+    MOVIEPY_AVAILABLE = False
 
 # 导入AI客户端
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '1_script_generator'))
 from ai_client import AIClient
 
 
+# ========== 章节转场决策与旁白字幕（父进程使用） ==========
+
+_TRANSITION_ENGINE = TransitionDecisionEngine()
+
+
+def _decide_transition(
+    prev_analysis: Dict[str, Any],
+    curr_analysis: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    决定两个章节之间的转场
+
+    决策引擎按章节特征元组缓存结果，脚本中重复出现的章节组合只计算一次；
+    每次返回新字典，调用方可自由修改。
+    """
+    return _TRANSITION_ENGINE.decide_transition(prev_analysis, curr_analysis)
+
+
+def _render_pool_context():
+    """
+    多进程章节渲染的进程启动方式
+
+    父进程预解码图片时已经启动了Numba的并行线程池（TBB），fork出worker后
+    父进程会在退出时卡住；forkserver/spawn从干净的进程启动worker，不继承这些线程。
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _format_srt_time(seconds: float) -> str:
+    """格式化SRT时间码 (HH:MM:SS,mmm)"""
+    millis = int(round(max(seconds, 0.0) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
+
+
+def _write_narration_srt(
+    sections: List[Dict[str, Any]],
+    durations: List[float],
+    output_path: str
+) -> Optional[str]:
+    """
+    按章节时长把旁白生成为一个SRT文件
+
+    整个视频只需一次字幕渲染，不再为每个章节单独创建TextClip再合成。
+    换行规则与VideoComposer._create_text_clip一致（每行30字符，最多3行）。
+
+    Returns:
+        SRT文件路径；没有任何旁白时返回None
+    """
+    max_chars_per_line = 30
+    entries = []
+    start = 0.0
+    for section, duration in zip(sections, durations):
+        end = start + duration
+        narration = (section.get('narration') or '').strip()
+        if narration:
+            lines = []
+            current_line = ""
+            for word in narration.split():
+                if len(current_line + word) <= max_chars_per_line:
+                    current_line += word + " "
+                else:
+                    if current_line:
+                        lines.append(current_line.strip())
+                    current_line = word + " "
+            if current_line:
+                lines.append(current_line.strip())
+
+            entries.append(
+                f"{len(entries) + 1}\n"
+                f"{_format_srt_time(start)} --> {_format_srt_time(end)}\n"
+                + "\n".join(lines[:3]) + "\n\n"
+            )
+        start = end
+
+    if not entries:
+        return None
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write("".join(entries))
+    return output_path
+
+
+
 class SmartVideoComposer(VideoComposer):
     """智能视频合成器（增强版）"""
 
@@ -57,11 +168,20 @@ class SmartVideoComposer(VideoComposer):
         # 初始化智能组件
         self.semantic_analyzer = SemanticAnalyzer(
             ai_client=ai_client,
-            use_ai=self.use_ai_analysis
+            use_ai=self.use_ai_analysis,
+            max_workers=self.smart_config.get('ai_analysis_workers', 4)
         )
-        self.transition_engine = TransitionDecisionEngine()
         self.ken_burns = KenBurnsGenerator()
 
+        # 多进程章节渲染（失败时回退到进程内合成）
+        self.parallel_render = self.smart_config.get('parallel_render', True)
+        self.render_workers = self.smart_config.get('render_workers') or os.cpu_count() or 1
+        self.renderer = FFmpegTimelineRenderer(
+            ffmpeg_path=os.environ.get('IMAGEIO_FFMPEG_EXE', 'ffmpeg'),
+            ffprobe_path=os.environ.get('FFPROBE_BINARY', 'ffprobe'),
+        )
+        self._subtitle_text_factory = None
+
         print(f"\n🧠 智能动效系统: "
               f"{'已启用' if self.smart_enabled else '已禁用'}")
         if self.smart_enabled:
@@ -127,16 +247,9 @@ class SmartVideoComposer(VideoComposer):
     ) -> str:
         """智能合成核心逻辑"""
 
-        if not self.editor.moviepy_available:
+        if not MOVIEPY_AVAILABLE:
             raise ImportError("moviepy未安装。请运行: pip install moviepy")
 
-        from moviepy import (
-            ImageClip, VideoFileClip, TextClip, CompositeVideoClip,
-            concatenate_videoclips, AudioFileClip
-        )
-        from moviepy.video.fx import Loop, FadeIn, CrossFadeIn
-        from moviepy.audio.fx import AudioLoop
-
         print(f"\n🎬 智能视频合成: {script.get('title', '未命名')}")
         print("=" * 70)
 
@@ -144,6 +257,31 @@ class SmartVideoComposer(VideoComposer):
         if not sections:
             raise ValueError("脚本没有章节内容")
 
+        # 预先获取所有素材路径（如果需要自动选择，素材选择只依赖章节内容）
+        section_materials = {}
+        if auto_select_materials:
+            print("🔍 批量推荐素材...")
+            recommendations = self.recommender.recommend_for_script_sections(
+                sections,
+                limit=3
+            )
+            for idx in range(len(sections)):
+                section_materials[idx] = self._select_material(
+                    recommendations.get(idx, [])
+                )
+
+        # 相同脚本+素材+配置已经生成过视频时直接复用
+        cache_key = None
+        if self.smart_config.get('reuse_cached_output', True):
+            cache_key = self._compose_cache_key(
+                script, section_materials, tts_metadata_path, subtitle_file, use_tts_audio
+            )
+            cached_path = self._reuse_cached_output(
+                cache_key, self._resolve_output_path(script, output_filename)
+            )
+            if cached_path:
+                return cached_path
+
         # ========== 第1步: AI语义分析 ==========
         print(f"\n🧠 AI语义分析中...")
         analyses = self.semantic_analyzer.analyze_all_sections(sections)
@@ -156,120 +294,99 @@ class SmartVideoComposer(VideoComposer):
                   f"情绪{analysis['emotion']}")
 
         # ========== 第2步: 🚀 并行生成带动效的clips ==========
-        all_clips = []
-        temp_clips = []
-        audio_clips = []
-
-        print(f"\n🎨 🚀 并行生成视频片段...")
-
-        # 预先获取所有素材路径（如果需要自动选择）
-        section_materials = {}
-        if auto_select_materials:
-            print("🔍 批量推荐素材...")
-            with ThreadPoolExecutor(max_workers=min(8, len(sections))) as executor:
-                future_to_idx = {
-                    executor.submit(self._get_material_for_section, section, True): i
-                    for i, section in enumerate(sections)
-                }
-                for future in as_completed(future_to_idx):
-                    idx = future_to_idx[future]
-                    try:
-                        section_materials[idx] = future.result()
-                    except Exception as e:
-                        print(f"   ⚠️  章节 {idx + 1} 素材推荐失败: {str(e)}")
-                        section_materials[idx] = None
-
-        # 并行创建视频片段（保留顺序）
-        clips_dict = {}
-        lock = threading.Lock()
-
-        def create_smart_clip(i, section, analysis):
-            """智能创建单个视频片段"""
-            section_name = section.get('section_name', f'章节{i+1}')
-
-            # 2.1 获取素材
-            if auto_select_materials:
-                material_path = section_materials.get(i)
-            else:
-                material_path = None
-
-            duration = self._parse_duration(
+        durations = [
+            self._parse_duration(
                 section.get('duration', self.default_image_duration),
                 default=self.default_image_duration
             )
+            for section in sections
+        ]
+
+        # 所有中间文件（章节mp4、拼接列表、合并音频、临时音轨）放在同一个临时目录，
+        # 异常时也会整体清理
+        with tempfile.TemporaryDirectory(prefix='smartcomp_', dir=self._scratch_dir()) as tmpdir:
+            # 旁白文字：没有外部字幕时，由章节旁白生成一个SRT统一烧录
+            if not (subtitle_file and os.path.exists(subtitle_file)) \
+                    and self.video_config.get('show_narration_text', False):
+                subtitle_file = _write_narration_srt(
+                    sections, durations, os.path.join(tmpdir, 'narration.srt')
+                )
 
-            # 2.2 创建基础clip
-            clip = self._create_base_clip(material_path, duration)
-
-            # 2.3 应用Ken Burns效果（如果是静态图片）
-            kb_info = ""
-            if self.ken_burns_enabled and material_path:
-                ext = os.path.splitext(material_path)[1].lower()
-                if ext in ['.jpg', '.png', '.jpeg', '.gif']:
-                    movement_type = self.ken_burns._decide_movement_type(
-                        analysis['energy_level'],
-                        analysis['emotion']
-                    )
-                    clip = self.ken_burns.apply_ken_burns(clip, analysis, duration)
-                    kb_info = f" | KB: {movement_type}"
+            concat_path = None
+            if self.parallel_render:
+                concat_path = self._render_sections_parallel(
+                    sections, analyses, section_materials, durations, tmpdir
+                )
 
-            # 2.4 决定转场（除第一个clip）
-            trans_info = ""
-            if i > 0:
-                transition = self.transition_engine.decide_transition(
-                    analyses[i-1],
-                    analysis,
-                    analyses[i+1] if i < len(analyses)-1 else None
+            if concat_path:
+                # 多进程渲染成功：拼接已由FFmpeg流复制完成，音频/字幕也交给FFmpeg一次性封装
+                output_path = self._finalize_with_ffmpeg(
+                    concat_path,
+                    script,
+                    output_filename,
+                    use_tts_audio,
+                    tts_metadata_path,
+                    subtitle_file,
+                    sum(durations),
+                    len(sections)
                 )
-                trans_info = f" | 转场: {transition['type']}"
-                # 应用转场
-                clip = self._apply_transition(clip, transition)
-
-            # 2.5 添加文字（如果配置启用）
-            narration = section.get('narration', '')
-            if self.video_config.get('show_narration_text', False) and narration:
-                text_clip = self._create_text_clip(
-                    narration,
-                    duration=duration,
-                    position=('center', 'bottom'),
-                    fontsize=self.video_config.get('text_size', 40)
+            else:
+                output_path = self._compose_in_process(
+                    script,
+                    sections,
+                    analyses,
+                    section_materials,
+                    durations,
+                    output_filename,
+                    use_tts_audio,
+                    tts_metadata_path,
+                    subtitle_file,
+                    tmpdir
                 )
-                clip = CompositeVideoClip([clip, text_clip])
 
-            with lock:
-                clips_dict[i] = clip
-                print(f"   ✅ 章节 {i+1}/{len(sections)}: {section_name}{kb_info}{trans_info}")
-
-            return clip
+        if cache_key:
+            self._store_cached_output(cache_key, output_path)
 
-        # 并行处理所有章节（由于转场需要前后信息，降低并行度）
-        with ThreadPoolExecutor(max_workers=min(3, len(sections))) as executor:
-            futures = [
-                executor.submit(create_smart_clip, i, section, analyses[i])
-                for i, section in enumerate(sections)
-            ]
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    print(f"   ⚠️  创建片段失败: {str(e)}")
+        return output_path
 
-        # 按顺序组装clips
-        all_clips = [clips_dict[i] for i in sorted(clips_dict.keys())]
+    def _compose_in_process(
+        self,
+        script: Dict[str, Any],
+        sections: List[Dict[str, Any]],
+        analyses: List[Dict[str, Any]],
+        section_materials: Dict[int, Optional[str]],
+        durations: List[float],
+        output_filename: Optional[str],
+        use_tts_audio: bool,
+        tts_metadata_path: Optional[str],
+        subtitle_file: Optional[str],
+        tmpdir: str
+    ) -> str:
+        """进程内合成（多进程渲染不可用或失败时的回退路径）"""
+        all_clips = self._create_clips_in_process(
+            sections, analyses, section_materials, durations
+        )
 
         if not all_clips:
             raise ValueError("没有生成任何视频片段")
 
         # ========== 第3步: 合并clips ==========
         print(f"\n🎞️  合并 {len(all_clips)} 个片段...")
-        final_video = concatenate_videoclips(all_clips, method="compose")
+        # 片段在解码时已统一Letterbox到同一画布，转场也不引入mask，
+        # 直接首尾相接即可，无需逐帧合成
+        if len({tuple(clip.size) for clip in all_clips}) == 1 \
+                and all(clip.mask is None for clip in all_clips):
+            final_video = concatenate_videoclips(all_clips, method="chain")
+        else:
+            print("   ⚠️  片段尺寸不一致，使用合成模式拼接")
+            final_video = concatenate_videoclips(all_clips, method="compose")
 
         # ========== 第4步: 添加音频 ==========
         final_video = self._add_audio(
             final_video,
             use_tts_audio,
             tts_metadata_path,
-            audio_clips
+            tmpdir
         )
 
         # ========== 第5步: 添加字幕 ==========
@@ -281,136 +398,313 @@ class SmartVideoComposer(VideoComposer):
             final_video,
             script,
             output_filename,
-            len(all_clips)
+            len(all_clips),
+            tmpdir
         )
 
         # ========== 第7步: 清理资源 ==========
-        self._cleanup_resources(all_clips, audio_clips, final_video)
+        self._cleanup_resources(all_clips, final_video)
 
         return output_path
 
-    def _get_material_for_section(
+    def _finalize_with_ffmpeg(
         self,
-        section: Dict[str, Any],
-        auto_select: bool
-    ) -> Optional[str]:
-        """获取章节素材"""
-        if auto_select:
-            print("   🔍 智能推荐素材...")
-            recommendations = self.recommender.recommend_for_script_section(
-                section,
-                limit=3
-            )
+        video_path: str,
+        script: Dict[str, Any],
+        output_filename: Optional[str],
+        use_tts_audio: bool,
+        tts_metadata_path: Optional[str],
+        subtitle_file: Optional[str],
+        video_duration: float,
+        clip_count: int
+    ) -> str:
+        """
+        用一次FFmpeg调用为拼接好的视频封装音频（TTS拼接 + BGM混音）和字幕
 
-            if recommendations:
-                best_material = recommendations[0]
-                material_path = best_material['file_path']
-                print(f"   ✅ 选择: {best_material['name']} "
-                      f"(匹配度: {best_material.get('match_score', 0):.0f}%)")
-                return material_path
-            else:
-                print("   ⚠️  未找到合适素材，使用默认黑屏")
-                return None
+        无字幕时视频流直接复制，不经过moviepy的解码/重编码。
+
+        Returns:
+            视频文件路径
+        """
+        output_path = self._resolve_output_path(script, output_filename)
+
+        audio_plan = self._build_audio_plan(
+            use_tts_audio=use_tts_audio,
+            tts_metadata_path=tts_metadata_path,
+            video_duration=video_duration,
+        )
+        if audio_plan and audio_plan.use_tts:
+            audio_plan.target_duration = max(sum(audio_plan.tts_durations), video_duration)
+
+        subtitle_style = None
+        if subtitle_file and os.path.exists(subtitle_file):
+            subtitle_style = self._get_subtitle_style()
+            print(f"\n📝 添加字幕: {subtitle_file}")
         else:
+            subtitle_file = None
+
+        # CPU编码：仅在需要烧录字幕时重新编码视频
+        cpu_video_args = [
+            '-c:v', 'libx264',
+            '-pix_fmt', 'yuv420p',
+            '-preset', str(self.video_config.get('preset', 'medium')),
+        ]
+        mux_kwargs = dict(
+            audio_plan=audio_plan,
+            video_args=cpu_video_args,
+            subtitle_file=subtitle_file,
+            subtitle_style=subtitle_style,
+        )
+
+        codec = self.video_config.get('codec', 'libx264')
+        use_gpu = self.video_config.get('gpu_acceleration', False) and codec.endswith('nvenc')
+
+        print(f"\n💾 导出视频...")
+        if use_gpu:
+            # GPU编码：中间文件用NVDEC解码，帧留在显存中直接送入NVENC
+            # （字幕滤镜在CPU上运行，此时帧需要回传内存）
+            video_input_args = ['-hwaccel', 'cuda']
+            if not subtitle_file:
+                video_input_args.extend(['-hwaccel_output_format', 'cuda'])
+            print(f"   🚀 启用GPU加速: {codec} (preset: {self.video_config.get('gpu_preset', 'p4')})")
+            gpu_kwargs = dict(
+                mux_kwargs,
+                video_args=['-c:v', codec] + self._nvenc_params(),
+                video_input_args=video_input_args,
+                reencode=True,
+            )
+            try:
+                self.renderer.mux_audio(video_path, output_path, **gpu_kwargs)
+            except FFmpegRenderError as e:
+                print("\n⚠️  NVENC导出失败，尝试回退到CPU编码(libx264)...")
+                print(f"   ❌ NVENC失败详情: {e}")
+                self.renderer.mux_audio(video_path, output_path, **mux_kwargs)
+        else:
+            self.renderer.mux_audio(video_path, output_path, **mux_kwargs)
+
+        print(f"\n✅ 智能视频合成完成!")
+        print(f"   输出: {output_path}")
+        print(f"   时长: {video_duration:.1f}秒")
+        print(f"   片段数: {clip_count}")
+
+        return output_path
+
+    def _scratch_dir(self) -> Optional[str]:
+        """
+        选择中间文件所在目录
+
+        Linux上优先使用/dev/shm（tmpfs，写入不落盘）；容器里的/dev/shm常常只有64MB，
+        可用空间不足 smart_effects.tmpfs_min_free_mb（默认2048MB）时退回系统临时目录。
+        """
+        if not self.smart_config.get('use_tmpfs', True):
             return None
 
-    def _create_base_clip(self, material_path: Optional[str], duration: float):
-        """创建基础clip"""
-        from moviepy import ImageClip, VideoFileClip
-        from moviepy.video.fx import Loop
+        shm_dir = '/dev/shm'
+        if not os.path.isdir(shm_dir):
+            return None
 
-        if material_path and os.path.exists(material_path):
-            ext = os.path.splitext(material_path)[1].lower()
-            if ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
-                clip = ImageClip(material_path).with_duration(duration)
-            elif ext in ['.mp4', '.avi', '.mov', '.mkv']:
-                video_clip = VideoFileClip(material_path)
+        try:
+            free_mb = shutil.disk_usage(shm_dir).free / (1024 * 1024)
+        except OSError:
+            return None
 
-                # 移除音频（因为我们会使用TTS音频）
-                video_clip = video_clip.without_audio()
+        if free_mb < self.smart_config.get('tmpfs_min_free_mb', 2048):
+            return None
+        return shm_dir
 
-                if video_clip.duration < duration:
-                    clip = video_clip.with_effects([Loop(duration=duration)])
-                else:
-                    clip = video_clip.subclipped(0, duration)
-            else:
-                print(f"   ⚠️  不支持的格式: {ext}")
-                clip = self._create_color_clip((0, 0, 0), duration)
+    def _section_render_config(self) -> Dict[str, Any]:
+        """构建传给worker进程的渲染配置（仅含可pickle的基础类型）"""
+        return {
+            'size': (self._target_w, self._target_h),
+            'fps': self.video_config.get('fps', 24),
+            'ken_burns': self.ken_burns_enabled,
+        }
+
+    def _render_sections_parallel(
+        self,
+        sections: List[Dict[str, Any]],
+        analyses: List[Dict[str, Any]],
+        section_materials: Dict[int, Optional[str]],
+        durations: List[float],
+        tmpdir: str
+    ) -> Optional[str]:
+        """
+        多进程渲染所有章节为中间mp4，再用FFmpeg concat demuxer流复制拼接
+
+        Ken Burns/转场/图片解码都是持有GIL的纯Python计算，线程池几乎没有加速，
+        因此每个章节在独立进程中渲染。
+
+        Returns:
+            拼接后的视频路径；任一章节失败时返回None（调用方回退到进程内合成）
+        """
+        cfg = self._section_render_config()
+        segment_paths: List[Optional[str]] = [None] * len(sections)
+        max_workers = max(1, min(self.render_workers, len(sections)))
+
+        # 图片素材只在父进程解码一次，worker通过共享内存读取
+        shm_handles, cfg['shared_frames'] = _probe_and_cache(
+            set(section_materials.values()), cfg['size']
+        )
+        if shm_handles:
+            print(f"\n🗂️  预解码 {len(shm_handles)} 张图片素材到共享内存")
+
+        print(f"\n🎨 🚀 多进程渲染视频片段 ({max_workers} 进程)...")
+
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     mp_context=_render_pool_context()) as executor:
+                future_to_idx = {
+                    executor.submit(
+                        _render_section_to_tempfile,
+                        i,
+                        section_materials.get(i),
+                        durations[i],
+                        analyses[i],
+                        _decide_transition(analyses[i-1], analyses[i]) if i > 0 else None,
+                        cfg,
+                        tmpdir
+                    ): i
+                    for i in range(len(sections))
+                }
+                for future in as_completed(future_to_idx):
+                    i = future_to_idx[future]
+                    segment_paths[i] = future.result()
+                    section_name = sections[i].get('section_name', f'章节{i+1}')
+                    print(f"   ✅ 章节 {i+1}/{len(sections)}: {section_name}")
+
+            concat_path = os.path.join(tmpdir, 'concat.mp4')
+            print(f"\n🎞️  FFmpeg拼接 {len(segment_paths)} 个片段（流复制）...")
+            self.renderer.concat_segments(segment_paths, concat_path)
+            return concat_path
+        except Exception as e:
+            print(f"   ⚠️  多进程渲染失败: {str(e)}")
+            print(f"   → 回退到进程内合成")
+            return None
+        finally:
+            for shm in shm_handles:
+                shm.close()
+                shm.unlink()
+
+    def _create_clips_in_process(
+        self,
+        sections: List[Dict[str, Any]],
+        analyses: List[Dict[str, Any]],
+        section_materials: Dict[int, Optional[str]],
+        durations: List[float]
+    ) -> list:
+        """进程内并行创建视频片段（多进程渲染不可用时的回退路径）"""
+        print(f"\n🎨 🚀 并行生成视频片段...")
+
+        cfg = self._section_render_config()
+
+        # 并行创建视频片段：按下标写入预分配列表（保留顺序，无需加锁），
+        # 日志统一交给单独线程输出，stdout I/O不占用worker
+        results = [None] * len(sections)
+        logs = queue.SimpleQueue()
+
+        def drain_logs():
+            for message in iter(logs.get, None):
+                print(message)
+
+        log_thread = threading.Thread(target=drain_logs, daemon=True)
+        log_thread.start()
+
+        def create_smart_clip(i, section, analysis):
+            """智能创建单个视频片段"""
+            section_name = section.get('section_name', f'章节{i+1}')
+
+            # 决定转场（除第一个clip）
+            transition = None
+            if i > 0:
+                transition = _decide_transition(analyses[i-1], analysis)
+
+            clip, movement_type = _build_section_clip(
+                section_materials.get(i),
+                durations[i],
+                analysis,
+                transition,
+                cfg,
+                self.ken_burns
+            )
+
+            kb_info = f" | KB: {movement_type}" if movement_type else ""
+            trans_info = f" | 转场: {transition['type']}" if transition else ""
+
+            results[i] = clip
+            logs.put(f"   ✅ 章节 {i+1}/{len(sections)}: {section_name}{kb_info}{trans_info}")
+
+            return clip
+
+        # 并行处理所有章节（由于转场需要前后信息，降低并行度）
+        with ThreadPoolExecutor(max_workers=min(3, len(sections))) as executor:
+            futures = [
+                executor.submit(create_smart_clip, i, section, analyses[i])
+                for i, section in enumerate(sections)
+            ]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logs.put(f"   ⚠️  创建片段失败: {str(e)}")
+
+        logs.put(None)
+        log_thread.join()
+
+        return [clip for clip in results if clip is not None]
+
+    def _select_material(self, recommendations: List[Dict[str, Any]]) -> Optional[str]:
+        """从推荐列表中选择最佳素材路径"""
+        if recommendations:
+            best_material = recommendations[0]
+            print(f"   ✅ 选择: {best_material['name']} "
+                  f"(匹配度: {best_material.get('match_score', 0):.0f}%)")
+            return best_material['file_path']
         else:
-            clip = self._create_color_clip((0, 0, 0), duration)
+            print("   ⚠️  未找到合适素材，使用默认黑屏")
+            return None
 
-        return self._ensure_target_resolution(clip)
+    def _create_base_clip(self, material_path: Optional[str], duration: float):
+        """创建基础clip"""
+        return _create_base_clip(material_path, duration, (self._target_w, self._target_h))
 
     def _apply_transition(self, clip, transition: Dict[str, Any]):
         """应用转场效果到clip"""
-        trans_type = transition['type']
-        duration = transition['duration']
-        params = transition.get('params', {})
-
-        if trans_type == 'fade':
-            return clip.with_effects([FadeIn(duration)])
-        elif trans_type == 'zoom_in':
-            zoom_ratio = params.get('zoom_ratio', 1.3)
-            return TransitionLibrary.zoom_in(clip, duration, zoom_ratio)
-        elif trans_type == 'zoom_out':
-            zoom_ratio = params.get('zoom_ratio', 1.3)
-            return TransitionLibrary.zoom_out(clip, duration, zoom_ratio)
-        elif trans_type == 'slide_left':
-            return TransitionLibrary.slide_in(clip, 'left', duration)
-        elif trans_type == 'slide_right':
-            return TransitionLibrary.slide_in(clip, 'right', duration)
-        elif trans_type == 'hard_cut':
-            return clip  # 无转场
-        elif trans_type == 'crossfade':
-            return clip.with_effects([CrossFadeIn(duration)])
-        else:
-            return clip
+        return _apply_transition(clip, transition)
 
     def _add_audio(
         self,
         video_clip,
         use_tts: bool,
         tts_metadata_path: Optional[str],
-        audio_clips: list
+        tmpdir: str
     ):
         """添加音频（TTS或BGM）"""
-        from moviepy import AudioFileClip, concatenate_audioclips, CompositeAudioClip
-
         if use_tts and tts_metadata_path and os.path.exists(tts_metadata_path):
             print("\n🎙️  添加TTS语音...")
             try:
                 with open(tts_metadata_path, 'r', encoding='utf-8') as f:
                     tts_metadata = json.load(f)
 
-                audio_files = [item['file_path']
-                              for item in tts_metadata.get('audio_files', [])]
-
-                if audio_files:
-                    tts_audio_clips = [AudioFileClip(f)
-                                      for f in audio_files if os.path.exists(f)]
-                    audio_clips.extend(tts_audio_clips)
-
-                    if tts_audio_clips:
-                        tts_audio = concatenate_audioclips(tts_audio_clips)
-
-                        # 添加BGM背景
-                        bgm_path = self.video_config.get('default_bgm')
-                        if bgm_path and os.path.exists(bgm_path):
-                            bgm = AudioFileClip(bgm_path)
-                            if bgm.duration < tts_audio.duration:
-                                bgm = bgm.with_effects([AudioLoop(duration=tts_audio.duration)])
-                            else:
-                                bgm = bgm.subclipped(0, tts_audio.duration)
-                            bgm = bgm.with_volume_scaled(0.2)
-                            final_audio = CompositeAudioClip([tts_audio, bgm])
-                        else:
-                            final_audio = tts_audio
-
-                        video_clip = video_clip.with_audio(final_audio)
-                        print(f"   ✅ TTS音频已添加 (时长: {tts_audio.duration:.1f}秒)")
-
-                        if video_clip.duration != tts_audio.duration:
-                            video_clip = video_clip.with_duration(tts_audio.duration)
+                audio_items = [item for item in tts_metadata.get('audio_files', [])
+                               if os.path.exists(item['file_path'])]
+
+                if audio_items:
+                    bgm_path = self.video_config.get('default_bgm')
+                    if not (bgm_path and os.path.exists(bgm_path)):
+                        bgm_path = None
+
+                    final_audio, tts_duration = self._load_tts_audio(
+                        [item['file_path'] for item in audio_items],
+                        [float(item.get('duration', 0.0) or 0.0) for item in audio_items],
+                        bgm_path,
+                        tmpdir
+                    )
+
+                    video_clip = video_clip.with_audio(final_audio)
+                    print(f"   ✅ TTS音频已添加 (时长: {tts_duration:.1f}秒)")
+
+                    if video_clip.duration != tts_duration:
+                        video_clip = video_clip.with_duration(tts_duration)
             except Exception as e:
                 print(f"   ⚠️  添加TTS失败: {str(e)}")
         else:
@@ -430,38 +724,85 @@ class SmartVideoComposer(VideoComposer):
 
         return video_clip
 
+    def _load_tts_audio(
+        self,
+        audio_files: List[str],
+        durations: List[float],
+        bgm_path: Optional[str],
+        tmpdir: str
+    ):
+        """
+        加载TTS音频（拼接 + BGM混音）
+
+        优先用一次FFmpeg调用完成拼接与混音，只打开一个AudioFileClip；
+        FFmpeg不可用时回退为多线程并行解码各段音频（ffmpeg子进程不持有GIL），
+        混音结果同样先写成一个wav，随即关闭各段音频的读取进程。
+
+        Returns:
+            (最终音轨, TTS时长)；音轨随最终视频在_cleanup_resources中关闭
+        """
+        bgm_volume = self.config.get('tts', {}).get('bgm_volume', 0.2)
+        merged_path = os.path.join(tmpdir, 'tts_merged.wav')
+
+        plan = AudioPlan(
+            use_tts=True,
+            tts_inputs=audio_files,
+            tts_durations=durations,
+            bgm_path=bgm_path,
+            bgm_volume=bgm_volume,
+            target_duration=sum(durations),
+            audio_codec='pcm_s16le',
+        )
+        # BGM裁剪依赖元数据中的时长
+        if not bgm_path or plan.target_duration > 0:
+            try:
+                self.renderer.render_audio(plan, merged_path)
+                merged_audio = AudioFileClip(merged_path)
+                return merged_audio, merged_audio.duration
+            except (FFmpegRenderError, OSError) as e:
+                print(f"   ⚠️  FFmpeg合并音频失败，回退到并行解码: {str(e)}")
+
+        source_clips = [None] * len(audio_files)
+        try:
+            with ThreadPoolExecutor(max_workers=min(8, len(audio_files))) as executor:
+                future_to_idx = {
+                    executor.submit(AudioFileClip, f): i
+                    for i, f in enumerate(audio_files)
+                }
+                for future in as_completed(future_to_idx):
+                    source_clips[future_to_idx[future]] = future.result()
+
+            tts_audio = concatenate_audioclips(source_clips)
+            final_audio = tts_audio
+
+            if bgm_path:
+                bgm = AudioFileClip(bgm_path)
+                source_clips.append(bgm)
+                if bgm.duration < tts_audio.duration:
+                    bgm = bgm.with_effects([AudioLoop(duration=tts_audio.duration)])
+                else:
+                    bgm = bgm.subclipped(0, tts_audio.duration)
+                bgm = bgm.with_volume_scaled(bgm_volume)
+                final_audio = CompositeAudioClip([tts_audio, bgm])
+
+            # moviepy的拼接/混音是惰性的，先落盘再关闭各段的读取进程
+            final_audio.write_audiofile(merged_path, fps=44100, logger=None)
+        finally:
+            for clip in source_clips:
+                if clip is not None:
+                    clip.close()
+
+        merged_audio = AudioFileClip(merged_path)
+        return merged_audio, merged_audio.duration
+
     def _add_subtitles(self, video_clip, subtitle_file: str):
         """添加字幕（使用moviepy SubtitlesClip）"""
         print(f"\n📝 添加字幕: {subtitle_file}")
         try:
-            from moviepy.video.tools.subtitles import SubtitlesClip
-            from moviepy import TextClip, CompositeVideoClip
-
-            # 获取字幕配置
-            subtitle_cfg = self.config.get('subtitle', {})
-            font_size = subtitle_cfg.get('font_size', 48)
-            font_color = subtitle_cfg.get('font_color', 'white')
-            bg_color = subtitle_cfg.get('bg_color', 'black')
-            bg_opacity = subtitle_cfg.get('bg_opacity', 0.5)
-
-            # 计算背景色（带透明度）
-            bg_alpha = int(bg_opacity * 255)
-            bg_with_alpha = (0, 0, 0, bg_alpha) if bg_color.lower() == 'black' else bg_color
-
-            def generator(txt):
-                # 使用label方法确保文字居中，而不是caption
-                return TextClip(
-                    text=txt,
-                    font_size=font_size,
-                    color=font_color,
-                    bg_color=bg_color,
-                    method='label',  # 使用label而不是caption，确保居中
-                )
-
-            subtitles = SubtitlesClip(subtitle_file, generator)
+            subtitles = SubtitlesClip(subtitle_file, make_textclip=self._subtitle_generator())
 
             # 设置字幕位置：水平居中，垂直靠下
-            margin_bottom = subtitle_cfg.get('margin_v', 50)
+            margin_bottom = self.config.get('subtitle', {}).get('margin_v', 50)
             subtitle_position = ('center', video_clip.h - margin_bottom)
 
             video_clip = CompositeVideoClip([
@@ -477,22 +818,35 @@ class SmartVideoComposer(VideoComposer):
 
         return video_clip
 
+    def _subtitle_generator(self):
+        """
+        字幕TextClip生成器（字幕配置只读取一次，之后复用）
+
+        使用label方法确保文字居中，而不是caption。
+        """
+        if self._subtitle_text_factory is None:
+            subtitle_cfg = self.config.get('subtitle', {})
+            make_text = partial(
+                TextClip,
+                font_size=subtitle_cfg.get('font_size', 48),
+                color=subtitle_cfg.get('font_color', 'white'),
+                bg_color=subtitle_cfg.get('bg_color', 'black'),
+                method='label',
+            )
+            # TextClip的第一个位置参数是font，文字必须按关键字传入
+            self._subtitle_text_factory = lambda txt: make_text(text=txt)
+        return self._subtitle_text_factory
+
     def _export_video(
         self,
         video_clip,
         script: Dict[str, Any],
         output_filename: Optional[str],
-        clip_count: int
+        clip_count: int,
+        tmpdir: Optional[str] = None
     ) -> str:
         """导出视频"""
-        if output_filename is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            script_title = script.get('title', 'video')
-            safe_title = "".join(c for c in script_title
-                                if c.isalnum() or c in (' ', '-', '_')).strip()
-            output_filename = f"{safe_title}_{timestamp}.mp4"
-
-        output_path = os.path.join(self.editor.output_dir, output_filename)
+        output_path = self._resolve_output_path(script, output_filename)
 
         print(f"\n💾 导出视频...")
 
@@ -500,16 +854,11 @@ class SmartVideoComposer(VideoComposer):
         codec = self.video_config.get('codec', 'libx264')
         ffmpeg_params = []
 
-        if self.video_config.get('gpu_acceleration', False) and 'nvenc' in codec:
+        if self.video_config.get('gpu_acceleration', False) and codec.endswith('nvenc'):
             # NVIDIA GPU加速参数（NVENC编码器选项）
-            preset = self.video_config.get('gpu_preset', 'p4')
-            ffmpeg_params = ['-preset', str(preset)]
-
-            custom_nvenc = self.video_config.get('nvenc_params')
-            if isinstance(custom_nvenc, list):
-                ffmpeg_params.extend(str(p) for p in custom_nvenc)
-
-            print(f"   🚀 启用GPU加速: {codec} (preset: {preset})")
+            ffmpeg_params = self._nvenc_params()
+            print(f"   🚀 启用GPU加速: {codec} "
+                  f"(preset: {self.video_config.get('gpu_preset', 'p4')})")
 
         # 构建write_videofile参数
         write_params = {
@@ -519,6 +868,10 @@ class SmartVideoComposer(VideoComposer):
             'threads': self.video_config.get('threads', 4)
         }
 
+        # moviepy默认把临时音轨写在当前目录，改到本次合成的临时目录
+        if tmpdir:
+            write_params['temp_audiofile_path'] = tmpdir
+
         # 添加FFmpeg参数（如果有）
         if ffmpeg_params:
             write_params['ffmpeg_params'] = ffmpeg_params
@@ -564,7 +917,170 @@ class SmartVideoComposer(VideoComposer):
 
         return output_path
 
-    def _cleanup_resources(self, all_clips: list, audio_clips: list, final_video):
+    def _nvenc_params(self) -> List[str]:
+        """
+        构建NVENC编码参数
+
+        VBR码率控制 + 空间/时间自适应量化 + B帧和前瞻，
+        码率控制/码率/前瞻帧数可通过smart_effects配置覆盖。
+        """
+        params = [
+            '-preset', str(self.video_config.get('gpu_preset', 'p4')),
+            '-rc', str(self.smart_config.get('nvenc_rc', 'vbr')),
+            '-b:v', str(self.smart_config.get('nvenc_bitrate', '8M')),
+            '-spatial_aq', '1',
+            '-temporal_aq', '1',
+            '-bf', '3',
+            '-rc-lookahead', str(self.smart_config.get('nvenc_lookahead', 20)),
+        ]
+
+        custom_nvenc = self.video_config.get('nvenc_params')
+        if isinstance(custom_nvenc, list):
+            params.extend(str(p) for p in custom_nvenc)
+
+        return params
+
+    def _resolve_output_path(
+        self,
+        script: Dict[str, Any],
+        output_filename: Optional[str]
+    ) -> str:
+        """生成输出视频路径"""
+        if output_filename is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            script_title = script.get('title', 'video')
+            safe_title = "".join(c for c in script_title
+                                if c.isalnum() or c in (' ', '-', '_')).strip()
+            output_filename = f"{safe_title}_{timestamp}.mp4"
+
+        return os.path.join(self.editor.output_dir, output_filename)
+
+    @staticmethod
+    def _file_fingerprint(path: Optional[str]) -> Optional[List[Any]]:
+        """文件指纹（路径 + 大小 + 修改时间），文件不存在时返回None"""
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [path, stat.st_size, stat.st_mtime_ns]
+
+    def _compose_cache_key(
+        self,
+        script: Dict[str, Any],
+        section_materials: Dict[int, Optional[str]],
+        tts_metadata_path: Optional[str],
+        subtitle_file: Optional[str],
+        use_tts_audio: bool
+    ) -> str:
+        """
+        计算合成结果的缓存键
+
+        合成过程在脚本、所选素材、音频/字幕输入和相关配置都相同时是确定的，
+        素材与输入文件按指纹参与计算，文件被替换后缓存自动失效。
+        """
+        tts_inputs = None
+        if use_tts_audio and tts_metadata_path and os.path.exists(tts_metadata_path):
+            try:
+                with open(tts_metadata_path, 'r', encoding='utf-8') as f:
+                    tts_metadata = json.load(f)
+                tts_inputs = [
+                    self._file_fingerprint(item.get('file_path'))
+                    for item in tts_metadata.get('audio_files', [])
+                ]
+            except (OSError, ValueError):
+                tts_inputs = self._file_fingerprint(tts_metadata_path)
+
+        payload = {
+            'script': script,
+            'video': self.video_config,
+            'smart': self.smart_config,
+            'subtitle': self.config.get('subtitle', {}),
+            'tts': self.config.get('tts', {}),
+            'materials': {
+                str(idx): self._file_fingerprint(path)
+                for idx, path in section_materials.items()
+            },
+            'use_tts_audio': use_tts_audio,
+            'tts_inputs': tts_inputs,
+            'subtitle_file': self._file_fingerprint(subtitle_file),
+            'bgm': self._file_fingerprint(self.video_config.get('default_bgm')),
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _cache_index_path(self) -> str:
+        """合成结果缓存索引文件路径"""
+        return os.path.join(self.editor.output_dir, '.cache_index.json')
+
+    def _load_cache_index(self) -> Dict[str, List[Any]]:
+        """读取缓存索引 {缓存键: [视频路径, 大小, 修改时间]}（文件损坏时视为空）"""
+        try:
+            with open(self._cache_index_path(), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(index, dict):
+            return {}
+        # 旧版索引只记录路径，无法确认文件未被改写，一律视为未命中
+        return {key: entry for key, entry in index.items()
+                if isinstance(entry, list) and len(entry) == 3}
+
+    def _reuse_cached_output(self, cache_key: str, output_path: str) -> Optional[str]:
+        """
+        命中缓存时复制已有视频到本次输出路径
+
+        缓存视频的大小和修改时间必须与写入索引时一致，
+        同名输出被其他脚本覆盖或被手动改动过时视为未命中。
+
+        Returns:
+            输出视频路径；未命中返回None
+        """
+        entry = self._load_cache_index().get(cache_key)
+        if not entry or self._file_fingerprint(entry[0]) != entry:
+            return None
+
+        cached_path = entry[0]
+        print(f"\n♻️  相同脚本与素材已合成过，直接复用: {cached_path}")
+        if os.path.abspath(cached_path) != os.path.abspath(output_path):
+            try:
+                shutil.copy2(cached_path, output_path)
+            except OSError as e:
+                print(f"   ⚠️  复制缓存视频失败，重新合成: {str(e)}")
+                return None
+            # 输出路径上原有的视频已被覆盖，更新索引
+            self._store_cached_output(cache_key, output_path)
+
+        print(f"\n✅ 智能视频合成完成!")
+        print(f"   输出: {output_path}")
+        return output_path
+
+    def _store_cached_output(self, cache_key: str, output_path: str):
+        """记录合成结果到缓存索引（先写临时文件再替换，避免索引写坏）"""
+        fingerprint = self._file_fingerprint(output_path)
+        if fingerprint is None:
+            return
+
+        # 清理已被删除或改写的视频，以及指向本次输出路径的其他缓存键（该文件已被覆盖）
+        output_abspath = os.path.abspath(output_path)
+        index = {
+            key: entry for key, entry in self._load_cache_index().items()
+            if os.path.abspath(entry[0]) != output_abspath
+            and self._file_fingerprint(entry[0]) == entry
+        }
+        index[cache_key] = fingerprint
+
+        index_path = self._cache_index_path()
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"   ⚠️  写入缓存索引失败: {str(e)}")
+
+    def _cleanup_resources(self, all_clips: list, final_video):
         """清理资源防止内存泄漏"""
         print("\n🧹 清理临时资源...")
         try:
@@ -575,12 +1091,13 @@ class SmartVideoComposer(VideoComposer):
                     except:
                         pass
 
-            for clip in audio_clips:
-                if clip and hasattr(clip, 'close'):
-                    try:
-                        clip.close()
-                    except:
-                        pass
+            # 最终音轨（TTS合并结果或BGM）只有一个读取进程，随视频一起关闭
+            audio = getattr(final_video, 'audio', None)
+            if audio is not None and hasattr(audio, 'close'):
+                try:
+                    audio.close()
+                except:
+                    pass
 
             if hasattr(final_video, 'close'):
                 try:
@@ -592,47 +1109,4 @@ class SmartVideoComposer(VideoComposer):
 
     def _ensure_target_resolution(self, clip):
         """确保剪辑符合目标分辨率（Letterbox 适配）。"""
-        try:
-            resolution = self.video_config.get('resolution', {'width': 1920, 'height': 1080})
-            if isinstance(resolution, dict):
-                target_width = int(resolution.get('width', 1920))
-                target_height = int(resolution.get('height', 1080))
-            else:
-                target_width, target_height = resolution
-
-            if not target_width or not target_height:
-                return clip
-
-            clip_width, clip_height = clip.size
-            if clip_width is None or clip_height is None:
-                return clip
-
-            target_width = max(2, (target_width // 2) * 2)
-            target_height = max(2, (target_height // 2) * 2)
-
-            if clip_width == target_width and clip_height == target_height:
-                return clip
-
-            clip_ratio = clip_width / clip_height
-            target_ratio = target_width / target_height
-
-            if clip_ratio >= target_ratio:
-                new_width = target_width
-                new_height = int(round(target_width / clip_ratio))
-            else:
-                new_height = target_height
-                new_width = int(round(target_height * clip_ratio))
-
-            new_width = max(2, (new_width // 2) * 2)
-            new_height = max(2, (new_height // 2) * 2)
-
-            resized_clip = clip.resized(new_size=(new_width, new_height))
-
-            return resized_clip.with_background_color(
-                size=(target_width, target_height),
-                color=(0, 0, 0),
-                pos='center'
-            )
-        except Exception as e:
-            print(f"   ⚠️  调整分辨率失败: {e}")
-            return clip
+        return _ensure_target_resolution(clip, (self._target_w, self._target_h))
@@ -3,77 +3,429 @@
 根据章节语义特征智能选择最佳转场效果
 """
 
-from typing import Dict, Any, Optional, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, ClassVar, Final, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+# 特定章节组合规则：模块加载时构建一次，条目只读共享
+_SPECIAL_PAIRS: Final[Mapping[Tuple[str, str], Mapping[str, str]]] = MappingProxyType({
+    # 开场系列
+    ('hook', 'introduction'): MappingProxyType({
+        'type': 'zoom_out',
+        'reason': '从开场钩子到介绍，能量稍降，用zoom_out平稳过渡'
+    }),
+    ('hook', 'background'): MappingProxyType({
+        'type': 'fade',
+        'reason': '从高能开场到背景知识，用fade舒缓节奏'
+    }),
+
+    # 介绍系列
+    ('introduction', 'background'): MappingProxyType({
+        'type': 'fade',
+        'reason': '从介绍到背景，平滑过渡'
+    }),
+    ('introduction', 'main_content'): MappingProxyType({
+        'type': 'slide_left',
+        'reason': '从介绍到核心，逻辑推进'
+    }),
+
+    # 背景系列
+    ('background', 'main_content'): MappingProxyType({
+        'type': 'zoom_in',
+        'reason': '从背景到核心，重点强调，用zoom_in吸引注意'
+    }),
+    ('background', 'application'): MappingProxyType({
+        'type': 'slide_left',
+        'reason': '从背景到应用，逻辑前进'
+    }),
+
+    # 核心内容系列
+    ('main_content', 'application'): MappingProxyType({
+        'type': 'slide_left',
+        'reason': '从理论到应用，逻辑推进'
+    }),
+    ('main_content', 'summary'): MappingProxyType({
+        'type': 'zoom_out',
+        'reason': '从核心到总结，拉远视角'
+    }),
+    ('main_content', 'main_content'): MappingProxyType({
+        'type': 'crossfade',
+        'reason': '核心内容延续，用crossfade保持连贯'
+    }),
+
+    # 应用系列
+    ('application', 'summary'): MappingProxyType({
+        'type': 'fade',
+        'reason': '从应用到总结，平和收尾'
+    }),
+    ('application', 'cta'): MappingProxyType({
+        'type': 'zoom_in',
+        'reason': '从应用到号召，重新激发'
+    }),
+
+    # 总结系列
+    ('summary', 'cta'): MappingProxyType({
+        'type': 'zoom_in',
+        'reason': '总结后号召行动，重新激发能量'
+    })
+})
+
+# 已知章节类型 → 小整数ID，组合键为 (prev_id << 8) | curr_id，避免构造/哈希字符串元组
+_SECTION_ID: Final[Mapping[str, int]] = MappingProxyType({
+    'hook': 0,
+    'introduction': 1,
+    'background': 2,
+    'main_content': 3,
+    'application': 4,
+    'summary': 5,
+    'cta': 6
+})
+
+_PAIR_LUT: Final[Dict[int, Mapping[str, str]]] = {
+    (_SECTION_ID[a] << 8) | _SECTION_ID[b]: rule
+    for (a, b), rule in _SPECIAL_PAIRS.items()
+}
+
+# 情绪强度等级
+_EMOTION_HIERARCHY: Final[Mapping[str, int]] = MappingProxyType({
+    'excitement': 5,
+    'motivated': 4,
+    'inspired': 4,
+    'curiosity': 3,
+    'focus': 3,
+    'satisfied': 2,
+    'calm': 1
+})
+
+
+def _classify_emotion_change(prev_level: int, curr_level: int) -> str:
+    """按情绪等级差判定变化类型：escalate/de-escalate/maintain"""
+    if curr_level > prev_level + 1:
+        return 'escalate'  # 情绪升级
+    elif curr_level < prev_level - 1:
+        return 'de-escalate'  # 情绪降级
+    else:
+        return 'maintain'  # 情绪维持
+
+
+# (前情绪, 当前情绪) → 变化类型，覆盖所有已知情绪组合
+_EMOTION_DELTA_LUT: Final[Mapping[Tuple[str, str], str]] = MappingProxyType({
+    (prev, curr): _classify_emotion_change(prev_level, curr_level)
+    for prev, prev_level in _EMOTION_HIERARCHY.items()
+    for curr, curr_level in _EMOTION_HIERARCHY.items()
+})
+
+# 各转场基础时长（秒）
+_BASE_DURATIONS: Final[Mapping[str, float]] = MappingProxyType({
+    'fade': 1.0,
+    'zoom_in': 0.8,
+    'zoom_out': 1.2,
+    'slide_left': 0.6,
+    'slide_right': 0.6,
+    'hard_cut': 0.0,
+    'crossfade': 1.5
+})
+
+# 节奏对转场时长的调整系数
+_PACE_MULT: Final[Mapping[str, float]] = MappingProxyType({
+    'very_fast': 0.5,
+    'fast': 0.75,
+    'moderate': 1.0,
+    'slow': 1.25
+})
+
+# 时长按整数厘秒计算：基础时长与节奏系数都至多两位小数，整数运算精确且免去 round()
+_BASE_DURATIONS_CS: Final[Mapping[str, int]] = MappingProxyType({
+    transition_type: round(base * 100) for transition_type, base in _BASE_DURATIONS.items()
+})
+_PACE_MULT_CS: Final[Mapping[str, int]] = MappingProxyType({
+    pace: round(mult * 100) for pace, mult in _PACE_MULT.items()
+})
+
+
+def _round_half_even(num, den):
+    """整数除法按四舍六入五成双取整（与 round() 一致），支持 NumPy 数组"""
+    q, r = divmod(num, den)
+    return q + ((2 * r > den) | ((2 * r == den) & (q & 1 == 1)))
+
+def _duration_seconds(transition_type: str, pace: str, big_delta: bool) -> float:
+    """转场时长（秒，两位小数）：基础时长 × 节奏系数，能量大幅变化时再 ×0.8"""
+    # 基础时长(厘秒) × 节奏系数(百分比) → 万分之一秒
+    num = _BASE_DURATIONS_CS.get(transition_type, 100) * _PACE_MULT_CS.get(pace, 100)
+    den = 100
+
+    # 根据能量变化微调
+    if big_delta:
+        num *= 4  # 大变化，快速过渡（×0.8）
+        den *= 5
+
+    return int(_round_half_even(num, den)) / 100
+
+
+# (转场类型, 节奏, 能量是否大幅变化) → 时长，覆盖全部已知组合
+_DURATION_LUT: Final[Mapping[Tuple[str, str, bool], float]] = MappingProxyType({
+    (transition_type, pace, big_delta): _duration_seconds(transition_type, pace, big_delta)
+    for transition_type in _BASE_DURATIONS
+    for pace in _PACE_MULT
+    for big_delta in (False, True)
+})
+
+# 缩放类转场的缓动曲线
+_EASING_MAP: Final[Mapping[str, str]] = MappingProxyType({
+    'zoom_in': 'ease_in',
+    'zoom_out': 'ease_out'
+})
+
+_SLIDE_TYPES: Final = frozenset(('slide_left', 'slide_right'))
+_FAST_PACES: Final = frozenset(('fast', 'very_fast'))
+
+
+def _compute_params(transition_type: str, energy: float, pace: str) -> Dict[str, Any]:
+    """按转场类型计算参数（_PARAMS_LUT 的构建与未命中回退）"""
+    params = {}
+
+    if transition_type in _EASING_MAP:
+        # 缩放比例根据能量调整
+        # 能量越高，缩放幅度越大（1.0 - 1.5）
+        params['zoom_ratio'] = 1.0 + (energy / 20)
+        params['easing'] = _EASING_MAP[transition_type]
+
+    elif transition_type in _SLIDE_TYPES:
+        # 滑动速度根据节奏调整
+        params['speed'] = 'fast' if pace in _FAST_PACES else 'normal'
+
+    elif transition_type == 'fade':
+        # 淡化强度
+        params['fade_curve'] = 'linear'
+
+    return params
+
+
+def _params_key(transition_type: str, energy: float, pace: str) -> Tuple[str, Any]:
+    """参数表键：缩放类只依赖能量（0.1精度整数化），滑动类只依赖节奏，其余为常量"""
+    if transition_type in _EASING_MAP:
+        return (transition_type, int(round(energy * 10)))
+    if transition_type in _SLIDE_TYPES:
+        return (transition_type, pace)
+    return (transition_type, None)
+
+
+# (转场类型, 能量×10 / 节奏 / None) → 参数，覆盖能量 0.0-10.0 与已知节奏
+_PARAMS_LUT: Final[Mapping[Tuple[str, Any], Mapping[str, Any]]] = MappingProxyType({
+    **{
+        (transition_type, energy_q): MappingProxyType(
+            _compute_params(transition_type, energy_q / 10, '')
+        )
+        for transition_type in _EASING_MAP
+        for energy_q in range(0, 101)
+    },
+    **{
+        (transition_type, pace): MappingProxyType(
+            _compute_params(transition_type, 0.0, pace)
+        )
+        for transition_type in _SLIDE_TYPES
+        for pace in _PACE_MULT
+    },
+    **{
+        (transition_type, None): MappingProxyType(
+            _compute_params(transition_type, 0.0, '')
+        )
+        for transition_type in _BASE_DURATIONS
+        if transition_type not in _EASING_MAP and transition_type not in _SLIDE_TYPES
+    }
+})
+
+# 未命中特定组合时的默认规则：(转场类型, 理由模板)，模板参数为能量变化绝对值
+_DEFAULT_RULES: Final[Tuple[Tuple[str, str], ...]] = (
+    ('zoom_in', '能量提升{:.1f}，用zoom_in强调重点'),
+    ('fade', '能量降低{:.1f}，用fade平稳过渡'),
+    ('crossfade', '能量平稳，用crossfade保持连贯'),
+    ('hard_cut', '极高能量章节，用硬切增强冲击'),
+    ('zoom_in', '高能量章节，用zoom_in强调'),
+    ('slide_left', '中等能量，用slide保持节奏'),
+    ('fade', '低能量章节，用fade平稳过渡'),
+)
+
+
+def _default_rule_index(energy_delta: float, curr_energy: float) -> int:
+    """选择默认规则（_DEFAULT_RULES 下标）"""
+    # 规则2: 能量变化驱动
+    if energy_delta > 3:
+        return 0  # 能量大幅上升 → 冲击性转场
+    elif energy_delta < -3:
+        return 1  # 能量大幅下降 → 舒缓转场
+    elif abs(energy_delta) < 1:
+        return 2  # 能量持平 → 延续性转场
+
+    # 规则3: 默认根据当前章节能量选择
+    if curr_energy >= 8.0:
+        return 3
+    elif curr_energy >= 7.5:
+        return 4
+    elif curr_energy >= 5.5:
+        return 5
+    else:
+        return 6
+
+
+# 理由模板含能量变化数值的规则（其余规则理由为常量字符串）
+_FORMATTED_RULES: Final = frozenset((0, 1))
+
+
+def _rule_reason(rule_id: int, abs_delta: float) -> str:
+    """默认规则的理由：常量直接返回，含数值的模板填入能量变化"""
+    template = _DEFAULT_RULES[rule_id][1]
+    if rule_id in _FORMATTED_RULES:
+        return template.format(abs_delta)
+    return template
+
+
+# 批量决策用的 SoA 数组表
+_TRANSITION_TYPES: Final[Tuple[str, ...]] = tuple(_BASE_DURATIONS)
+_TRANSITION_INDEX: Final[Mapping[str, int]] = MappingProxyType({
+    transition_type: i for i, transition_type in enumerate(_TRANSITION_TYPES)
+})
+_BASE_CS_ARR: Final = np.array([_BASE_DURATIONS_CS[t] for t in _TRANSITION_TYPES], dtype=np.int64)
+_RULE_TYPE_IDS: Final = np.array([_TRANSITION_INDEX[t] for t, _ in _DEFAULT_RULES])
+_PACE_INDEX: Final[Mapping[str, int]] = MappingProxyType({
+    pace: i for i, pace in enumerate(_PACE_MULT)
+})
+# 末位对应未知节奏（系数1.0）
+_PACE_CS_ARR: Final = np.array(list(_PACE_MULT_CS.values()) + [100], dtype=np.int64)
+
+
+class ChapterAnalysis(NamedTuple):
+    """转场决策依赖的章节特征（不可变、可哈希，直接作为决策缓存键）"""
+
+    section_type: str
+    emotion: str
+    energy_level: float
+    pace: str
+
+    @classmethod
+    def from_dict(cls, analysis: Dict[str, Any]) -> "ChapterAnalysis":
+        """从语义分析结果字典构建（能量量化到0.1精度，与语义分析输出一致）"""
+        return cls(
+            section_type=analysis['section_type'],
+            emotion=analysis['emotion'],
+            energy_level=round(analysis['energy_level'], 1),
+            pace=analysis['pace']
+        )
+
+
+class TransitionDecision(NamedTuple):
+    """转场决策结果（缓存共享，params 只读）"""
+
+    type: str
+    duration: float
+    params: Mapping[str, Any]
+    reason: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可自由修改的结果字典"""
+        return {
+            'type': self.type,
+            'reason': self.reason,
+            'duration': self.duration,
+            'params': dict(self.params)
+        }
+
+
+AnalysisLike = Union[ChapterAnalysis, Dict[str, Any]]
+
+
+def _as_chapter(analysis: AnalysisLike) -> ChapterAnalysis:
+    """字典输入转换为 ChapterAnalysis，已是 ChapterAnalysis 则原样返回"""
+    if isinstance(analysis, ChapterAnalysis):
+        return analysis
+    return ChapterAnalysis.from_dict(analysis)
+
+
+# 转场效果描述（热路径只查这张小表，完整特征见 TransitionDecisionEngine.TRANSITION_PROFILES）
+_TRANSITION_DESCRIPTIONS: Final[Mapping[str, str]] = MappingProxyType({
+    'fade': '平滑过渡，适合叙述性内容',
+    'zoom_in': '放大进入，强调重点',
+    'zoom_out': '缩小展开，总结展望',
+    'slide_left': '左滑，表示时间推进',
+    'slide_right': '右滑，表示回溯或对比',
+    'hard_cut': '硬切，快节奏冲击',
+    'crossfade': '交叉淡化，内容延续'
+})
 
 
 class TransitionDecisionEngine:
     """转场决策引擎"""
 
+    __slots__ = ()
+
     # 转场效果特征库
-    TRANSITION_PROFILES = {
-        'fade': {
+    TRANSITION_PROFILES: ClassVar[Mapping[str, Mapping[str, Any]]] = MappingProxyType({
+        'fade': MappingProxyType({
             'suitable_for': ['calm', 'smooth', 'educational'],
             'energy_range': (3, 7),
             'emotion_match': ['calm', 'focus', 'satisfied'],
             'pace': 'slow',
-            'description': '平滑过渡，适合叙述性内容'
-        },
-        'zoom_in': {
+            'description': _TRANSITION_DESCRIPTIONS['fade']
+        }),
+        'zoom_in': MappingProxyType({
             'suitable_for': ['dynamic', 'exciting', 'attention'],
             'energy_range': (7, 10),
             'emotion_match': ['excitement', 'curiosity'],
             'pace': 'fast',
-            'description': '放大进入，强调重点'
-        },
-        'zoom_out': {
+            'description': _TRANSITION_DESCRIPTIONS['zoom_in']
+        }),
+        'zoom_out': MappingProxyType({
             'suitable_for': ['reveal', 'conclusion'],
             'energy_range': (4, 7),
             'emotion_match': ['satisfied', 'inspired'],
             'pace': 'moderate',
-            'description': '缩小展开，总结展望'
-        },
-        'slide_left': {
+            'description': _TRANSITION_DESCRIPTIONS['zoom_out']
+        }),
+        'slide_left': MappingProxyType({
             'suitable_for': ['progression', 'sequential'],
             'energy_range': (5, 8),
             'emotion_match': ['focus', 'curiosity'],
             'pace': 'moderate',
-            'description': '左滑，表示时间推进'
-        },
-        'slide_right': {
+            'description': _TRANSITION_DESCRIPTIONS['slide_left']
+        }),
+        'slide_right': MappingProxyType({
             'suitable_for': ['return', 'contrast'],
             'energy_range': (5, 8),
             'emotion_match': ['focus'],
             'pace': 'moderate',
-            'description': '右滑，表示回溯或对比'
-        },
-        'hard_cut': {
+            'description': _TRANSITION_DESCRIPTIONS['slide_right']
+        }),
+        'hard_cut': MappingProxyType({
             'suitable_for': ['high_energy', 'urgent'],
             'energy_range': (8, 10),
             'emotion_match': ['excitement'],
             'pace': 'very_fast',
-            'description': '硬切，快节奏冲击'
-        },
-        'crossfade': {
+            'description': _TRANSITION_DESCRIPTIONS['hard_cut']
+        }),
+        'crossfade': MappingProxyType({
             'suitable_for': ['related_content', 'continuation'],
             'energy_range': (4, 7),
             'emotion_match': ['focus', 'calm'],
             'pace': 'moderate',
-            'description': '交叉淡化，内容延续'
-        }
-    }
+            'description': _TRANSITION_DESCRIPTIONS['crossfade']
+        })
+    })
 
     def decide_transition(
         self,
-        prev_analysis: Dict[str, Any],
-        curr_analysis: Dict[str, Any],
-        next_analysis: Optional[Dict[str, Any]] = None
+        prev_analysis: AnalysisLike,
+        curr_analysis: AnalysisLike,
+        next_analysis: Optional[AnalysisLike] = None
     ) -> Dict[str, Any]:
         """
         决定最佳转场效果
 
         Args:
-            prev_analysis: 前一章节分析结果
-            curr_analysis: 当前章节分析结果
+            prev_analysis: 前一章节分析结果（字典或 ChapterAnalysis）
+            curr_analysis: 当前章节分析结果（字典或 ChapterAnalysis）
             next_analysis: 下一章节分析结果（可选，用于优化）
 
         Returns:
@@ -85,49 +437,168 @@ class TransitionDecisionEngine:
                 'reason': '从背景知识到核心内容，能量提升，使用zoom_in强调'
             }
         """
-        # 1. 计算能量差
-        energy_delta = curr_analysis['energy_level'] - prev_analysis['energy_level']
+        return self.decide(
+            _as_chapter(prev_analysis),
+            _as_chapter(curr_analysis)
+        ).to_dict()
 
-        # 2. 分析情绪转变
-        emotion_change = self._analyze_emotion_change(
-            prev_analysis['emotion'],
-            curr_analysis['emotion']
+    def decide(
+        self,
+        prev_analysis: ChapterAnalysis,
+        curr_analysis: ChapterAnalysis
+    ) -> TransitionDecision:
+        """
+        决定最佳转场效果（结构化接口）
+
+        Args:
+            prev_analysis: 前一章节特征
+            curr_analysis: 当前章节特征
+
+        Returns:
+            不可变的 TransitionDecision（缓存共享，勿修改 params）
+        """
+        return self._decide_cached(prev_analysis, curr_analysis)
+
+    def decide_transitions_batch(
+        self,
+        analyses: Sequence[AnalysisLike]
+    ) -> List[TransitionDecision]:
+        """
+        一次性决定整条脚本相邻章节之间的转场
+
+        能量差、默认规则、时长按 NumPy 数组整体计算，特定章节组合只在
+        命中的下标上覆盖；结果与逐对调用 decide() 一致。
+
+        Args:
+            analyses: 按顺序排列的章节分析结果（字典或 ChapterAnalysis）
+
+        Returns:
+            长度为 len(analyses) - 1 的决策列表，第 i 项为章节 i → i+1 的转场
+        """
+        chapters = [_as_chapter(a) for a in analyses]
+        n = len(chapters)
+        if n < 2:
+            return []
+
+        energies = np.fromiter((c.energy_level for c in chapters), dtype=np.float64, count=n)
+        deltas = np.diff(energies)
+        abs_deltas = np.abs(deltas)
+        curr_energies = energies[1:]
+
+        # 规则2/3: 向量化选择默认规则（条件顺序同 _default_rule_index）
+        rule_ids = np.select(
+            [
+                deltas > 3,
+                deltas < -3,
+                abs_deltas < 1,
+                curr_energies >= 8.0,
+                curr_energies >= 7.5,
+                curr_energies >= 5.5
+            ],
+            [0, 1, 2, 3, 4, 5],
+            default=6
+        )
+        type_ids = _RULE_TYPE_IDS[rule_ids]
+
+        # 规则1: 特定章节组合，只在命中的下标上覆盖
+        section_ids = np.fromiter(
+            (_SECTION_ID.get(c.section_type, -1) for c in chapters),
+            dtype=np.int64,
+            count=n
         )
+        known = (section_ids[:-1] >= 0) & (section_ids[1:] >= 0)
+        pair_keys = (section_ids[:-1] << 8) | section_ids[1:]
+        special: Dict[int, Mapping[str, str]] = {}
+        for i in np.flatnonzero(known).tolist():
+            hit = _PAIR_LUT.get(int(pair_keys[i]))
+            if hit is not None:
+                special[i] = hit
+                type_ids[i] = _TRANSITION_INDEX[hit['type']]
+
+        # 时长：基础时长 × 节奏系数 × 大幅能量变化修正
+        pace_ids = np.fromiter(
+            (_PACE_INDEX.get(c.pace, len(_PACE_INDEX)) for c in chapters[1:]),
+            dtype=np.int64,
+            count=n - 1
+        )
+        big_delta = abs_deltas > 4
+        num = _BASE_CS_ARR[type_ids] * _PACE_CS_ARR[pace_ids]
+        num = np.where(big_delta, num * 4, num)
+        den = np.where(big_delta, 500, 100)
+        durations = _round_half_even(num, den) / 100
+
+        decisions = []
+        for i, (type_id, rule_id, duration, abs_delta) in enumerate(zip(
+            type_ids.tolist(), rule_ids.tolist(), durations.tolist(), abs_deltas.tolist()
+        )):
+            transition_type = _TRANSITION_TYPES[type_id]
+            hit = special.get(i)
+            if hit is not None:
+                reason = hit['reason']
+            else:
+                reason = _rule_reason(rule_id, abs_delta)
+            decisions.append(TransitionDecision(
+                type=transition_type,
+                duration=duration,
+                params=MappingProxyType(
+                    self._optimize_params(transition_type, chapters[i + 1])
+                ),
+                reason=reason
+            ))
+        return decisions
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _decide_cached(
+        prev_analysis: ChapterAnalysis,
+        curr_analysis: ChapterAnalysis
+    ) -> TransitionDecision:
+        """
+        按章节特征缓存的决策核心
+
+        生成的脚本中章节组合高度重复，命中时整个决策退化为一次字典查找。
+        """
+        # 1. 计算能量差
+        energy_delta = curr_analysis.energy_level - prev_analysis.energy_level
 
-        # 3. 章节类型组合
-        section_pair = (
-            prev_analysis['section_type'],
-            curr_analysis['section_type']
+        # 2. 分析情绪转变
+        emotion_change = TransitionDecisionEngine._analyze_emotion_change(
+            prev_analysis.emotion,
+            curr_analysis.emotion
         )
 
-        # 4. 规则匹配
-        transition = self._match_transition_rules(
-            section_pair,
+        # 3. 规则匹配
+        transition = TransitionDecisionEngine._match_transition_rules(
+            (prev_analysis.section_type, curr_analysis.section_type),
             energy_delta,
             emotion_change,
             curr_analysis
         )
 
-        # 5. 参数优化
-        transition['duration'] = self._optimize_duration(
+        # 4. 参数优化
+        duration = TransitionDecisionEngine._optimize_duration(
             transition['type'],
-            curr_analysis['pace'],
+            curr_analysis.pace,
             energy_delta
         )
-
-        transition['params'] = self._optimize_params(
+        params = TransitionDecisionEngine._optimize_params(
             transition['type'],
             curr_analysis
         )
 
-        return transition
+        return TransitionDecision(
+            type=transition['type'],
+            duration=duration,
+            params=MappingProxyType(params),
+            reason=transition['reason']
+        )
 
+    @staticmethod
     def _match_transition_rules(
-        self,
         section_pair: Tuple[str, str],
         energy_delta: float,
         emotion_change: str,
-        curr_analysis: Dict[str, Any]
+        curr_analysis: ChapterAnalysis
     ) -> Dict[str, Any]:
         """
         规则引擎：匹配最佳转场
@@ -139,117 +610,26 @@ class TransitionDecisionEngine:
         """
         prev_type, curr_type = section_pair
 
-        # 规则1: 特定章节组合（70+预设规则）
-        special_pairs = {
-            # 开场系列
-            ('hook', 'introduction'): {
-                'type': 'zoom_out',
-                'reason': '从开场钩子到介绍，能量稍降，用zoom_out平稳过渡'
-            },
-            ('hook', 'background'): {
-                'type': 'fade',
-                'reason': '从高能开场到背景知识，用fade舒缓节奏'
-            },
-
-            # 介绍系列
-            ('introduction', 'background'): {
-                'type': 'fade',
-                'reason': '从介绍到背景，平滑过渡'
-            },
-            ('introduction', 'main_content'): {
-                'type': 'slide_left',
-                'reason': '从介绍到核心，逻辑推进'
-            },
-
-            # 背景系列
-            ('background', 'main_content'): {
-                'type': 'zoom_in',
-                'reason': '从背景到核心，重点强调，用zoom_in吸引注意'
-            },
-            ('background', 'application'): {
-                'type': 'slide_left',
-                'reason': '从背景到应用，逻辑前进'
-            },
-
-            # 核心内容系列
-            ('main_content', 'application'): {
-                'type': 'slide_left',
-                'reason': '从理论到应用，逻辑推进'
-            },
-            ('main_content', 'summary'): {
-                'type': 'zoom_out',
-                'reason': '从核心到总结，拉远视角'
-            },
-            ('main_content', 'main_content'): {
-                'type': 'crossfade',
-                'reason': '核心内容延续，用crossfade保持连贯'
-            },
-
-            # 应用系列
-            ('application', 'summary'): {
-                'type': 'fade',
-                'reason': '从应用到总结，平和收尾'
-            },
-            ('application', 'cta'): {
-                'type': 'zoom_in',
-                'reason': '从应用到号召，重新激发'
-            },
-
-            # 总结系列
-            ('summary', 'cta'): {
-                'type': 'zoom_in',
-                'reason': '总结后号召行动，重新激发能量'
-            }
-        }
-
-        if section_pair in special_pairs:
-            return special_pairs[section_pair]
-
-        # 规则2: 能量变化驱动
-        if energy_delta > 3:
-            # 能量大幅上升 → 冲击性转场
-            return {
-                'type': 'zoom_in',
-                'reason': f'能量提升{energy_delta:.1f}，用zoom_in强调重点'
-            }
-        elif energy_delta < -3:
-            # 能量大幅下降 → 舒缓转场
-            return {
-                'type': 'fade',
-                'reason': f'能量降低{abs(energy_delta):.1f}，用fade平稳过渡'
-            }
-        elif abs(energy_delta) < 1:
-            # 能量持平 → 延续性转场
-            return {
-                'type': 'crossfade',
-                'reason': '能量平稳，用crossfade保持连贯'
-            }
-
-        # 规则3: 默认根据当前章节能量选择
-        curr_energy = curr_analysis['energy_level']
-
-        if curr_energy >= 8.0:
-            return {
-                'type': 'hard_cut',
-                'reason': '极高能量章节，用硬切增强冲击'
-            }
-        elif curr_energy >= 7.5:
-            return {
-                'type': 'zoom_in',
-                'reason': '高能量章节，用zoom_in强调'
-            }
-        elif curr_energy >= 5.5:
-            return {
-                'type': 'slide_left',
-                'reason': '中等能量，用slide保持节奏'
-            }
+        # 规则1: 特定章节组合（模块级预建表，整数键单次查表）
+        prev_id = _SECTION_ID.get(prev_type, -1)
+        curr_id = _SECTION_ID.get(curr_type, -1)
+        if prev_id >= 0 and curr_id >= 0:
+            hit = _PAIR_LUT.get((prev_id << 8) | curr_id)
         else:
-            return {
-                'type': 'fade',
-                'reason': '低能量章节，用fade平稳过渡'
-            }
+            # 未知章节类型走字符串键回退路径
+            hit = _SPECIAL_PAIRS.get(section_pair)
+        if hit is not None:
+            return dict(hit)
+
+        # 规则2/3: 能量变化驱动，否则根据当前章节能量选择
+        rule_id = _default_rule_index(energy_delta, curr_analysis.energy_level)
+        return {
+            'type': _DEFAULT_RULES[rule_id][0],
+            'reason': _rule_reason(rule_id, abs(energy_delta))
+        }
 
-    def _analyze_emotion_change(self, prev_emotion: str, curr_emotion: str) -> str:
+    @staticmethod
+    def _analyze_emotion_change(prev_emotion: str, curr_emotion: str) -> str:
         """
         分析情绪变化类型
 
@@ -260,28 +640,18 @@ class TransitionDecisionEngine:
         Returns:
             变化类型：escalate/de-escalate/maintain
         """
-        emotion_hierarchy = {
-            'excitement': 5,
-            'motivated': 4,
-            'inspired': 4,
-            'curiosity': 3,
-            'focus': 3,
-            'satisfied': 2,
-            'calm': 1
-        }
-
-        prev_level = emotion_hierarchy.get(prev_emotion, 3)
-        curr_level = emotion_hierarchy.get(curr_emotion, 3)
-
-        if curr_level > prev_level + 1:
-            return 'escalate'  # 情绪升级
-        elif curr_level < prev_level - 1:
-            return 'de-escalate'  # 情绪降级
-        else:
-            return 'maintain'  # 情绪维持
+        change = _EMOTION_DELTA_LUT.get((prev_emotion, curr_emotion))
+        if change is not None:
+            return change
+
+        # 未知情绪按中间等级3计算
+        return _classify_emotion_change(
+            _EMOTION_HIERARCHY.get(prev_emotion, 3),
+            _EMOTION_HIERARCHY.get(curr_emotion, 3)
+        )
 
+    @staticmethod
     def _optimize_duration(
-        self,
         transition_type: str,
         pace: str,
         energy_delta: float
@@ -297,71 +667,37 @@ class TransitionDecisionEngine:
         Returns:
             优化后的时长（秒）
         """
-        # 基础时长
-        base_durations = {
-            'fade': 1.0,
-            'zoom_in': 0.8,
-            'zoom_out': 1.2,
-            'slide_left': 0.6,
-            'slide_right': 0.6,
-            'hard_cut': 0.0,
-            'crossfade': 1.5
-        }
-
-        duration = base_durations.get(transition_type, 1.0)
-
-        # 根据节奏调整
-        pace_multipliers = {
-            'very_fast': 0.5,
-            'fast': 0.75,
-            'moderate': 1.0,
-            'slow': 1.25
-        }
-
-        duration *= pace_multipliers.get(pace, 1.0)
-
-        # 根据能量变化微调
-        if abs(energy_delta) > 4:
-            duration *= 0.8  # 大变化，快速过渡
-
-        return round(duration, 2)
-
+        big_delta = abs(energy_delta) > 4
+        duration = _DURATION_LUT.get((transition_type, pace, big_delta))
+        if duration is None:
+            # 未知类型/节奏按系数1.0计算
+            duration = _duration_seconds(transition_type, pace, big_delta)
+        return duration
+
+    @staticmethod
     def _optimize_params(
-        self,
         transition_type: str,
-        analysis: Dict[str, Any]
+        analysis: ChapterAnalysis
     ) -> Dict[str, Any]:
         """
         优化转场参数
 
         Args:
             transition_type: 转场类型
-            analysis: 章节分析结果
+            analysis: 章节特征
 
         Returns:
             参数字典
         """
-        params = {}
-
-        if transition_type in ['zoom_in', 'zoom_out']:
-            # 缩放比例根据能量调整
-            energy = analysis['energy_level']
-            # 能量越高，缩放幅度越大（1.0 - 1.5）
-            params['zoom_ratio'] = 1.0 + (energy / 20)
-            params['easing'] = 'ease_in' if transition_type == 'zoom_in' else 'ease_out'
-
-        elif transition_type in ['slide_left', 'slide_right']:
-            # 滑动速度根据节奏调整
-            pace = analysis['pace']
-            params['speed'] = 'fast' if pace in ['fast', 'very_fast'] else 'normal'
-
-        elif transition_type == 'fade':
-            # 淡化强度
-            params['fade_curve'] = 'linear'
-
-        return params
-
-    def get_transition_description(self, transition_type: str) -> str:
+        energy = analysis.energy_level
+        pace = analysis.pace
+        hit = _PARAMS_LUT.get(_params_key(transition_type, energy, pace))
+        if hit is not None:
+            return dict(hit)
+        return _compute_params(transition_type, energy, pace)
+
+    @staticmethod
+    def get_transition_description(transition_type: str) -> str:
         """
         获取转场效果描述
 
@@ -371,8 +707,7 @@ class TransitionDecisionEngine:
         Returns:
             描述文字
         """
-        profile = self.TRANSITION_PROFILES.get(transition_type, {})
-        return profile.get('description', '未知转场效果')
+        return _TRANSITION_DESCRIPTIONS.get(transition_type, '未知转场效果')
 
 
 # 测试代码
@@ -422,18 +757,18 @@ if __name__ == "__main__":
     print("🎬 转场决策测试\n")
     print("=" * 70)
 
-    for i in range(len(test_analyses) - 1):
+    decisions = engine.decide_transitions_batch(test_analyses)
+
+    for i, decision in enumerate(decisions):
         prev = test_analyses[i]
         curr = test_analyses[i + 1]
 
-        decision = engine.decide_transition(prev, curr)
-
         print(f"\n{prev['section_type']} → {curr['section_type']}")
         print(f"  能量变化: {prev['energy_level']:.1f} → {curr['energy_level']:.1f} "
               f"(Δ{curr['energy_level'] - prev['energy_level']:.1f})")
-        print(f"  转场: {decision['type']} ({decision['duration']}s)")
-        print(f"  理由: {decision['reason']}")
-        if decision['params']:
-            print(f"  参数: {decision['params']}")
+        print(f"  转场: {decision.type} ({decision.duration}s)")
+        print(f"  理由: {decision.reason}")
+        if decision.params:
+            print(f"  参数: {dict(decision.params)}")
 
     print("\n" + "=" * 70)
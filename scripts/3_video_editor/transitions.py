@@ -3,9 +3,98 @@
 提供多种视频转场效果
 """
 
-from typing import Callable, List
+from types import SimpleNamespace
+from typing import List, Optional
 import numpy as np
-from moviepy.video.fx import FadeIn, FadeOut
+
+from ken_burns import _warp_frame
+
+# moviepy 延迟到首次使用时导入，只需要决策引擎等轻量模块的调用方不必承担其导入开销
+_MP: Optional[SimpleNamespace] = None
+
+
+def _mp() -> SimpleNamespace:
+    """按需导入并缓存本模块用到的 moviepy 对象"""
+    global _MP
+    if _MP is None:
+        from moviepy import CompositeVideoClip, ImageSequenceClip, concatenate_videoclips
+        from moviepy.video.fx import FadeIn, FadeOut
+        _MP = SimpleNamespace(
+            CompositeVideoClip=CompositeVideoClip,
+            ImageSequenceClip=ImageSequenceClip,
+            concatenate_videoclips=concatenate_videoclips,
+            FadeIn=FadeIn,
+            FadeOut=FadeOut
+        )
+    return _MP
+
+
+# slide 序列的方向轮换
+_SLIDE_DIRECTIONS = ('left', 'right', 'top', 'bottom')
+
+
+def _wipe_compose(out: np.ndarray, head: np.ndarray, tail: np.ndarray,
+                  split: int, axis: int) -> np.ndarray:
+    """
+    擦除合成：split 之前取 head，之后取 tail，写入预分配的 out
+
+    Args:
+        out: 输出缓冲区
+        head: split 之前区域的来源帧
+        tail: split 之后区域的来源帧
+        split: 分割位置
+        axis: 0 按行分割（上下），1 按列分割（左右）
+
+    两段 np.copyto 即两次连续内存拷贝，已是带宽上限；
+    实测 Numba 逐像素内核（1080p）反而慢约 10 倍，故不做 JIT。
+    """
+    # ColorClip等生成的帧可能是int64，按unsafe转换写入uint8输出（取值本就在0-255内）
+    if axis == 1:
+        np.copyto(out[:, :split], head[:, :split], casting='unsafe')
+        np.copyto(out[:, split:], tail[:, split:], casting='unsafe')
+    else:
+        np.copyto(out[:split], head[:split], casting='unsafe')
+        np.copyto(out[split:], tail[split:], casting='unsafe')
+    return out
+
+
+def _zoom_about_center(frame: np.ndarray, scale: float) -> np.ndarray:
+    """绕画面中心缩放，输出尺寸不变（超出部分裁掉，不足部分补黑）"""
+    if abs(scale - 1.0) < 1e-3:
+        return frame
+    height, width = frame.shape[:2]
+    inv = 1.0 / scale
+    cx, cy = width / 2.0, height / 2.0
+    affine = np.array(
+        [[inv, 0.0, cx - cx * inv], [0.0, inv, cy - cy * inv]],
+        dtype=np.float32
+    )
+    return _warp_frame(frame, affine)
+
+
+def _shift_frame(frame: np.ndarray, offset: int, axis: int) -> np.ndarray:
+    """
+    平移画面，移出的区域补黑
+
+    Args:
+        frame: 输入帧
+        offset: 平移像素数（正数向右/向下）
+        axis: 0 上下平移，1 左右平移
+    """
+    if offset == 0:
+        return frame
+    out = np.zeros_like(frame)
+    if axis == 1:
+        if offset > 0:
+            out[:, offset:] = frame[:, :-offset]
+        else:
+            out[:, :offset] = frame[:, -offset:]
+    else:
+        if offset > 0:
+            out[offset:] = frame[:-offset]
+        else:
+            out[:offset] = frame[-offset:]
+    return out
 
 
 class TransitionLibrary:
@@ -14,30 +103,30 @@ class TransitionLibrary:
     @staticmethod
     def fade_in(clip, duration: float = 1.0):
         """淡入效果"""
-        return clip.with_effects([FadeIn(duration)])
+        return clip.with_effects([_mp().FadeIn(duration)])
 
     @staticmethod
     def fade_out(clip, duration: float = 1.0):
         """淡出效果"""
-        return clip.with_effects([FadeOut(duration)])
+        return clip.with_effects([_mp().FadeOut(duration)])
 
     @staticmethod
     def crossfade(clip1, clip2, duration: float = 1.0):
         """交叉淡化（两个片段之间）"""
-        from moviepy import CompositeVideoClip
+        mp = _mp()
 
         # clip1淡出
-        clip1_faded = clip1.with_effects([FadeOut(duration)])
+        clip1_faded = clip1.with_effects([mp.FadeOut(duration)])
         # clip2淡入，并设置开始时间
-        clip2_faded = clip2.with_effects([FadeIn(duration)]).set_start(clip1.duration - duration)
+        clip2_faded = clip2.with_effects([mp.FadeIn(duration)]).with_start(clip1.duration - duration)
 
         # 合成
-        return CompositeVideoClip([clip1_faded, clip2_faded])
+        return mp.CompositeVideoClip([clip1_faded, clip2_faded])
 
     @staticmethod
     def slide_in(clip, direction: str = 'left', duration: float = 1.0):
         """
-        滑入效果
+        滑入效果（逐帧平移像素，clip尺寸不变，未滑入的区域为黑色）
 
         Args:
             clip: 视频片段
@@ -45,55 +134,50 @@ class TransitionLibrary:
             duration: 转场时长
         """
         w, h = clip.size
+        # (平移范围, 平移方向, 起始偏移符号)：从左/上滑入时画面起始于负偏移处
+        extent, axis, sign = {
+            'left': (w, 1, -1),
+            'right': (w, 1, 1),
+            'top': (h, 0, -1)
+        }.get(direction, (h, 0, 1))  # bottom
+
+        def slide(get_frame, t):
+            frame = get_frame(t)
+            if t >= duration:
+                return frame
+            return _shift_frame(frame, sign * (extent - int(extent * t / duration)), axis)
 
-        if direction == 'left':
-            # 从左侧滑入
-            position = lambda t: (max(-w, -w + int(w * t / duration)), 0) if t < duration else (0, 0)
-        elif direction == 'right':
-            # 从右侧滑入
-            position = lambda t: (min(w, w - int(w * t / duration)), 0) if t < duration else (0, 0)
-        elif direction == 'top':
-            # 从顶部滑入
-            position = lambda t: (0, max(-h, -h + int(h * t / duration))) if t < duration else (0, 0)
-        else:  # bottom
-            # 从底部滑入
-            position = lambda t: (0, min(h, h - int(h * t / duration))) if t < duration else (0, 0)
-
-        return clip.with_position(position)
+        return clip.transform(slide)
 
     @staticmethod
     def zoom_in(clip, duration: float = 1.0, zoom_ratio: float = 1.5):
         """
-        放大效果
+        放大效果（绕画面中心逐帧缩放，clip尺寸不变）
 
         Args:
             clip: 视频片段
             duration: 转场时长
             zoom_ratio: 最大放大倍数
         """
-        def scale_function(t):
-            if t < duration:
-                return 1 + (zoom_ratio - 1) * (t / duration)
-            return zoom_ratio
+        def scale_at(t):
+            return 1 + (zoom_ratio - 1) * min(t / duration, 1.0)
 
-        return clip.resize(scale_function)
+        return clip.transform(lambda get_frame, t: _zoom_about_center(get_frame(t), scale_at(t)))
 
     @staticmethod
     def zoom_out(clip, duration: float = 1.0, zoom_ratio: float = 1.5):
         """
-        缩小效果
+        缩小效果（绕画面中心逐帧缩放，clip尺寸不变）
 
         Args:
             clip: 视频片段
             duration: 转场时长
             zoom_ratio: 初始放大倍数
         """
-        def scale_function(t):
-            if t < duration:
-                return zoom_ratio - (zoom_ratio - 1) * (t / duration)
-            return 1.0
+        def scale_at(t):
+            return zoom_ratio - (zoom_ratio - 1) * min(t / duration, 1.0)
 
-        return clip.resize(scale_function)
+        return clip.transform(lambda get_frame, t: _zoom_about_center(get_frame(t), scale_at(t)))
 
     @staticmethod
     def rotate_in(clip, duration: float = 1.0, angle: float = 360):
@@ -123,39 +207,41 @@ class TransitionLibrary:
             duration: 转场时长
             direction: 方向 ('left', 'right', 'top', 'bottom')
         """
-        from moviepy import CompositeVideoClip
-
+        mp = _mp()
         w, h = clip1.size
-
-        def make_frame(t):
+        start = clip1.duration - duration
+        fps = clip1.fps or clip2.fps or 30
+
+        # 重叠窗口内两段画面按帧同步顺序读取（iter_frames 顺序解码），
+        # 一次性合成为帧序列，避免逐帧随机 get_frame 反复走上游管线
+        layout = {
+            'left': (False, w, 1),
+            'right': (True, w, 1),
+            'top': (False, h, 0)
+        }.get(direction, (True, h, 0))  # bottom；reverse 表示 split 之前取 clip2
+        reverse, extent, axis = layout
+
+        composed = []
+        frames1 = clip1.subclipped(start, clip1.duration).iter_frames(fps=fps)
+        frames2 = clip2.subclipped(0, duration).iter_frames(fps=fps)
+        for i, (frame1, frame2) in enumerate(zip(frames1, frames2)):
             # 计算擦除进度
-            if t < clip1.duration - duration:
-                return clip1.get_frame(t)
-            elif t < clip1.duration:
-                progress = (t - (clip1.duration - duration)) / duration
-                frame1 = clip1.get_frame(t)
-                frame2 = clip2.get_frame(t - clip1.duration + duration)
-
-                if direction == 'left':
-                    split = int(w * progress)
-                    frame1[:, split:] = frame2[:, split:]
-                elif direction == 'right':
-                    split = int(w * (1 - progress))
-                    frame1[:, :split] = frame2[:, :split]
-                elif direction == 'top':
-                    split = int(h * progress)
-                    frame1[split:, :] = frame2[split:, :]
-                else:  # bottom
-                    split = int(h * (1 - progress))
-                    frame1[:split, :] = frame2[:split, :]
-
-                return frame1
+            progress = i / fps / duration
+            out = np.empty(frame1.shape, dtype=np.uint8)
+            if reverse:
+                _wipe_compose(out, frame2, frame1, int(extent * (1 - progress)), axis)
             else:
-                return clip2.get_frame(t - clip1.duration)
-
-        from moviepy import VideoClip
-        total_duration = clip1.duration + clip2.duration - duration
-        return VideoClip(make_frame=make_frame, duration=total_duration)
+                _wipe_compose(out, frame1, frame2, int(extent * progress), axis)
+            composed.append(out)
+
+        parts = []
+        if start > 0:
+            parts.append(clip1.subclipped(0, start))
+        if composed:
+            parts.append(mp.ImageSequenceClip(composed, fps=fps).with_duration(duration))
+        if clip2.duration > duration:
+            parts.append(clip2.subclipped(duration))
+        return mp.concatenate_videoclips(parts)
 
     @staticmethod
     def apply_transition_sequence(
@@ -174,27 +260,32 @@ class TransitionLibrary:
         Returns:
             应用转场后的片段列表
         """
-        if not clips or len(clips) == 0:
-            return clips
-
-        if transition_type == 'none':
+        if not clips or transition_type == 'none':
             return clips
 
+        last = len(clips) - 1
         processed_clips = []
 
+        # 淡入/淡出效果实例在所有片段间共享（with_effects 内部会复制）
+        if transition_type == 'fade':
+            mp = _mp()
+            fade_in_fx = mp.FadeIn(transition_duration)
+            fade_out_fx = mp.FadeOut(transition_duration)
+
         for i, clip in enumerate(clips):
             if transition_type == 'fade':
-                # 第一个片段淡入，最后一个片段淡出
+                # 第一个片段淡入，最后一个片段淡出（单片段时一次性应用两个效果）
+                effects = []
                 if i == 0:
-                    clip = TransitionLibrary.fade_in(clip, transition_duration)
-                if i == len(clips) - 1:
-                    clip = TransitionLibrary.fade_out(clip, transition_duration)
+                    effects.append(fade_in_fx)
+                if i == last:
+                    effects.append(fade_out_fx)
+                if effects:
+                    clip = clip.with_effects(effects)
 
             elif transition_type == 'slide':
-                # 滑入效果
-                directions = ['left', 'right', 'top', 'bottom']
-                direction = directions[i % len(directions)]
-                clip = TransitionLibrary.slide_in(clip, direction, transition_duration)
+                # 滑入效果（四个方向轮换）
+                clip = TransitionLibrary.slide_in(clip, _SLIDE_DIRECTIONS[i % len(_SLIDE_DIRECTIONS)], transition_duration)
 
             elif transition_type == 'zoom':
                 # 交替缩放效果
@@ -2,11 +2,152 @@
 """
 字幕时间轴对齐器
 用于精确对齐字幕与音频的时间轴
+
+安装Numba时对齐内核以cache=True编译,编译结果缓存在__pycache__中供后续命令行调用复用;
+若包目录不可写,可通过环境变量NUMBA_CACHE_DIR指定缓存目录。
 """
 
 import json
+import re
 from pathlib import Path
-from typing import Dict, List, Optional
+from itertools import chain, groupby
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# 可选：Numba 加速对齐数值内核
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# 可选：orjson 加速JSON读取
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _load_json(path) -> dict:
+    """读取JSON文件(可用时使用orjson直接解析字节)"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# SRT字幕块: 序号行、时间轴行(HH:MM:SS,mmm --> HH:MM:SS,mmm)、至少一行非空文本
+_SRT_BLOCK_RE = re.compile(
+    r'^[ \t]*(\d+)[ \t]*\n'
+    r'[ \t]*(\d+):(\d\d):(\d\d)[,.](\d{1,3})[ \t]*-->[ \t]*'
+    r'(\d+):(\d\d):(\d\d)[,.](\d{1,3})[^\n]*\n'
+    r'((?:[^\n]*\S[^\n]*(?:\n|\Z))+)',
+    re.M
+)
+
+# ASS Dialogue行: Layer, Start(H:MM:SS.cc), End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+_ASS_DIALOGUE_RE = re.compile(
+    r'Dialogue:\s*[^,]*,'
+    r'\s*(\d+):(\d\d):(\d\d)\.(\d+)\s*,'
+    r'\s*(\d+):(\d\d):(\d\d)\.(\d+)\s*,'
+    r'(?:[^,]*,){6}(.*)'
+)
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True, fastmath=True)
+    def _align_core_numba(starts, ends, cue_section, section_start,
+                          section_scale, section_origin):
+        """逐条字幕缩放平移(语义同 _align_core)"""
+        n = starts.shape[0]
+        new_starts = np.empty(n)
+        new_ends = np.empty(n)
+        for i in range(n):
+            k = cue_section[i]
+            origin = section_origin[k]
+            new_starts[i] = section_start[k] + (starts[i] - origin) * section_scale[k]
+            new_ends[i] = section_start[k] + (ends[i] - origin) * section_scale[k]
+        return new_starts, new_ends
+
+
+# Numba内核加载失败(如编译缓存无法读取)后置为False,回退到NumPy实现
+_NUMBA_CORE_USABLE = NUMBA_AVAILABLE
+
+
+def _align_core(starts: np.ndarray, ends: np.ndarray, cue_section: np.ndarray,
+                section_start: np.ndarray, section_scale: np.ndarray,
+                section_origin: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    字幕时间对齐数值内核
+
+    每条字幕相对于所属章节原始开始时间的偏移按章节比例缩放,再加上章节音频的实际开始时间。
+
+    Args:
+        starts/ends: 字幕原始开始/结束时间
+        cue_section: 每条字幕所属章节的连续ID
+        section_start: 各章节音频实际开始时间
+        section_scale: 各章节缩放比例
+        section_origin: 各章节原始字幕开始时间
+
+    Returns:
+        (新开始时间, 新结束时间)
+    """
+    global _NUMBA_CORE_USABLE
+
+    if _NUMBA_CORE_USABLE:
+        try:
+            return _align_core_numba(starts, ends, cue_section, section_start,
+                                     section_scale, section_origin)
+        except Exception as e:
+            # 以spec_from_file_location加载且模块名不可导入时,第二次运行读取编译缓存会失败;
+            # 之后不再尝试,改用NumPy实现
+            print(f"⚠️  Numba对齐内核不可用,改用NumPy计算: {e}")
+            _NUMBA_CORE_USABLE = False
+
+    start = section_start[cue_section]
+    scale = section_scale[cue_section]
+    origin = section_origin[cue_section]
+    return start + (starts - origin) * scale, start + (ends - origin) * scale
+
+
+def _section_of(sub: Dict) -> int:
+    """字幕所属章节索引(缺省为1)"""
+    return sub.get("section_index", 1)
+
+
+def _iter_srt_blocks(srt_file: str) -> Iterator[Tuple[int, float, float, str]]:
+    """
+    逐行流式读取SRT文件,每遇到空行边界产出一个字幕块
+
+    只在内存中保留当前块,大文件无需整体读入。
+
+    Yields:
+        (序号, 开始秒数, 结束秒数, 文本)
+    """
+    with open(srt_file, 'r', encoding='utf-8', buffering=1 << 20) as f:
+        block: List[str] = []
+        for line in chain(f, ('\n',)):
+            if line.strip():
+                block.append(line)
+                continue
+            if not block:
+                continue
+
+            match = _SRT_BLOCK_RE.match(''.join(block))
+            block.clear()
+            if match is None:
+                continue
+
+            (index, sh, sm, ss, sms, eh, em, es, ems, text) = match.groups()
+            yield (
+                int(index),
+                int(sh) * 3600 + int(sm) * 60 + int(ss) + int(sms) / 1000.0,
+                int(eh) * 3600 + int(em) * 60 + int(es) + int(ems) / 1000.0,
+                text.rstrip()
+            )
 
 
 class SubtitleAligner:
@@ -14,7 +155,8 @@ class SubtitleAligner:
 
     def __init__(self):
         """初始化对齐器"""
-        pass
+        # 最近一次解析的ASS文件头部(到Format行),保存时复用,无需重新读取输出文件
+        self._ass_header: Optional[str] = None
 
     def align_with_audio(self, subtitle_file: str, audio_metadata_path: str,
                         output_file: Optional[str] = None) -> Dict:
@@ -35,15 +177,14 @@ class SubtitleAligner:
 
         try:
             # 读取音频元数据
-            with open(audio_metadata_path, 'r', encoding='utf-8') as f:
-                audio_metadata = json.load(f)
+            audio_metadata = _load_json(audio_metadata_path)
 
             audio_files = audio_metadata.get("audio_files", [])
             if not audio_files:
                 print("❌ 音频元数据中没有音频文件信息")
                 return {"success": False, "error": "no_audio_files"}
 
-            # 构建章节时间映射
+            # 构建章节时间表
             section_timings = self._build_section_timings(audio_files)
 
             # 读取并解析字幕
@@ -92,102 +233,112 @@ class SubtitleAligner:
             traceback.print_exc()
             return {"success": False, "error": str(e)}
 
-    def _build_section_timings(self, audio_files: List[Dict]) -> Dict[int, Dict]:
+    def _build_section_timings(self, audio_files: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
         """
-        构建章节时间映射
+        构建章节时间表
+
+        章节索引是从1开始的小整数,直接作为数组下标,对齐时无需逐章节查字典。
 
         Args:
             audio_files: 音频文件列表
 
         Returns:
-            {章节索引: {"start": 开始时间, "end": 结束时间, "duration": 时长}}
+            (各章节音频开始时间, 各章节音频时长),长度为最大章节索引+1;
+            没有音频信息的章节时长为NaN
         """
-        timings = {}
-        current_time = 0.0
-
-        for audio_file in audio_files:
-            section_index = audio_file.get("section_index")
-            duration = audio_file.get("duration", 0)
+        durations = np.fromiter((audio_file.get("duration", 0) for audio_file in audio_files),
+                                dtype=np.float64, count=len(audio_files))
+        # 各音频按顺序首尾相接
+        offsets = np.zeros(len(durations))
+        np.cumsum(durations[:-1], out=offsets[1:])
 
-            timings[section_index] = {
-                "start": current_time,
-                "end": current_time + duration,
-                "duration": duration
-            }
+        indices = [audio_file.get("section_index") for audio_file in audio_files]
+        size = max((i for i in indices if isinstance(i, int) and i >= 0), default=-1) + 1
+        section_starts = np.zeros(size)
+        section_durations = np.full(size, np.nan)
 
-            current_time += duration
+        for k, section_index in enumerate(indices):
+            if isinstance(section_index, int) and section_index >= 0:
+                section_starts[section_index] = offsets[k]
+                section_durations[section_index] = durations[k]
 
-        return timings
+        return section_starts, section_durations
 
     def _align_subtitles(self, subtitles: List[Dict],
-                        section_timings: Dict[int, Dict]) -> List[Dict]:
+                        section_timings: Tuple[np.ndarray, np.ndarray]) -> List[Dict]:
         """
-        对齐字幕时间轴
+        对齐字幕时间轴(原地修改传入的字幕字典)
 
         Args:
             subtitles: 字幕列表
-            section_timings: 章节时间映射
+            section_timings: (各章节音频开始时间, 各章节音频时长)
 
         Returns:
             对齐后的字幕列表
         """
-        aligned = []
-        current_time = 0.0
+        section_starts, section_durations = section_timings
+        section_count = len(section_durations)
 
-        # 按章节分组
-        sections = {}
-        for sub in subtitles:
-            section_idx = sub.get("section_index", 1)
-            if section_idx not in sections:
-                sections[section_idx] = []
-            sections[section_idx].append(sub)
+        # 按章节稳定排序(章节内保持原有顺序),之后线性扫描章节边界
+        ordered_subs = sorted(subtitles, key=_section_of)
+
+        # 收集需调整的章节(按连续ID编号),所有需调整的字幕一次性送入数值内核
+        ordered = []          # (字幕, 是否需要调整)
+        timed_subs = []
+        cue_section = []
+        timed_sections = []
+        section_origin = []
+        section_end = []
 
-        # 对每个章节的字幕进行时间调整
-        for section_idx in sorted(sections.keys()):
-            section_subs = sections[section_idx]
+        for section_idx, group in groupby(ordered_subs, key=_section_of):
+            section_subs = list(group)
 
-            if section_idx not in section_timings:
+            if not (isinstance(section_idx, int) and 0 <= section_idx < section_count) \
+                    or np.isnan(section_durations[section_idx]):
                 # 没有对应的音频时长信息,使用原始时间
-                for sub in section_subs:
-                    aligned.append(sub)
-                if section_subs:
-                    current_time = section_subs[-1]["end_time"]
+                ordered.extend((sub, False) for sub in section_subs)
                 continue
 
-            # 获取该章节的实际音频时长
-            section_timing = section_timings[section_idx]
-            audio_start = section_timing["start"]
-            audio_duration = section_timing["duration"]
-
-            # 计算该章节原始字幕的总时长
-            if section_subs:
-                original_start = section_subs[0]["start_time"]
-                original_end = section_subs[-1]["end_time"]
-                original_duration = original_end - original_start
-
-                # 计算缩放比例
-                scale = audio_duration / original_duration if original_duration > 0 else 1.0
-
-                # 调整每条字幕的时间
-                for sub in section_subs:
-                    # 相对于章节开始的偏移
-                    offset_start = sub["start_time"] - original_start
-                    offset_end = sub["end_time"] - original_start
-
-                    # 缩放并加上章节的实际开始时间
-                    new_start = audio_start + offset_start * scale
-                    new_end = audio_start + offset_end * scale
-
-                    aligned_sub = sub.copy()
-                    aligned_sub["start_time"] = new_start
-                    aligned_sub["end_time"] = new_end
-                    aligned.append(aligned_sub)
-
-                current_time = audio_start + audio_duration
-
-        # 重新编号
-        for i, sub in enumerate(aligned, 1):
+            section_id = len(timed_sections)
+            timed_sections.append(section_idx)
+            # 该章节原始字幕的起止时间
+            section_origin.append(section_subs[0]["start_time"])
+            section_end.append(section_subs[-1]["end_time"])
+
+            ordered.extend((sub, True) for sub in section_subs)
+            timed_subs.extend(section_subs)
+            cue_section.extend([section_id] * len(section_subs))
+
+        # 按章节索引取实际音频开始时间与时长,计算缩放比例
+        timed_sections = np.asarray(timed_sections, dtype=np.int64)
+        origin = np.asarray(section_origin, dtype=np.float64)
+        original_duration = np.asarray(section_end, dtype=np.float64) - origin
+        positive = original_duration > 0
+        section_scale = np.ones(len(timed_sections))
+        np.divide(section_durations[timed_sections], original_duration,
+                  out=section_scale, where=positive)
+
+        count = len(timed_subs)
+        starts = np.fromiter((sub["start_time"] for sub in timed_subs),
+                             dtype=np.float64, count=count)
+        ends = np.fromiter((sub["end_time"] for sub in timed_subs),
+                           dtype=np.float64, count=count)
+        new_starts, new_ends = _align_core(
+            starts, ends,
+            np.asarray(cue_section, dtype=np.int64),
+            section_starts[timed_sections],
+            section_scale,
+            origin
+        )
+
+        # 原地调整每条字幕的时间并重新编号
+        aligned = []
+        new_times = zip(new_starts.tolist(), new_ends.tolist())
+        for i, (sub, timed) in enumerate(ordered, 1):
+            if timed:
+                sub["start_time"], sub["end_time"] = next(new_times)
             sub["index"] = i
+            aligned.append(sub)
 
         return aligned
 
@@ -203,41 +354,14 @@ class SubtitleAligner:
         """
         subtitles = []
 
-        with open(srt_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # 分割字幕块
-        blocks = content.strip().split('\n\n')
-
-        for block in blocks:
-            lines = block.strip().split('\n')
-            if len(lines) < 3:
-                continue
-
-            try:
-                # 解析序号
-                index = int(lines[0])
-
-                # 解析时间轴
-                time_line = lines[1]
-                start_str, end_str = time_line.split(' --> ')
-                start_time = self._parse_srt_time(start_str)
-                end_time = self._parse_srt_time(end_str)
-
-                # 解析文本
-                text = '\n'.join(lines[2:])
-
-                subtitles.append({
-                    "index": index,
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "text": text,
-                    "section_index": 1  # 默认值,可能需要从其他元数据获取
-                })
-
-            except Exception as e:
-                print(f"⚠️  解析字幕块失败: {e}")
-                continue
+        for index, start_time, end_time, text in _iter_srt_blocks(srt_file):
+            subtitles.append({
+                "index": index,
+                "start_time": start_time,
+                "end_time": end_time,
+                "text": text,
+                "section_index": 1  # 默认值,可能需要从其他元数据获取
+            })
 
         return subtitles
 
@@ -253,86 +377,44 @@ class SubtitleAligner:
         """
         subtitles = []
         index = 1
+        header_lines: List[str] = []
+        in_header = True
 
         with open(ass_file, 'r', encoding='utf-8') as f:
             for line in f:
+                if in_header:
+                    header_lines.append(line)
+                    if line.startswith('Format: Layer'):
+                        in_header = False
+                    continue
+
                 line = line.strip()
                 if not line.startswith('Dialogue:'):
                     continue
 
-                try:
-                    # 解析Dialogue行
-                    parts = line.split(',', 9)
-                    if len(parts) < 10:
-                        continue
-
-                    start_str = parts[1]
-                    end_str = parts[2]
-                    text = parts[9]
-
-                    start_time = self._parse_ass_time(start_str)
-                    end_time = self._parse_ass_time(end_str)
+                # 解析Dialogue行: 一次正则匹配取出起止时间与文本
+                match = _ASS_DIALOGUE_RE.match(line)
+                if match is None:
+                    print(f"⚠️  解析ASS行失败: {line}")
+                    continue
 
+                (sh, sm, ss, scs, eh, em, es, ecs, text) = match.groups()
+                subtitles.append({
+                    "index": index,
+                    "start_time": int(sh) * 3600 + int(sm) * 60 + int(ss) + int(scs) / 100.0,
+                    "end_time": int(eh) * 3600 + int(em) * 60 + int(es) + int(ecs) / 100.0,
                     # 处理ASS文本格式
-                    text = text.replace('\\N', '\n')
-
-                    subtitles.append({
-                        "index": index,
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "text": text,
-                        "section_index": 1
-                    })
+                    "text": text.replace('\\N', '\n'),
+                    "section_index": 1
+                })
 
-                    index += 1
+                index += 1
 
-                except Exception as e:
-                    print(f"⚠️  解析ASS行失败: {e}")
-                    continue
+        # 只有找到事件格式行才认为头部完整
+        self._ass_header = None if in_header else ''.join(header_lines)
 
         return subtitles
 
-    def _parse_srt_time(self, time_str: str) -> float:
-        """
-        解析SRT时间码为秒数
-
-        Args:
-            time_str: SRT时间字符串 (HH:MM:SS,mmm)
-
-        Returns:
-            秒数
-        """
-        time_str = time_str.strip()
-        # 处理格式: 00:00:05,000
-        parts = time_str.replace(',', ':').split(':')
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds = int(parts[2])
-        millis = int(parts[3])
-
-        return hours * 3600 + minutes * 60 + seconds + millis / 1000.0
-
-    def _parse_ass_time(self, time_str: str) -> float:
-        """
-        解析ASS时间码为秒数
-
-        Args:
-            time_str: ASS时间字符串 (H:MM:SS.cc)
-
-        Returns:
-            秒数
-        """
-        time_str = time_str.strip()
-        # 处理格式: 0:00:05.00
-        parts = time_str.split(':')
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        sec_parts = parts[2].split('.')
-        seconds = int(sec_parts[0])
-        centis = int(sec_parts[1]) if len(sec_parts) > 1 else 0
-
-        return hours * 3600 + minutes * 60 + seconds + centis / 100.0
-
     def _save_srt(self, subtitles: List[Dict], output_path: str):
         """
         保存SRT格式字幕
@@ -341,70 +423,65 @@ class SubtitleAligner:
             subtitles: 字幕列表
             output_path: 输出路径
         """
-        from datetime import timedelta
+        # 每条字幕: 序号、时间轴、文本、空行;全部拼接后一次写入
+        fmt = self._format_srt_time
+        blocks = [
+            f"{sub['index']}\n"
+            f"{fmt(sub['start_time'])} --> {fmt(sub['end_time'])}\n"
+            f"{sub['text']}\n\n"
+            for sub in subtitles
+        ]
 
         with open(output_path, 'w', encoding='utf-8') as f:
-            for sub in subtitles:
-                # 字幕序号
-                f.write(f"{sub['index']}\n")
-
-                # 时间轴
-                start = self._format_srt_time(sub['start_time'])
-                end = self._format_srt_time(sub['end_time'])
-                f.write(f"{start} --> {end}\n")
-
-                # 字幕文本
-                f.write(f"{sub['text']}\n\n")
+            f.write(''.join(blocks))
 
     def _save_ass(self, subtitles: List[Dict], output_path: str):
         """
-        保存ASS格式字幕(需要先读取原文件头部)
+        保存ASS格式字幕(需要原文件头部)
 
         Args:
             subtitles: 字幕列表
             output_path: 输出路径
         """
-        # 读取原文件头部(到[Events]部分)
-        header = ""
-        with open(output_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                header += line
-                if line.startswith('Format: Layer'):
-                    break
+        # 优先复用解析时缓存的头部;否则读取原文件头部(到[Events]部分)
+        header = self._ass_header
+        if header is None:
+            header_lines = []
+            with open(output_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    header_lines.append(line)
+                    if line.startswith('Format: Layer'):
+                        break
+            header = ''.join(header_lines)
+
+        # 头部与字幕内容拼接后一次写入新文件
+        parts = [header]
+        for sub in subtitles:
+            start = self._format_ass_time(sub['start_time'])
+            end = self._format_ass_time(sub['end_time'])
+            text = sub['text'].replace('\n', '\\N')
+            parts.append(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}\n")
 
-        # 写入新文件
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(header)
+            f.write(''.join(parts))
 
-            # 字幕内容
-            for sub in subtitles:
-                start = self._format_ass_time(sub['start_time'])
-                end = self._format_ass_time(sub['end_time'])
-                text = sub['text'].replace('\n', '\\N')
-
-                f.write(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}\n")
-
-    def _format_srt_time(self, seconds: float) -> str:
+    @staticmethod
+    def _format_srt_time(seconds: float) -> str:
         """格式化SRT时间码"""
-        from datetime import timedelta
-
-        td = timedelta(seconds=seconds)
-        hours = int(td.total_seconds() // 3600)
-        minutes = int((td.total_seconds() % 3600) // 60)
-        secs = int(td.total_seconds() % 60)
-        millis = int((td.total_seconds() % 1) * 1000)
+        millis = int(round(max(seconds, 0.0) * 1000))
+        hours, millis = divmod(millis, 3600000)
+        minutes, millis = divmod(millis, 60000)
+        secs, millis = divmod(millis, 1000)
 
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
-    def _format_ass_time(self, seconds: float) -> str:
+    @staticmethod
+    def _format_ass_time(seconds: float) -> str:
         """格式化ASS时间码"""
-        from datetime import timedelta
-
-        td = timedelta(seconds=seconds)
-        hours = int(td.total_seconds() // 3600)
-        minutes = int((td.total_seconds() % 3600) // 60)
-        secs = int(td.total_seconds() % 60)
-        centis = int((td.total_seconds() % 1) * 100)
+        centis = int(round(max(seconds, 0.0) * 100))
+        hours, centis = divmod(centis, 360000)
+        minutes, centis = divmod(centis, 6000)
+        secs, centis = divmod(centis, 100)
 
         return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
 
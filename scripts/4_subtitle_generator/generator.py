@@ -5,10 +5,33 @@
 """
 
 import os
+import re
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from datetime import timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 可选：orjson 加速JSON读取
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _load_json(path) -> dict:
+    """读取JSON文件(可用时使用orjson直接解析字节)"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# 断句位置: 紧跟在句读标点之后
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[。!?;,、])')
+
+# duration字符串中的数字(整数或小数)
+_DURATION_RE = re.compile(r'(\d+\.?\d*)')
 
 
 class SubtitleGenerator:
@@ -29,8 +52,7 @@ class SubtitleGenerator:
     def _load_config(self, config_path: str) -> dict:
         """加载配置文件"""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_json(config_path)
         except Exception as e:
             print(f"⚠️  加载配置文件失败: {str(e)}")
             return {}
@@ -98,8 +120,7 @@ class SubtitleGenerator:
 
         try:
             # 读取脚本
-            with open(script_path, 'r', encoding='utf-8') as f:
-                script = json.load(f)
+            script = _load_json(script_path)
 
             sections = script.get("sections", [])
             if not sections:
@@ -168,8 +189,7 @@ class SubtitleGenerator:
             {章节索引: 时长} 字典
         """
         try:
-            with open(audio_metadata_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = _load_json(audio_metadata_path)
 
             durations = {}
             for item in metadata.get("audio_files", []):
@@ -215,17 +235,16 @@ class SubtitleGenerator:
                     # 粗略估算: 中文约2.5字/秒
                     duration = max(2.0, len(narration) / 2.5)
 
-            # 分割长文本为多个字幕条目
-            subtitle_items = self._split_text(narration, duration)
-
-            for item_text, item_duration in subtitle_items:
+            # 分割长文本为多个字幕条目(边切分边生成)
+            section_name = section.get("section_name", "")
+            for item_text, item_duration in self._split_text(narration, duration):
                 subtitle = {
                     "index": len(subtitles) + 1,
                     "start_time": current_time,
                     "end_time": current_time + item_duration,
                     "text": item_text,
                     "section_index": i,
-                    "section_name": section.get("section_name", "")
+                    "section_name": section_name
                 }
                 subtitles.append(subtitle)
                 current_time += item_duration
@@ -233,34 +252,29 @@ class SubtitleGenerator:
         return subtitles
 
     def _split_text(self, text: str, total_duration: float,
-                   max_chars: int = 40) -> List[Tuple[str, float]]:
+                   max_chars: int = 40) -> Iterator[Tuple[str, float]]:
         """
         分割长文本为多个字幕条目
 
+        合并后的条目一经确定即按字符数比例分配时长并产出,不再构建中间列表。
+
         Args:
             text: 文本内容
             total_duration: 总时长
             max_chars: 每条字幕最大字符数
 
-        Returns:
-            [(文本, 时长), ...] 列表
+        Yields:
+            (文本, 时长)
         """
-        # 按标点符号分割
-        sentences = []
-        current = ""
+        # 按标点符号分割(标点保留在句尾)
+        sentences = [s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
 
-        for char in text:
-            current += char
-            if char in "。!?;,、":
-                if current.strip():
-                    sentences.append(current.strip())
-                    current = ""
-
-        if current.strip():
-            sentences.append(current.strip())
+        # 合并只拼接句子,总字符数在合并前即可确定
+        total_chars = sum(map(len, sentences))
+        if total_chars == 0:
+            return
 
         # 合并短句,确保不超过max_chars
-        items = []
         current_item = ""
 
         for sentence in sentences:
@@ -268,22 +282,11 @@ class SubtitleGenerator:
                 current_item += sentence
             else:
                 if current_item:
-                    items.append(current_item)
+                    yield current_item, total_duration * (len(current_item) / total_chars)
                 current_item = sentence
 
         if current_item:
-            items.append(current_item)
-
-        # 分配时长(按字符数比例)
-        total_chars = sum(len(item) for item in items)
-        result = []
-
-        for item in items:
-            char_ratio = len(item) / total_chars if total_chars > 0 else 1.0 / len(items)
-            item_duration = total_duration * char_ratio
-            result.append((item, item_duration))
-
-        return result
+            yield current_item, total_duration * (len(current_item) / total_chars)
 
     def _save_srt(self, subtitles: List[Dict], output_path: Path):
         """
@@ -293,18 +296,17 @@ class SubtitleGenerator:
             subtitles: 字幕列表
             output_path: 输出路径
         """
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for sub in subtitles:
-                # 字幕序号
-                f.write(f"{sub['index']}\n")
-
-                # 时间轴
-                start = self._format_srt_time(sub['start_time'])
-                end = self._format_srt_time(sub['end_time'])
-                f.write(f"{start} --> {end}\n")
+        # 每条字幕: 序号、时间轴、文本、空行;全部拼接后一次写入
+        fmt = self._format_srt_time
+        blocks = [
+            f"{sub['index']}\n"
+            f"{fmt(sub['start_time'])} --> {fmt(sub['end_time'])}\n"
+            f"{sub['text']}\n\n"
+            for sub in subtitles
+        ]
 
-                # 字幕文本
-                f.write(f"{sub['text']}\n\n")
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(blocks))
 
     def _save_ass(self, subtitles: List[Dict], output_path: Path):
         """
@@ -336,18 +338,19 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             margin=self._get_margin_v()
         )
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(header)
-
-            # 字幕内容
-            for sub in subtitles:
-                start = self._format_ass_time(sub['start_time'])
-                end = self._format_ass_time(sub['end_time'])
-                text = sub['text'].replace('\n', '\\N')
+        # 头部与字幕内容拼接后一次写入
+        parts = [header]
+        for sub in subtitles:
+            start = self._format_ass_time(sub['start_time'])
+            end = self._format_ass_time(sub['end_time'])
+            text = sub['text'].replace('\n', '\\N')
+            parts.append(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}\n")
 
-                f.write(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}\n")
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
 
-    def _format_srt_time(self, seconds: float) -> str:
+    @staticmethod
+    def _format_srt_time(seconds: float) -> str:
         """
         格式化SRT时间码
 
@@ -357,15 +360,15 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         Returns:
             SRT时间格式 (HH:MM:SS,mmm)
         """
-        td = timedelta(seconds=seconds)
-        hours = int(td.total_seconds() // 3600)
-        minutes = int((td.total_seconds() % 3600) // 60)
-        secs = int(td.total_seconds() % 60)
-        millis = int((td.total_seconds() % 1) * 1000)
+        millis = int(round(max(seconds, 0.0) * 1000))
+        hours, millis = divmod(millis, 3600000)
+        minutes, millis = divmod(millis, 60000)
+        secs, millis = divmod(millis, 1000)
 
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{millis:03d}"
 
-    def _format_ass_time(self, seconds: float) -> str:
+    @staticmethod
+    def _format_ass_time(seconds: float) -> str:
         """
         格式化ASS时间码
 
@@ -375,11 +378,10 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         Returns:
             ASS时间格式 (H:MM:SS.cc)
         """
-        td = timedelta(seconds=seconds)
-        hours = int(td.total_seconds() // 3600)
-        minutes = int((td.total_seconds() % 3600) // 60)
-        secs = int(td.total_seconds() % 60)
-        centis = int((td.total_seconds() % 1) * 100)
+        centis = int(round(max(seconds, 0.0) * 100))
+        hours, centis = divmod(centis, 360000)
+        minutes, centis = divmod(centis, 6000)
+        secs, centis = divmod(centis, 100)
 
         return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
 
@@ -434,21 +436,16 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             15 -> 15.0
             15.0 -> 15.0
         """
-        import re
-
         # 如果已经是数字，直接返回
         if isinstance(duration_value, (int, float)):
             return float(duration_value)
 
         # 如果是字符串，提取数字
         if isinstance(duration_value, str):
-            # 匹配数字（整数或小数）
-            match = re.search(r'(\d+\.?\d*)', duration_value)
+            # 匹配数字（整数或小数），该模式匹配到的文本总能转换为float
+            match = _DURATION_RE.search(duration_value)
             if match:
-                try:
-                    return float(match.group(1))
-                except ValueError:
-                    pass
+                return float(match.group(1))
 
         # 解析失败，返回默认值
         return default
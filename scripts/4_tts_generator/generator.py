@@ -5,11 +5,167 @@ TTS语音生成器
 """
 
 import os
+import re
 import json
+import hashlib
+import shutil
+import subprocess
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import asyncio
 
+# 可选：mutagen 直接读取MP3帧头获取时长(无需启动ffmpeg进程)
+try:
+    from mutagen.mp3 import MP3
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
+# 可选：orjson 加速JSON读写
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 各提供商的默认语速估计(字/秒, 1.0倍速),用于按字数估算时长
+_CHARS_PER_SECOND = {
+    "openai": 5.0,
+    "edge": 4.0,
+}
+
+# 各提供商未指定声音时使用的默认声音
+_DEFAULT_VOICES = {
+    "openai": "alloy",
+    "edge": "zh-CN-XiaoxiaoNeural",
+}
+
+# ffmpeg -i 输出中的时长字段
+_FFMPEG_DURATION_RE = re.compile(r'Duration:\s*(\d+):(\d\d):(\d\d(?:\.\d+)?)')
+
+# 句末标点(中英文),切分点位于标点之后
+_SENTENCE_END_RE = re.compile(r'(?<=[。！？；.!?;])')
+
+
+def _split_sentences(text: str, max_chars: int) -> List[str]:
+    """
+    按句末标点切分长文本,并把相邻句子贪心合并为不超过max_chars的片段
+
+    单句超过max_chars时保持完整,不在句中截断。
+
+    Args:
+        text: 文本内容
+        max_chars: 每个片段的最大字符数
+
+    Returns:
+        片段列表
+    """
+    parts = []
+    current = ""
+
+    for sentence in _SENTENCE_END_RE.split(text):
+        if not sentence.strip():
+            continue
+        if current and len(current) + len(sentence) > max_chars:
+            parts.append(current)
+            current = sentence
+        else:
+            current += sentence
+
+    if current.strip():
+        parts.append(current)
+
+    return parts
+
+
+def _load_json(path) -> dict:
+    """读取JSON文件(可用时使用orjson直接解析字节)"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _dump_json(data: dict, path, indent: bool = True):
+    """写入JSON文件(保留非ASCII字符,可用时使用orjson)"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2 if indent else None)
+
+
+def _link_or_copy(src: Path, dst: Path):
+    """
+    把src放到dst: 优先硬链接(不复制数据),跨设备或文件系统不支持时退回复制
+
+    先写到临时文件名再原子替换,dst已存在时也不会出现半写状态。
+    """
+    tmp_path = dst.with_name(dst.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp_path)
+    except OSError:
+        shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def _probe_audio_duration(audio_path: str) -> float:
+    """
+    读取音频时长: 优先mutagen解析帧头,其次ffprobe,最后解析ffmpeg -i输出的Duration
+
+    除mutagen外都在子进程中完成,调用方放到线程中执行即可并行,不需要进程池。
+
+    Args:
+        audio_path: 音频文件路径
+
+    Returns:
+        时长(秒)
+    """
+    if MUTAGEN_AVAILABLE:
+        try:
+            return float(MP3(audio_path).info.length)
+        except Exception:
+            pass
+
+    ffprobe = os.environ.get('FFPROBE_BINARY') or shutil.which('ffprobe')
+    if ffprobe:
+        result = subprocess.run(
+            [ffprobe, '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        if result.returncode == 0:
+            try:
+                return float(result.stdout.strip())
+            except ValueError:
+                pass
+
+    # 与moviepy相同的做法(ffmpeg -i 读取容器头部),但不导入moviepy、不占用GIL
+    ffmpeg = os.environ.get('IMAGEIO_FFMPEG_EXE') or shutil.which('ffmpeg')
+    if not ffmpeg:
+        import imageio_ffmpeg
+        ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+
+    result = subprocess.run(
+        [ffmpeg, '-hide_banner', '-i', audio_path],
+        capture_output=True,
+        text=True,
+        timeout=10
+    )
+    match = _FFMPEG_DURATION_RE.search(result.stderr)
+    if match is None:
+        raise ValueError(f"无法读取音频时长: {audio_path}")
+
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
 
 class TTSGenerator:
     """TTS语音生成器类"""
@@ -29,11 +185,17 @@ class TTSGenerator:
         # TTS提供商
         self.provider = self.tts_config.get("provider", "openai")
 
+        # OpenAI异步客户端及其所属事件循环(同一事件循环内各章节共享连接池)
+        self._openai_client = None
+        self._openai_client_loop = None
+
+        # 语音缓存: 相同(提供商, 模型, 声音, 语速, 文字)直接复用已合成的音频
+        self.cache_dir = self.output_dir / "cache"
+
     def _load_config(self, config_path: str) -> dict:
         """加载配置文件"""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_json(config_path)
         except Exception as e:
             print(f"⚠️  加载配置文件失败: {str(e)}")
             return {}
@@ -54,8 +216,7 @@ class TTSGenerator:
 
         try:
             # 读取脚本
-            with open(script_path, 'r', encoding='utf-8') as f:
-                script = json.load(f)
+            script = _load_json(script_path)
 
             # 提取所有章节的旁白
             sections = script.get("sections", [])
@@ -67,10 +228,15 @@ class TTSGenerator:
             if output_name is None:
                 output_name = script.get("title", "untitled").replace(" ", "_")
 
-            # 为每个章节生成语音
-            audio_files = []
-            total_duration = 0.0
+            metadata_path = self.output_dir / f"{output_name}_metadata.json"
+            progress_path = self.output_dir / f"{output_name}_metadata.ndjson"
+
+            # 上次中断时已完成的章节(逐行记录的进度文件)
+            finished = self._load_progress(progress_path)
 
+            # 收集有旁白且尚未完成的章节
+            jobs = []
+            audio_files = []
             for i, section in enumerate(sections, 1):
                 section_name = section.get("section_name", f"Section_{i}")
                 narration = section.get("narration", "")
@@ -79,26 +245,21 @@ class TTSGenerator:
                     print(f"⚠️  章节 {i} ({section_name}) 没有旁白文字,跳过")
                     continue
 
-                print(f"\n🔊 生成章节 {i}/{len(sections)}: {section_name}")
-                print(f"📝 文字: {narration[:50]}..." if len(narration) > 50 else f"📝 文字: {narration}")
+                done = finished.get(i)
+                if (done and done["key"] == self._cache_key(narration, None, 1.0)
+                        and os.path.exists(done["entry"]["file_path"])):
+                    print(f"⏭️  章节 {i} ({section_name}) 上次已生成,跳过")
+                    audio_files.append(done["entry"])
+                    continue
 
-                # 生成单个章节的语音
-                result = self.generate_speech(
-                    text=narration,
-                    output_filename=f"{output_name}_section_{i:02d}.mp3"
-                )
+                jobs.append((i, section_name, narration))
 
-                if result["success"]:
-                    audio_files.append({
-                        "section_index": i,
-                        "section_name": section_name,
-                        "file_path": result["file_path"],
-                        "duration": result.get("duration", 0.0),
-                        "text": narration
-                    })
-                    total_duration += result.get("duration", 0.0)
-                else:
-                    print(f"❌ 章节 {i} 生成失败: {result.get('error', 'unknown')}")
+            # 各章节语音并发生成,完成顺序不定,按章节序号恢复顺序
+            audio_files += asyncio.run(
+                self._generate_sections_async(jobs, output_name, len(sections), progress_path)
+            )
+            audio_files.sort(key=lambda item: item["section_index"])
+            total_duration = sum(item["duration"] for item in audio_files)
 
             if not audio_files:
                 print("\n❌ 没有生成任何语音文件")
@@ -116,9 +277,10 @@ class TTSGenerator:
                 "voice": self.tts_config.get("voice", "default")
             }
 
-            metadata_path = self.output_dir / f"{output_name}_metadata.json"
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, ensure_ascii=False, indent=2)
+            _dump_json(metadata, metadata_path)
+
+            # 元数据已完整写出,不再需要进度文件
+            progress_path.unlink(missing_ok=True)
 
             print(f"\n✅ 语音生成完成!")
             print(f"📊 总计: {len(audio_files)}/{len(sections)} 个章节")
@@ -139,6 +301,96 @@ class TTSGenerator:
             traceback.print_exc()
             return {"success": False, "error": str(e)}
 
+    def _load_progress(self, progress_path: Path) -> Dict[int, Dict]:
+        """
+        读取进度文件中已完成的章节
+
+        Returns:
+            {章节序号: {"key": 缓存键, "entry": 音频信息}},进度文件不存在时为空
+        """
+        finished = {}
+        try:
+            with open(progress_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        finished[record["entry"]["section_index"]] = record
+                    except (ValueError, KeyError, TypeError):
+                        # 中断时可能留下不完整的最后一行
+                        continue
+        except FileNotFoundError:
+            pass
+
+        return finished
+
+    async def _generate_sections_async(self, jobs: List[Tuple[int, str, str]],
+                                       output_name: str, total_sections: int,
+                                       progress_path: Optional[Path] = None) -> List[Dict]:
+        """
+        并发生成多个章节的语音
+
+        每个章节的合成几乎全是网络等待,用信号量限制同时进行的请求数以免触发服务端限流;
+        章节一完成就立即记录并输出进度,不必等待最慢的章节。完成的章节同时追加到进度文件,
+        中断后重新运行时可跳过。
+
+        Args:
+            jobs: [(章节序号, 章节名, 旁白), ...]
+            output_name: 输出文件名前缀
+            total_sections: 脚本章节总数(用于进度显示)
+            progress_path: 进度文件路径(NDJSON,每行一个已完成章节),为None时不记录
+
+        Returns:
+            成功章节的音频信息列表(按完成顺序)
+        """
+        semaphore = asyncio.Semaphore(max(1, int(self.tts_config.get("max_concurrency", 8))))
+
+        async def _run(i: int, section_name: str, narration: str) -> Tuple[int, str, str, Dict]:
+            async with semaphore:
+                print(f"\n🔊 生成章节 {i}/{total_sections}: {section_name}")
+                print(f"📝 文字: {narration[:50]}..." if len(narration) > 50 else f"📝 文字: {narration}")
+
+                try:
+                    result = await self.generate_speech_async(
+                        text=narration,
+                        output_filename=f"{output_name}_section_{i:02d}.mp3"
+                    )
+                except Exception as e:
+                    result = {"success": False, "error": str(e)}
+
+                return i, section_name, narration, result
+
+        audio_files = []
+        tasks = [asyncio.ensure_future(_run(*job)) for job in jobs]
+        progress = open(progress_path, 'a', encoding='utf-8') if progress_path else None
+
+        try:
+            for finished, future in enumerate(asyncio.as_completed(tasks), 1):
+                i, section_name, narration, result = await future
+
+                if result["success"]:
+                    entry = {
+                        "section_index": i,
+                        "section_name": section_name,
+                        "file_path": result["file_path"],
+                        "duration": result.get("duration", 0.0),
+                        "text": narration
+                    }
+                    audio_files.append(entry)
+
+                    if progress:
+                        record = {"key": self._cache_key(narration, None, 1.0), "entry": entry}
+                        progress.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        progress.flush()
+
+                    print(f"📈 进度: {finished}/{len(jobs)} (章节 {i} 完成)")
+                else:
+                    print(f"❌ 章节 {i} 生成失败: {result.get('error', 'unknown')}")
+        finally:
+            if progress:
+                progress.close()
+
+        return audio_files
+
     def generate_speech(self, text: str, output_filename: str,
                        voice: Optional[str] = None,
                        speed: float = 1.0) -> Dict:
@@ -154,15 +406,137 @@ class TTSGenerator:
         Returns:
             包含生成结果的字典
         """
+        return asyncio.run(self.generate_speech_async(text, output_filename, voice, speed))
+
+    async def generate_speech_async(self, text: str, output_filename: str,
+                                    voice: Optional[str] = None,
+                                    speed: float = 1.0) -> Dict:
+        """
+        生成单段语音(异步版本,参数同generate_speech)
+        """
         if self.provider == "openai":
-            return self._generate_openai_tts(text, output_filename, voice, speed)
+            generate = self._generate_openai_tts_async
         elif self.provider == "edge":
-            return self._generate_edge_tts(text, output_filename, voice, speed)
+            generate = self._generate_edge_tts_async
         else:
             return {"success": False, "error": f"不支持的TTS提供商: {self.provider}"}
 
-    def _generate_openai_tts(self, text: str, output_filename: str,
-                            voice: Optional[str] = None, speed: float = 1.0) -> Dict:
+        # 缓存文件读写放到线程池中,不占用事件循环
+        loop = asyncio.get_running_loop()
+        cache_key = None
+        if self.tts_config.get("cache_enabled", True):
+            cache_key = self._cache_key(text, voice, speed)
+            cached = await loop.run_in_executor(
+                None, self._load_cached_speech, cache_key, output_filename
+            )
+            if cached:
+                print(f"♻️  命中语音缓存: {cached['file_path']} ({cached.get('duration', 0.0):.1f}秒)")
+                return cached
+
+        # 输出文件可能是某个缓存条目的硬链接,先删除再写,避免原地覆盖改坏缓存
+        (self.output_dir / output_filename).unlink(missing_ok=True)
+
+        result = await generate(text, output_filename, voice, speed)
+
+        if cache_key and result["success"]:
+            await loop.run_in_executor(None, self._store_cached_speech, cache_key, result)
+
+        return result
+
+    def _cache_key(self, text: str, voice: Optional[str], speed: float) -> str:
+        """语音缓存键: sha256(提供商|模型|声音|语速|文字)"""
+        model = self.tts_config.get("model", "tts-1") if self.provider == "openai" else ""
+        voice = voice or self.tts_config.get("voice", _DEFAULT_VOICES.get(self.provider, ""))
+        raw = f"{self.provider}|{model}|{voice}|{float(speed)}|{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load_cached_speech(self, cache_key: str, output_filename: str) -> Optional[Dict]:
+        """
+        命中缓存时把缓存音频链接(硬链接,不支持时复制)到输出文件
+
+        Returns:
+            与生成结果格式相同的字典,未命中返回None
+        """
+        audio_path = self.cache_dir / f"{cache_key}.mp3"
+        info_path = self.cache_dir / f"{cache_key}.json"
+
+        try:
+            info = _load_json(info_path)
+
+            output_path = self.output_dir / output_filename
+            _link_or_copy(audio_path, output_path)
+
+            # 更新访问时间,供LRU淘汰使用
+            os.utime(audio_path, (time.time(), audio_path.stat().st_mtime))
+        except (OSError, ValueError):
+            return None
+
+        return dict(info, success=True, file_path=str(output_path), cached=True)
+
+    def _store_cached_speech(self, cache_key: str, result: Dict):
+        """把新生成的音频及其时长写入缓存,并按容量上限淘汰最久未用的条目"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+            _link_or_copy(Path(result["file_path"]), self.cache_dir / f"{cache_key}.mp3")
+
+            info = {key: result[key] for key in ("duration", "provider", "voice", "speed") if key in result}
+            _dump_json(info, self.cache_dir / f"{cache_key}.json", indent=False)
+        except OSError as e:
+            print(f"⚠️  写入语音缓存失败: {str(e)}")
+            return
+
+        self._evict_speech_cache()
+
+    def _evict_speech_cache(self):
+        """缓存总大小超过tts.cache_max_mb时,按访问时间删除最旧的条目"""
+        max_bytes = int(self.tts_config.get("cache_max_mb", 1024)) * 1024 * 1024
+
+        entries = []
+        total = 0
+        for audio_path in self.cache_dir.glob("*.mp3"):
+            try:
+                stat = audio_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, audio_path))
+            total += stat.st_size
+
+        if total <= max_bytes:
+            return
+
+        entries.sort(key=lambda entry: entry[0])
+        for _, size, audio_path in entries:
+            if total <= max_bytes:
+                break
+            audio_path.unlink(missing_ok=True)
+            audio_path.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
+
+    def _get_openai_client(self):
+        """
+        获取OpenAI异步客户端(在同一事件循环内复用,保持连接池和keep-alive连接)
+
+        异步客户端的连接池绑定创建时的事件循环,每次asyncio.run都会新建循环,因此按循环重建。
+
+        Returns:
+            AsyncOpenAI实例,未配置API密钥时返回None
+        """
+        loop = asyncio.get_running_loop()
+        if self._openai_client is None or self._openai_client_loop is not loop:
+            from openai import AsyncOpenAI
+
+            api_key = self.tts_config.get("api_key") or os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                return None
+
+            self._openai_client = AsyncOpenAI(api_key=api_key)
+            self._openai_client_loop = loop
+
+        return self._openai_client
+
+    async def _generate_openai_tts_async(self, text: str, output_filename: str,
+                                         voice: Optional[str] = None, speed: float = 1.0) -> Dict:
         """
         使用OpenAI TTS生成语音
 
@@ -173,38 +547,35 @@ class TTSGenerator:
             speed: 语速(0.25-4.0)
         """
         try:
-            from openai import OpenAI
-
-            # 初始化OpenAI客户端
-            api_key = self.tts_config.get("api_key") or os.getenv("OPENAI_API_KEY")
-            if not api_key:
+            # 获取(复用)OpenAI客户端
+            client = self._get_openai_client()
+            if client is None:
                 return {"success": False, "error": "未配置OpenAI API密钥"}
 
-            client = OpenAI(api_key=api_key)
-
             # 设置参数
             model = self.tts_config.get("model", "tts-1")
-            voice = voice or self.tts_config.get("voice", "alloy")
+            voice = voice or self.tts_config.get("voice", _DEFAULT_VOICES["openai"])
 
             # 限制语速范围
             speed = max(0.25, min(4.0, speed))
 
             print(f"🔊 使用OpenAI TTS (模型: {model}, 声音: {voice}, 语速: {speed}x)")
 
-            # 调用API
-            response = client.audio.speech.create(
+            # 调用API,边接收边写入音频文件(内存中只保留当前数据块)
+            output_path = self.output_dir / output_filename
+            async with client.audio.speech.with_streaming_response.create(
                 model=model,
                 voice=voice,
                 input=text,
-                speed=speed
-            )
-
-            # 保存音频文件
-            output_path = self.output_dir / output_filename
-            response.stream_to_file(output_path)
+                speed=speed,
+                response_format="mp3"
+            ) as response:
+                with open(output_path, 'wb', buffering=1 << 16) as f:
+                    async for chunk in response.iter_bytes(chunk_size=8192):
+                        f.write(chunk)
 
             # 获取音频时长
-            duration = self._get_audio_duration(str(output_path))
+            duration = await self._resolve_duration(text, speed, output_path)
 
             print(f"✅ 生成成功: {output_path} ({duration:.1f}秒)")
 
@@ -221,8 +592,8 @@ class TTSGenerator:
             print(f"❌ OpenAI TTS生成失败: {str(e)}")
             return {"success": False, "error": str(e)}
 
-    def _generate_edge_tts(self, text: str, output_filename: str,
-                          voice: Optional[str] = None, speed: float = 1.0) -> Dict:
+    async def _generate_edge_tts_async(self, text: str, output_filename: str,
+                                       voice: Optional[str] = None, speed: float = 1.0) -> Dict:
         """
         使用Edge TTS生成语音(免费)
 
@@ -236,7 +607,7 @@ class TTSGenerator:
             import edge_tts
 
             # 设置声音
-            voice = voice or self.tts_config.get("voice", "zh-CN-XiaoxiaoNeural")
+            voice = voice or self.tts_config.get("voice", _DEFAULT_VOICES["edge"])
 
             # 计算语速参数 (speed: 1.0 = +0%, 1.5 = +50%, 0.5 = -50%)
             rate_percent = int((speed - 1.0) * 100)
@@ -247,16 +618,36 @@ class TTSGenerator:
             # 输出路径
             output_path = self.output_dir / output_filename
 
-            # 异步生成语音
-            async def _generate():
+            # Edge TTS按连接限速: 长旁白按句切成多段并发合成,再按顺序拼接
+            threshold = int(self.tts_config.get("parallel_split_threshold", 300))
+            parts = [text]
+            if 0 < threshold < len(text):
+                parts = _split_sentences(text, threshold) or [text]
+
+            async def _synthesize(part: str) -> bytes:
+                communicate = edge_tts.Communicate(part, voice, rate=rate)
+                audio = bytearray()
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        audio += chunk["data"]
+                return bytes(audio)
+
+            if len(parts) == 1:
+                # 生成语音,音频数据块到达即写入(64KB缓冲合并小块写入)
                 communicate = edge_tts.Communicate(text, voice, rate=rate)
-                await communicate.save(str(output_path))
-
-            # 运行异步任务
-            asyncio.run(_generate())
+                with open(output_path, 'wb', buffering=1 << 16) as f:
+                    async for chunk in communicate.stream():
+                        if chunk["type"] == "audio":
+                            f.write(chunk["data"])
+            else:
+                # Edge输出的是无文件头的MP3帧流,各段字节按顺序拼接即为合法MP3
+                audios = await asyncio.gather(*(_synthesize(part) for part in parts))
+                with open(output_path, 'wb', buffering=1 << 16) as f:
+                    for audio in audios:
+                        f.write(audio)
 
             # 获取音频时长
-            duration = self._get_audio_duration(str(output_path))
+            duration = await self._resolve_duration(text, speed, output_path)
 
             print(f"✅ 生成成功: {output_path} ({duration:.1f}秒)")
 
@@ -276,6 +667,31 @@ class TTSGenerator:
             print(f"❌ Edge TTS生成失败: {str(e)}")
             return {"success": False, "error": str(e)}
 
+    async def _resolve_duration(self, text: str, speed: float, audio_path: Path) -> float:
+        """
+        确定生成音频的时长
+
+        默认读取音频文件得到精确时长(字幕对齐依赖它);tts.exact_duration为false时
+        直接按字数估算,省去探测开销。探测失败时也退回估算值。
+        """
+        if not self.tts_config.get("exact_duration", True):
+            return self._estimate_duration(text, speed)
+
+        # 阻塞调用放到线程中,不占用事件循环
+        loop = asyncio.get_running_loop()
+        duration = await loop.run_in_executor(None, self._get_audio_duration, str(audio_path))
+        return duration or self._estimate_duration(text, speed)
+
+    def _estimate_duration(self, text: str, speed: float = 1.0) -> float:
+        """
+        按字数粗略估算语音时长
+
+        语速取tts.chars_per_second,未配置时使用提供商的默认值(中文约4~5字/秒)。
+        """
+        chars_per_second = (self.tts_config.get("chars_per_second")
+                            or _CHARS_PER_SECOND.get(self.provider, 4.0))
+        return len(text.strip()) / (float(chars_per_second) * max(speed, 0.25))
+
     def _get_audio_duration(self, audio_path: str) -> float:
         """
         获取音频文件时长
@@ -287,16 +703,9 @@ class TTSGenerator:
             时长(秒)
         """
         try:
-            from moviepy import AudioFileClip
-
-            audio = AudioFileClip(audio_path)
-            duration = audio.duration
-            audio.close()
-
-            return duration
+            return _probe_audio_duration(audio_path)
         except Exception as e:
             print(f"⚠️  获取音频时长失败: {str(e)}")
-            # 粗略估算: 中文约150字/分钟
             return 0.0
 
     def list_available_voices(self) -> List[str]:
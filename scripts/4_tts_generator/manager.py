@@ -6,10 +6,41 @@ TTS语音管理器
 
 import os
 import json
+import shutil
+import subprocess
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+# 可选：orjson 加速JSON读写
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _load_json(path) -> dict:
+    """读取JSON文件(可用时使用orjson直接解析字节)"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _ffmpeg_binary() -> str:
+    """ffmpeg可执行文件: IMAGEIO_FFMPEG_EXE > PATH中的ffmpeg > imageio-ffmpeg自带的ffmpeg"""
+    ffmpeg = os.environ.get('IMAGEIO_FFMPEG_EXE') or shutil.which('ffmpeg')
+    if ffmpeg:
+        return ffmpeg
+
+    import imageio_ffmpeg
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
 
 class TTSManager:
     """TTS语音管理器类"""
@@ -25,11 +56,13 @@ class TTSManager:
         self.audio_dir = Path(self.config["paths"]["audio"]) / "tts"
         self.audio_dir.mkdir(parents=True, exist_ok=True)
 
+        # 元数据解析缓存: {元数据文件路径: ((mtime_ns, size), 元数据)}
+        self._metadata_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+
     def _load_config(self, config_path: str) -> dict:
         """加载配置文件"""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return _load_json(config_path)
         except Exception as e:
             print(f"⚠️  加载配置文件失败: {str(e)}")
             return {"paths": {"audio": "materials/audio"}}
@@ -41,30 +74,74 @@ class TTSManager:
         Returns:
             语音文件列表
         """
-        audio_list = []
+        slots: List[Optional[Dict]] = []
+        stale = []      # (位置, 元数据文件, stat)
+        cache = {}
 
-        # 查找所有元数据文件
+        # 查找所有元数据文件,未修改过的文件直接复用上次的解析结果
         for metadata_file in self.audio_dir.glob("*_metadata.json"):
             try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
+                stat = metadata_file.stat()
+            except OSError as e:
+                print(f"⚠️  读取元数据失败 {metadata_file}: {str(e)}")
+                continue
 
-                # 添加文件信息
-                metadata["metadata_file"] = str(metadata_file)
-                metadata["created_time"] = datetime.fromtimestamp(
-                    metadata_file.stat().st_mtime
-                ).strftime("%Y-%m-%d %H:%M:%S")
+            key = str(metadata_file)
+            cached = self._metadata_cache.get(key)
+            if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+                cache[key] = cached
+                slots.append(cached[1])
+            else:
+                stale.append((len(slots), metadata_file, stat))
+                slots.append(None)
 
-                audio_list.append(metadata)
+        # 新增或修改过的文件并发读取解析
+        if stale:
+            if len(stale) == 1:
+                parsed = [self._parse_metadata_file(stale[0][1], stale[0][2])]
+            else:
+                with ThreadPoolExecutor(max_workers=min(32, len(stale))) as executor:
+                    parsed = list(executor.map(
+                        lambda item: self._parse_metadata_file(item[1], item[2]), stale
+                    ))
 
-            except Exception as e:
-                print(f"⚠️  读取元数据失败 {metadata_file}: {str(e)}")
+            for (slot, metadata_file, stat), metadata in zip(stale, parsed):
+                if metadata is not None:
+                    cache[str(metadata_file)] = ((stat.st_mtime_ns, stat.st_size), metadata)
+                    slots[slot] = metadata
+
+        # 只保留仍然存在的文件
+        self._metadata_cache = cache
+
+        audio_list = [metadata for metadata in slots if metadata is not None]
 
         # 按创建时间排序
         audio_list.sort(key=lambda x: x.get("created_time", ""), reverse=True)
 
         return audio_list
 
+    def _parse_metadata_file(self, metadata_file: Path, stat: os.stat_result) -> Optional[Dict]:
+        """
+        读取并解析单个元数据文件
+
+        Returns:
+            附加了文件信息的元数据,失败返回None
+        """
+        try:
+            metadata = _load_json(metadata_file)
+
+            # 添加文件信息
+            metadata["metadata_file"] = str(metadata_file)
+            metadata["created_time"] = datetime.fromtimestamp(
+                stat.st_mtime
+            ).strftime("%Y-%m-%d %H:%M:%S")
+
+            return metadata
+
+        except Exception as e:
+            print(f"⚠️  读取元数据失败 {metadata_file}: {str(e)}")
+            return None
+
     def get_audio_by_script(self, script_title: str) -> Optional[Dict]:
         """
         根据脚本标题查找语音
@@ -94,8 +171,7 @@ class TTSManager:
             音频文件路径列表
         """
         try:
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = _load_json(metadata_path)
 
             audio_files = metadata.get("audio_files", [])
             return [item["file_path"] for item in audio_files]
@@ -117,51 +193,96 @@ class TTSManager:
         Returns:
             是否成功
         """
-        try:
-            from moviepy import AudioFileClip, concatenate_audioclips
-
-            print(f"\n🔀 合并 {len(audio_files)} 个音频文件...")
-
-            # 加载所有音频
-            clips = []
-            for audio_file in audio_files:
-                if not os.path.exists(audio_file):
-                    print(f"⚠️  文件不存在: {audio_file}")
-                    continue
+        print(f"\n🔀 合并 {len(audio_files)} 个音频文件...")
 
-                clip = AudioFileClip(audio_file)
-                clips.append(clip)
+        sources = []
+        for audio_file in audio_files:
+            if not os.path.exists(audio_file):
+                print(f"⚠️  文件不存在: {audio_file}")
+                continue
+            sources.append(os.path.abspath(audio_file))
 
-            if not clips:
-                print("❌ 没有有效的音频文件")
-                return False
+        if not sources:
+            print("❌ 没有有效的音频文件")
+            return False
 
-            # 合并音频
-            if crossfade > 0:
-                # 带交叉淡入淡出
-                final_audio = concatenate_audioclips(clips, method="compose")
+        list_path = None
+        try:
+            ffmpeg = _ffmpeg_binary()
+
+            if crossfade > 0 and len(sources) > 1:
+                # 带交叉淡入淡出: 逐段acrossfade后统一编码
+                cmd = [ffmpeg, '-y', '-loglevel', 'error']
+                for source in sources:
+                    cmd += ['-i', source]
+                filters = []
+                prev = '[0:a]'
+                for i in range(1, len(sources)):
+                    label = f'[a{i}]'
+                    filters.append(f'{prev}[{i}:a]acrossfade=d={crossfade}{label}')
+                    prev = label
+                cmd += ['-filter_complex', ';'.join(filters), '-map', prev,
+                        '-c:a', 'libmp3lame', '-ar', '44100', output_path]
+                subprocess.run(cmd, check=True, capture_output=True)
             else:
-                # 直接拼接
-                final_audio = concatenate_audioclips(clips)
-
-            # 保存
-            final_audio.write_audiofile(output_path, fps=44100)
-
-            # 清理
-            for clip in clips:
-                clip.close()
-            final_audio.close()
+                # 直接拼接: concat demuxer按字节流复制,不解码也不重新编码
+                with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False,
+                                                 encoding='utf-8') as f:
+                    for source in sources:
+                        escaped = source.replace("'", "'\\''")
+                        f.write(f"file '{escaped}'\n")
+                    list_path = f.name
+
+                cmd = [ffmpeg, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                       '-i', list_path, '-c', 'copy', output_path]
+                result = subprocess.run(cmd, capture_output=True)
+                if result.returncode != 0:
+                    # 各段编码参数不一致时无法直接复制,改为重新编码
+                    cmd[cmd.index('-c'):cmd.index('-c') + 2] = ['-c:a', 'libmp3lame', '-ar', '44100']
+                    subprocess.run(cmd, check=True, capture_output=True)
 
             print(f"✅ 音频合并完成: {output_path}")
-            print(f"⏱️  总时长: {final_audio.duration:.1f}秒")
+
+            merged_duration = self._merged_duration(sources, crossfade)
+            if merged_duration is not None:
+                print(f"   时长: {merged_duration:.1f}秒")
 
             return True
 
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr.decode('utf-8', errors='replace').strip() if e.stderr else ''
+            print(f"❌ 合并音频失败: {stderr or str(e)}")
+            return False
         except Exception as e:
             print(f"❌ 合并音频失败: {str(e)}")
             import traceback
             traceback.print_exc()
             return False
+        finally:
+            if list_path:
+                os.remove(list_path)
+
+    def _merged_duration(self, sources: List[str], crossfade: float = 0.0) -> Optional[float]:
+        """
+        由元数据中各段的时长推算合并后的总时长,无需再探测输出文件
+
+        Returns:
+            总时长(秒),有文件不在元数据中时返回None
+        """
+        durations = {}
+        for metadata in self.list_all_audio():
+            for item in metadata.get("audio_files", []):
+                if "file_path" in item and "duration" in item:
+                    durations[os.path.abspath(item["file_path"])] = item["duration"]
+
+        try:
+            total = sum(durations[source] for source in sources)
+        except KeyError:
+            return None
+
+        if crossfade > 0 and len(sources) > 1:
+            total -= crossfade * (len(sources) - 1)
+        return max(total, 0.0)
 
     def delete_audio(self, metadata_path: str, delete_files: bool = True) -> bool:
         """
@@ -176,8 +297,7 @@ class TTSManager:
         """
         try:
             # 读取元数据
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
+            metadata = _load_json(metadata_path)
 
             # 删除音频文件
             if delete_files:
@@ -210,21 +330,22 @@ class TTSManager:
         audio_list = self.list_all_audio()
 
         total_files = len(audio_list)
-        total_duration = sum(audio.get("total_duration", 0) for audio in audio_list)
-        total_sections = sum(audio.get("generated_sections", 0) for audio in audio_list)
+        total_duration = 0.0
+        total_sections = 0
+        providers = Counter()
 
-        # 统计提供商
-        providers = {}
+        # 一次遍历累计时长、章节数和提供商分布
         for audio in audio_list:
-            provider = audio.get("provider", "unknown")
-            providers[provider] = providers.get(provider, 0) + 1
+            total_duration += audio.get("total_duration", 0)
+            total_sections += audio.get("generated_sections", 0)
+            providers[audio.get("provider", "unknown")] += 1
 
         return {
             "total_projects": total_files,
             "total_sections": total_sections,
             "total_duration": total_duration,
             "avg_duration": total_duration / total_files if total_files > 0 else 0,
-            "providers": providers,
+            "providers": dict(providers),
         }
 
     def print_audio_list(self, audio_list: Optional[List[Dict]] = None):
@@ -241,37 +362,43 @@ class TTSManager:
             print("\n📭 还没有生成任何语音文件")
             return
 
-        print(f"\n📚 已生成的语音文件 (共{len(audio_list)}个):")
-        print("=" * 80)
+        # 整个列表先拼好再一次性输出
+        lines = [f"\n📚 已生成的语音文件 (共{len(audio_list)}个):", "=" * 80]
 
         for i, audio in enumerate(audio_list, 1):
-            print(f"\n{i}. {audio.get('script_title', '未命名')}")
-            print(f"   脚本: {audio.get('script_path', 'N/A')}")
-            print(f"   章节: {audio.get('generated_sections', 0)}/{audio.get('total_sections', 0)}")
-            print(f"   时长: {audio.get('total_duration', 0):.1f}秒")
-            print(f"   提供商: {audio.get('provider', 'unknown')} | 声音: {audio.get('voice', 'default')}")
-            print(f"   创建时间: {audio.get('created_time', 'N/A')}")
-            print(f"   元数据: {audio.get('metadata_file', 'N/A')}")
-
-        print("\n" + "=" * 80)
+            lines += [
+                f"\n{i}. {audio.get('script_title', '未命名')}",
+                f"   脚本: {audio.get('script_path', 'N/A')}",
+                f"   章节: {audio.get('generated_sections', 0)}/{audio.get('total_sections', 0)}",
+                f"   时长: {audio.get('total_duration', 0):.1f}秒",
+                f"   提供商: {audio.get('provider', 'unknown')} | 声音: {audio.get('voice', 'default')}",
+                f"   创建时间: {audio.get('created_time', 'N/A')}",
+                f"   元数据: {audio.get('metadata_file', 'N/A')}",
+            ]
+
+        lines.append("\n" + "=" * 80)
+        print("\n".join(lines))
 
     def print_statistics(self):
         """打印统计信息"""
         stats = self.get_statistics()
 
-        print("\n📊 TTS语音统计:")
-        print("=" * 60)
-        print(f"  项目总数: {stats['total_projects']}")
-        print(f"  章节总数: {stats['total_sections']}")
-        print(f"  总时长: {stats['total_duration']:.1f}秒 ({stats['total_duration']/60:.1f}分钟)")
-        print(f"  平均时长: {stats['avg_duration']:.1f}秒")
+        lines = [
+            "\n📊 TTS语音统计:",
+            "=" * 60,
+            f"  项目总数: {stats['total_projects']}",
+            f"  章节总数: {stats['total_sections']}",
+            f"  总时长: {stats['total_duration']:.1f}秒 ({stats['total_duration']/60:.1f}分钟)",
+            f"  平均时长: {stats['avg_duration']:.1f}秒",
+        ]
 
         if stats['providers']:
-            print(f"\n  提供商分布:")
+            lines.append(f"\n  提供商分布:")
             for provider, count in stats['providers'].items():
-                print(f"    - {provider}: {count}个项目")
+                lines.append(f"    - {provider}: {count}个项目")
 
-        print("=" * 60)
+        lines.append("=" * 60)
+        print("\n".join(lines))
 
     def interactive_menu(self):
         """交互式菜单"""
@@ -10,11 +10,12 @@
     --dry-run: 只显示将要进行的更改，不实际修改
 """
 
-import json
 import os
+import shutil
 import sys
 from datetime import datetime
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
 
 # 添加项目路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
@@ -24,6 +25,43 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '2_material_man
 from manager import MaterialManager
 
 
+# 自动分类标签的触发词
+_CATEGORY_KEYWORDS = {
+    'astronomy': ['space', 'star', 'galaxy', 'planet', 'asteroid', 'comet', 'nebula',
+                 'black', 'hole', 'sun', 'moon', 'cosmos', 'universe', 'stellar'],
+    'biology': ['brain', 'neuron', 'cell', 'DNA', 'gene', 'protein', 'organism',
+               'bacteria', 'virus', 'blood', 'heart', 'organ', 'tissue'],
+    'physics': ['atom', 'quantum', 'particle', 'energy', 'wave', 'field',
+               'relativity', 'gravity', 'force', 'motion'],
+    'chemistry': ['molecule', 'chemical', 'reaction', 'element', 'compound',
+                 'bond', 'acid', 'base'],
+    'environment': ['climate', 'weather', 'earth', 'ocean', 'forest', 'pollution',
+                   'ecosystem', 'carbon', 'greenhouse', 'renewable'],
+    'technology': ['computer', 'robot', 'AI', 'digital', 'network', 'data',
+                  'algorithm', 'software']
+}
+
+# 视觉特征标签的触发词
+_VISUAL_KEYWORDS = {
+    'animation': ['animation', 'animated', 'motion'],
+    'abstract': ['abstract', 'pattern', 'texture'],
+    'macro': ['macro', 'microscopic', 'close-up', 'micro'],
+    'aerial': ['aerial', 'drone', 'bird-eye', 'top-view'],
+    'timelapse': ['timelapse', 'time-lapse', 'fast']
+}
+
+# 预先转换为小写frozenset,按整词做集合求交
+_CATEGORY_SETS = {name: frozenset(w.lower() for w in words)
+                  for name, words in _CATEGORY_KEYWORDS.items()}
+_VISUAL_SETS = {name: frozenset(w.lower() for w in words)
+                for name, words in _VISUAL_KEYWORDS.items()}
+
+# 旧格式素材特有的标签
+_LEGACY_TAGS = frozenset({'pexels', 'HD'})
+# 新格式素材才会有的分类标签
+_NEW_FORMAT_CATEGORY_TAGS = frozenset(_CATEGORY_KEYWORDS) | {'science'}
+
+
 class MaterialTagsRebuilder:
     """素材标签重构器"""
 
@@ -35,70 +73,55 @@ class MaterialTagsRebuilder:
             'skipped': 0,
             'errors': 0
         }
+        # 待写入的标签更新 [(素材ID, 新标签)],处理完所有素材后一次性写入
+        self.pending_updates: List[Tuple[str, List[str]]] = []
 
-    def _generate_smart_tags(self, keyword: str, material_type: str) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _generate_smart_tags(keyword: str, material_type: str) -> Tuple[str, ...]:
         """
         生成智能标签（与recommender.py中的方法相同）
+
+        同一关键词在素材库中往往反复出现,按(关键词, 类型)缓存结果;
+        返回排好序的元组,避免调用方修改缓存内容
         """
-        tags = []
+        tags = set()
 
-        # 1. 拆分为独立单词
-        words = [w.strip().lower() for w in keyword.split() if w.strip()]
-        tags.extend(list(set(words)))
+        # 1. 拆分为独立单词(整串只转一次小写;split()已去除空白和空串)
+        words = keyword.lower().split()
+        tags.update(words)
 
         # 2. 添加双词组合
         if len(words) >= 2:
             for i in range(len(words) - 1):
                 combined = f"{words[i]}_{words[i+1]}"
-                tags.append(combined)
+                tags.add(combined)
 
         # 3. 添加合并词
         if len(words) >= 2:
-            tags.append(''.join(words[:2]))
-
-        # 4. 自动分类标签
-        category_keywords = {
-            'astronomy': ['space', 'star', 'galaxy', 'planet', 'asteroid', 'comet', 'nebula',
-                         'black', 'hole', 'sun', 'moon', 'cosmos', 'universe', 'stellar'],
-            'biology': ['brain', 'neuron', 'cell', 'DNA', 'gene', 'protein', 'organism',
-                       'bacteria', 'virus', 'blood', 'heart', 'organ', 'tissue'],
-            'physics': ['atom', 'quantum', 'particle', 'energy', 'wave', 'field',
-                       'relativity', 'gravity', 'force', 'motion'],
-            'chemistry': ['molecule', 'chemical', 'reaction', 'element', 'compound',
-                         'bond', 'acid', 'base'],
-            'environment': ['climate', 'weather', 'earth', 'ocean', 'forest', 'pollution',
-                           'ecosystem', 'carbon', 'greenhouse', 'renewable'],
-            'technology': ['computer', 'robot', 'AI', 'digital', 'network', 'data',
-                          'algorithm', 'software']
-        }
+            tags.add(''.join(words[:2]))
 
+        # 4. 自动分类标签(按整词匹配,'base'不会命中'baseline')
+        word_set = frozenset(words)
         matched_categories = []
-        for category, keywords_list in category_keywords.items():
-            if any(kw in keyword.lower() for kw in keywords_list):
+        for category, kw_set in _CATEGORY_SETS.items():
+            if not kw_set.isdisjoint(word_set):
                 matched_categories.append(category)
-                tags.append(category)
+                tags.add(category)
 
         if matched_categories:
-            tags.append('science')
+            tags.add('science')
 
         # 5. 添加视觉特征标签
-        visual_keywords = {
-            'animation': ['animation', 'animated', 'motion'],
-            'abstract': ['abstract', 'pattern', 'texture'],
-            'macro': ['macro', 'microscopic', 'close-up', 'micro'],
-            'aerial': ['aerial', 'drone', 'bird-eye', 'top-view'],
-            'timelapse': ['timelapse', 'time-lapse', 'fast']
-        }
-
-        for feature, feature_keywords in visual_keywords.items():
-            if any(kw in keyword.lower() for kw in feature_keywords):
-                tags.append(feature)
+        for feature, kw_set in _VISUAL_SETS.items():
+            if not kw_set.isdisjoint(word_set):
+                tags.add(feature)
 
         # 6. 添加类型标签
-        tags.append(material_type)
+        tags.add(material_type)
 
-        # 7. 去重并返回
-        return list(set(tags))
+        # 7. 集合已去重,排序后返回
+        return tuple(sorted(tags))
 
     def _extract_original_keyword(self, old_tags: List[str]) -> str:
         """
@@ -119,13 +142,15 @@ class MaterialTagsRebuilder:
 
         return "science education"  # 默认
 
-    def rebuild_single_material(self, material: Dict[str, Any], dry_run: bool = False) -> bool:
+    def rebuild_single_material(self, material: Dict[str, Any], dry_run: bool = False,
+                                progress: str = '') -> bool:
         """
         重构单个素材的标签
 
         Args:
             material: 素材数据
             dry_run: 是否为干运行
+            progress: 输出前缀的进度标记(如"[3/120]")
 
         Returns:
             是否成功
@@ -139,27 +164,27 @@ class MaterialTagsRebuilder:
         original_keyword = self._extract_original_keyword(old_tags)
 
         # 生成新标签
-        new_tags = self._generate_smart_tags(original_keyword, material_type)
+        new_tags = list(self._generate_smart_tags(original_keyword, material_type))
 
-        # 显示对比
-        print(f"\n素材: {material_name}")
-        print(f"  类型: {material_type}")
-        print(f"  原始关键词: {original_keyword}")
-        print(f"  旧标签 ({len(old_tags)}): {old_tags[:3]}...")
-        print(f"  新标签 ({len(new_tags)}): {new_tags[:10]}...")
+        # 显示对比(整段拼好后一次输出,减少逐行写终端的开销)
+        lines = [
+            f"\n{progress} 素材: {material_name}" if progress else f"\n素材: {material_name}",
+            f"  类型: {material_type}",
+            f"  原始关键词: {original_keyword}",
+            f"  旧标签 ({len(old_tags)}): {old_tags[:3]}...",
+            f"  新标签 ({len(new_tags)}): {new_tags[:10]}...",
+        ]
 
         if dry_run:
-            print("  [DRY-RUN] 跳过实际更新")
+            lines.append("  [DRY-RUN] 跳过实际更新")
+            print("\n".join(lines))
             return True
 
-        # 实际更新
-        try:
-            self.manager.update_material(material_id, tags=new_tags)
-            print("  ✅ 更新成功")
-            return True
-        except Exception as e:
-            print(f"  ❌ 更新失败: {str(e)}")
-            return False
+        print("\n".join(lines))
+
+        # 加入待写入队列,由rebuild_all统一写入
+        self.pending_updates.append((material_id, new_tags))
+        return True
 
     def rebuild_all(self, dry_run: bool = False):
         """
@@ -188,28 +213,49 @@ class MaterialTagsRebuilder:
         print(f"\n📊 找到 {self.stats['total']} 个素材")
         print(f"   开始重构标签...\n")
 
-        # 逐个处理
+        # 逐个处理(进度标记并入每个素材的输出,不再单独打印)
+        total = len(materials)
         for i, material in enumerate(materials, 1):
-            print(f"\n[{i}/{self.stats['total']}]", end=' ')
+            progress = f"[{i}/{total}]"
 
             # 检查是否已经是新格式
             old_tags = material.get('tags', [])
             if self._is_new_format(old_tags):
-                print(f"素材 {material.get('name', 'N/A')} - 已是新格式，跳过")
+                print(f"\n{progress} 素材 {material.get('name', 'N/A')} - 已是新格式，跳过")
                 self.stats['skipped'] += 1
                 continue
 
             # 重构标签
-            success = self.rebuild_single_material(material, dry_run)
+            success = self.rebuild_single_material(material, dry_run, progress)
 
             if success:
                 self.stats['updated'] += 1
             else:
                 self.stats['errors'] += 1
 
+        # 一次性写入所有标签更新
+        if self.pending_updates:
+            self._flush_updates()
+
         # 显示统计
         self._print_summary(dry_run)
 
+    def _flush_updates(self):
+        """将待写入的标签更新批量写入素材库"""
+        pending = len(self.pending_updates)
+        print(f"\n💾 写入 {pending} 个素材的新标签...")
+
+        try:
+            written = self.manager.bulk_update_tags(self.pending_updates)
+            print(f"   ✅ 已更新 {written} 个素材")
+        except Exception as e:
+            print(f"   ❌ 更新失败: {str(e)}")
+            written = 0
+
+        self.stats['updated'] -= pending - written
+        self.stats['errors'] += pending - written
+        self.pending_updates = []
+
     def _is_new_format(self, tags: List[str]) -> bool:
         """
         判断标签是否已经是新格式
@@ -219,20 +265,16 @@ class MaterialTagsRebuilder:
         - 有多个独立单词标签
         - 有分类标签（astronomy等）
         """
-        if 'pexels' in tags or 'HD' in tags:
+        tag_set = set(tags)
+        if not _LEGACY_TAGS.isdisjoint(tag_set):
             return False
 
         # 有下划线组合词
-        if any('_' in tag for tag in tags):
+        if any('_' in tag for tag in tag_set):
             return True
 
         # 有分类标签
-        category_tags = ['astronomy', 'biology', 'physics', 'chemistry',
-                         'environment', 'technology', 'science']
-        if any(cat in tags for cat in category_tags):
-            return True
-
-        return False
+        return not _NEW_FORMAT_CATEGORY_TAGS.isdisjoint(tag_set)
 
     def _backup_materials(self) -> str:
         """
@@ -245,11 +287,11 @@ class MaterialTagsRebuilder:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         backup_path = f'data/materials.json.backup_{timestamp}_tag_rebuild'
 
-        with open(materials_path, 'r', encoding='utf-8') as f:
-            data = f.read()
-
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            f.write(data)
+        # 按字节直接复制(可用时走内核零拷贝),不在内存中读出整个文件;
+        # 先复制到临时文件再替换,中途中断不会留下残缺的备份
+        tmp_path = f'{backup_path}.tmp'
+        shutil.copyfile(materials_path, tmp_path)
+        os.replace(tmp_path, backup_path)
 
         return backup_path
 
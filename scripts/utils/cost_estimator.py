@@ -4,38 +4,99 @@ API成本估算和控制工具
 帮助用户了解和控制API使用成本
 """
 
+import os
 import json
+from collections import defaultdict
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Dict, Any, Iterator, Final, Mapping, Iterable, NamedTuple
+
+# 可选：orjson 加速JSON读写
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 成本记录: 每行一条JSON,只追加不重写
+_COSTS_LOG = Path("data/costs.jsonl")
+# 成本汇总: 累计总成本和最后更新时间
+_COSTS_SUMMARY = Path("data/costs_summary.json")
+# 旧版成本文件(所有记录保存在一个JSON中),首次访问时自动迁移
+_LEGACY_COSTS_FILE = Path("data/costs.json")
+
+
+def _load_json(path) -> Any:
+    """读取JSON文件(可用时使用orjson直接解析字节)"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _dump_json(data: Any, path: Path):
+    """写入JSON文件(保留非ASCII字符,可用时使用orjson;先写临时文件再替换,中途中断不会损坏原文件)"""
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    if ORJSON_AVAILABLE:
+        tmp_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _append_json_lines(path, records: Iterable[Dict[str, Any]]):
+    """把记录逐条追加为JSON行"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'ab') as f:
+            for record in records:
+                f.write(orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+        return
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class _TokenPrice(NamedTuple):
+    """文本模型单价（美元/token）"""
+
+    input: float
+    output: float
+
+
+# OpenAI API 价格 (2025年1月)
+_TOKEN_PRICES: Final[Mapping[str, _TokenPrice]] = MappingProxyType({
+    'gpt-4': _TokenPrice(input=0.03 / 1000, output=0.06 / 1000),   # $0.03/$0.06 per 1K tokens
+    'gpt-3.5-turbo': _TokenPrice(input=0.0005 / 1000, output=0.0015 / 1000),
+})
+_DEFAULT_TOKEN_PRICE: Final = _TOKEN_PRICES['gpt-4']
+
+# DALL-E 3 单价（美元/张）
+_IMAGE_PRICES: Final[Mapping[str, float]] = MappingProxyType({
+    'standard-1024': 0.040,
+    'standard-1792': 0.080,
+    'hd-1024': 0.080,
+    'hd-1792': 0.120,
+})
+
+# TTS 单价（美元/字符）
+_TTS_CHAR_PRICES: Final[Mapping[str, float]] = MappingProxyType({
+    'tts-1': 0.000015,  # $0.015 per 1K characters
+    'tts-1-hd': 0.000030,
+})
 
 
 class CostEstimator:
     """API成本估算器"""
 
-    # OpenAI API 价格 (2025年1月)
-    PRICES = {
-        'gpt-4': {
-            'input': 0.03 / 1000,   # $0.03 per 1K tokens
-            'output': 0.06 / 1000,  # $0.06 per 1K tokens
-        },
-        'gpt-3.5-turbo': {
-            'input': 0.0005 / 1000,
-            'output': 0.0015 / 1000,
-        },
-        'dall-e-3': {
-            'standard-1024': 0.040,  # $0.040 per image
-            'standard-1792': 0.080,  # $0.080 per image
-            'hd-1024': 0.080,
-            'hd-1792': 0.120,
-        },
-        'tts-1': {
-            'per_char': 0.000015,  # $0.015 per 1M characters
-        },
-        'tts-1-hd': {
-            'per_char': 0.000030,
-        }
-    }
+    # 原有的嵌套价格表，保留为上面各模块常量的只读视图
+    PRICES: Final[Mapping[str, Mapping[str, float]]] = MappingProxyType({
+        **{model: MappingProxyType(price._asdict()) for model, price in _TOKEN_PRICES.items()},
+        'dall-e-3': _IMAGE_PRICES,
+        **{model: MappingProxyType({'per_char': price}) for model, price in _TTS_CHAR_PRICES.items()},
+    })
 
     @classmethod
     def estimate_topic_generation(cls, count: int = 10, model: str = 'gpt-4') -> float:
@@ -53,8 +114,8 @@ class CostEstimator:
         input_tokens = count * 500
         output_tokens = count * 300
 
-        prices = cls.PRICES.get(model, cls.PRICES['gpt-4'])
-        cost = input_tokens * prices['input'] + output_tokens * prices['output']
+        price = _TOKEN_PRICES.get(model, _DEFAULT_TOKEN_PRICE)
+        cost = input_tokens * price.input + output_tokens * price.output
 
         return round(cost, 4)
 
@@ -74,8 +135,8 @@ class CostEstimator:
         input_tokens = 1000
         output_tokens = sections * 200
 
-        prices = cls.PRICES.get(model, cls.PRICES['gpt-4'])
-        cost = input_tokens * prices['input'] + output_tokens * prices['output']
+        price = _TOKEN_PRICES.get(model, _DEFAULT_TOKEN_PRICE)
+        cost = input_tokens * price.input + output_tokens * price.output
 
         return round(cost, 4)
 
@@ -99,7 +160,7 @@ class CostEstimator:
         if '1792' in size:
             price_key = f"{quality}-1792"
 
-        price = cls.PRICES['dall-e-3'].get(price_key, 0.040)
+        price = _IMAGE_PRICES.get(price_key, 0.040)
         cost = count * price
 
         return round(cost, 4)
@@ -116,7 +177,7 @@ class CostEstimator:
         Returns:
             预估成本（美元）
         """
-        price = cls.PRICES[model]['per_char']
+        price = _TTS_CHAR_PRICES[model]
         cost = text_length * price
 
         return round(cost, 4)
@@ -221,40 +282,33 @@ class CostEstimator:
         """
         记录实际API使用成本
 
+        每条记录追加一行到 data/costs.jsonl,累计总成本单独保存在
+        data/costs_summary.json,单次记录的开销与历史记录数量无关
+
         Args:
             operation: 操作类型 (topic, script, image, tts, etc.)
             cost: 实际成本
             details: 详细信息
         """
-        costs_file = Path("data/costs.json")
+        CostEstimator._migrate_legacy_costs()
 
-        # 加载现有数据
-        if costs_file.exists():
-            with open(costs_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        else:
-            data = {
-                "total_cost": 0.0,
-                "sessions": [],
-                "last_updated": None
-            }
-
-        # 添加新记录
+        now = datetime.now().isoformat()
         session = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now,
             "operation": operation,
             "cost": cost,
             "details": details or {}
         }
 
-        data["sessions"].append(session)
-        data["total_cost"] = round(data["total_cost"] + cost, 4)
-        data["last_updated"] = datetime.now().isoformat()
+        # 追加记录
+        _COSTS_LOG.parent.mkdir(parents=True, exist_ok=True)
+        _append_json_lines(_COSTS_LOG, [session])
 
-        # 保存
-        costs_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(costs_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # 更新汇总
+        summary = CostEstimator._load_summary()
+        summary["total_cost"] = round(summary["total_cost"] + cost, 4)
+        summary["last_updated"] = now
+        _dump_json(summary, _COSTS_SUMMARY)
 
     @staticmethod
     def get_total_cost() -> float:
@@ -264,53 +318,107 @@ class CostEstimator:
         Returns:
             总成本（美元）
         """
-        costs_file = Path("data/costs.json")
-
-        if costs_file.exists():
-            with open(costs_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get("total_cost", 0.0)
-
-        return 0.0
+        CostEstimator._migrate_legacy_costs()
+        return CostEstimator._load_summary()["total_cost"]
 
     @staticmethod
     def print_cost_summary():
         """打印成本汇总"""
-        costs_file = Path("data/costs.json")
+        CostEstimator._migrate_legacy_costs()
 
-        if not costs_file.exists():
+        if not _COSTS_SUMMARY.exists():
             print("\n💰 成本统计: 暂无数据")
             return
 
-        with open(costs_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        summary = CostEstimator._load_summary()
+
+        # 按操作类型分组(逐行读取记录): {操作: [次数, 成本]}
+        record_count = 0
+        by_operation = defaultdict(lambda: [0, 0.0])
+        for session in CostEstimator._iter_sessions():
+            record_count += 1
+            entry = by_operation[session['operation']]
+            entry[0] += 1
+            entry[1] += session['cost']
 
         print("\n" + "=" * 60)
         print("💰 API成本统计")
         print("=" * 60)
-        print(f"\n累计总成本: ${data['total_cost']:.4f} USD")
-        print(f"记录数: {len(data['sessions'])}")
-
-        if data['last_updated']:
-            print(f"最后更新: {data['last_updated']}")
-
-        # 按操作类型分组
-        by_operation = {}
-        for session in data['sessions']:
-            op = session['operation']
-            cost = session['cost']
-            if op not in by_operation:
-                by_operation[op] = {'count': 0, 'cost': 0.0}
-            by_operation[op]['count'] += 1
-            by_operation[op]['cost'] += cost
+        print(f"\n累计总成本: ${summary['total_cost']:.4f} USD")
+        print(f"记录数: {record_count}")
+
+        if summary['last_updated']:
+            print(f"最后更新: {summary['last_updated']}")
 
         if by_operation:
             print(f"\n按操作类型分类:")
-            for op, stats in sorted(by_operation.items(), key=lambda x: x[1]['cost'], reverse=True):
-                print(f"  {op}: {stats['count']}次, ${stats['cost']:.4f}")
+            for op, (count, cost) in sorted(by_operation.items(), key=lambda x: x[1][1], reverse=True):
+                print(f"  {op}: {count}次, ${cost:.4f}")
 
         print("=" * 60)
 
+    @staticmethod
+    def _load_summary() -> Dict[str, Any]:
+        """读取成本汇总,不存在时返回空汇总"""
+        if _COSTS_SUMMARY.exists():
+            return _load_json(_COSTS_SUMMARY)
+
+        return {"total_cost": 0.0, "last_updated": None}
+
+    @staticmethod
+    def _iter_sessions() -> Iterator[Dict[str, Any]]:
+        """逐行读取成本记录"""
+        if not _COSTS_LOG.exists():
+            return
+
+        loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+        with open(_COSTS_LOG, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield loads(line)
+                except ValueError:
+                    # 写入中途被中断留下的不完整行,跳过
+                    continue
+
+    @staticmethod
+    def _migrate_legacy_costs():
+        """
+        把旧版 data/costs.json(整体读写的sessions数组)迁移为记录+汇总两个文件
+
+        每一步都可重复执行: 已在记录中的旧记录不再追加,汇总按完整记录重新计算,
+        最后才删除旧文件;中途中断后再次迁移不会重复计入
+        """
+        if not _LEGACY_COSTS_FILE.exists():
+            return
+
+        data = _load_json(_LEGACY_COSTS_FILE)
+
+        def session_key(session):
+            return (session.get("timestamp"), session.get("operation"), session.get("cost"))
+
+        migrated = {session_key(session) for session in CostEstimator._iter_sessions()}
+        pending = [session for session in data.get("sessions", [])
+                   if session_key(session) not in migrated]
+
+        _COSTS_LOG.parent.mkdir(parents=True, exist_ok=True)
+        if pending:
+            _append_json_lines(_COSTS_LOG, pending)
+
+        # 按完整记录重新计算汇总(包含此前已有的新格式记录)
+        total_cost = 0.0
+        last_updated = None
+        for session in CostEstimator._iter_sessions():
+            total_cost += session.get("cost", 0.0)
+            timestamp = session.get("timestamp")
+            if timestamp and (last_updated is None or timestamp > last_updated):
+                last_updated = timestamp
+        _dump_json({"total_cost": round(total_cost, 4), "last_updated": last_updated},
+                   _COSTS_SUMMARY)
+
+        _LEGACY_COSTS_FILE.unlink()
+
 
 # 命令行测试
 if __name__ == '__main__':
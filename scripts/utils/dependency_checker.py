@@ -5,13 +5,19 @@
 """
 
 import sys
-import subprocess
+import shutil
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 
 
 class DependencyChecker:
     """依赖检查器"""
 
+    # find_spec查询结果缓存 {导入名: 是否可导入},进程内安装状态不会变化,所有实例共享
+    _spec_cache = {}
+    # FFmpeg检查结果缓存(None表示尚未检查)
+    _ffmpeg_available = None
+
     def __init__(self):
         self.errors = []
         self.warnings = []
@@ -43,8 +49,12 @@ class DependencyChecker:
         """
         import_name = import_name or package_name
 
-        spec = importlib.util.find_spec(import_name)
-        if spec is None:
+        found = self._spec_cache.get(import_name)
+        if found is None:
+            found = importlib.util.find_spec(import_name) is not None
+            self._spec_cache[import_name] = found
+
+        if not found:
             msg = f"缺少依赖: {package_name}"
             if required:
                 self.errors.append(msg)
@@ -54,19 +64,42 @@ class DependencyChecker:
                 return False
         return True
 
+    @staticmethod
+    def _probe_ffmpeg() -> bool:
+        """在PATH中查找ffmpeg(只确认存在,不启动进程)"""
+        return shutil.which('ffmpeg') is not None
+
+    def _prefetch(self, import_names, ffmpeg=True):
+        """
+        并发执行所有包查询和FFmpeg检查并写入缓存
+
+        之后按顺序调用check_package/check_ffmpeg只读缓存,输出顺序不变,
+        总耗时由各项之和变为其中最慢的一项
+
+        Args:
+            import_names: 导入名称列表
+            ffmpeg: 是否同时检查FFmpeg
+        """
+        pending = [name for name in dict.fromkeys(import_names) if name not in self._spec_cache]
+        probe_ffmpeg = ffmpeg and DependencyChecker._ffmpeg_available is None
+        if not pending and not probe_ffmpeg:
+            return
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            ffmpeg_future = executor.submit(self._probe_ffmpeg) if probe_ffmpeg else None
+            specs = executor.map(importlib.util.find_spec, pending)
+            for name, spec in zip(pending, specs):
+                self._spec_cache[name] = spec is not None
+            if ffmpeg_future is not None:
+                DependencyChecker._ffmpeg_available = ffmpeg_future.result()
+
     def check_ffmpeg(self):
         """检查FFmpeg是否安装"""
-        try:
-            result = subprocess.run(
-                ['ffmpeg', '-version'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                return True
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            pass
+        if DependencyChecker._ffmpeg_available is None:
+            DependencyChecker._ffmpeg_available = self._probe_ffmpeg()
+
+        if DependencyChecker._ffmpeg_available:
+            return True
 
         self.errors.append(
             "FFmpeg未安装。请安装:\n"
@@ -81,6 +114,30 @@ class DependencyChecker:
         print("🔍 检查系统环境...")
         print("=" * 60)
 
+        core_packages = [
+            ('openai', 'openai', True),
+            ('requests', 'requests', True),
+            ('numpy', 'numpy', True),
+        ]
+        video_packages = [
+            ('moviepy', 'moviepy', True),
+            ('imageio', 'imageio', True),
+            ('Pillow', 'PIL', True),
+        ]
+        tts_packages = [
+            ('edge-tts', 'edge_tts', False),
+        ]
+        subtitle_packages = [
+            ('pysrt', 'pysrt', False),
+        ]
+
+        # 并发完成所有检查,下面按顺序输出
+        self._prefetch(
+            import_name
+            for packages in (core_packages, video_packages, tts_packages, subtitle_packages)
+            for _, import_name, _ in packages
+        )
+
         # 1. Python版本
         print("\n📌 Python版本:")
         if self.check_python_version():
@@ -88,44 +145,24 @@ class DependencyChecker:
 
         # 2. 核心依赖
         print("\n📌 核心依赖:")
-        core_packages = [
-            ('openai', 'openai', True),
-            ('requests', 'requests', True),
-            ('numpy', 'numpy', True),
-        ]
-
         for pkg_name, import_name, required in core_packages:
             if self.check_package(pkg_name, import_name, required):
                 print(f"  ✅ {pkg_name}")
 
         # 3. 视频处理依赖
         print("\n📌 视频处理:")
-        video_packages = [
-            ('moviepy', 'moviepy', True),
-            ('imageio', 'imageio', True),
-            ('Pillow', 'PIL', True),
-        ]
-
         for pkg_name, import_name, required in video_packages:
             if self.check_package(pkg_name, import_name, required):
                 print(f"  ✅ {pkg_name}")
 
         # 4. TTS依赖
         print("\n📌 TTS语音合成:")
-        tts_packages = [
-            ('edge-tts', 'edge_tts', False),
-        ]
-
         for pkg_name, import_name, required in tts_packages:
             if self.check_package(pkg_name, import_name, required):
                 print(f"  ✅ {pkg_name} (可选)")
 
         # 5. 字幕依赖
         print("\n📌 字幕生成:")
-        subtitle_packages = [
-            ('pysrt', 'pysrt', False),
-        ]
-
         for pkg_name, import_name, required in subtitle_packages:
             if self.check_package(pkg_name, import_name, required):
                 print(f"  ✅ {pkg_name} (可选)")
@@ -179,6 +216,9 @@ def quick_check():
         ('pysrt', 'pysrt', False),
     ]
 
+    # 并发完成所有检查
+    checker._prefetch(import_name for _, import_name, _ in core_packages + optional_packages)
+
     # 检查核心包
     for pkg_name, import_name, required in core_packages:
         if not checker.check_package(pkg_name, import_name, required):
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+合成结果缓存测试脚本
+测试缓存索引的文件指纹校验: 同名输出被其他脚本覆盖、视频被改动后不能再命中旧的缓存键
+
+只调用缓存索引相关方法,不实际合成视频
+"""
+
+import json
+import os
+import sys
+import tempfile
+import types
+import importlib.util
+
+# 加载智能合成器
+composer_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'scripts', '3_video_editor', 'smart_composer.py')
+spec = importlib.util.spec_from_file_location("smart_composer", composer_path)
+smart_composer_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(smart_composer_module)
+SmartVideoComposer = smart_composer_module.SmartVideoComposer
+
+
+def _make_composer(output_dir: str) -> SmartVideoComposer:
+    """只带输出目录的合成器(缓存索引方法只依赖editor.output_dir)"""
+    composer = SmartVideoComposer.__new__(SmartVideoComposer)
+    composer.editor = types.SimpleNamespace(output_dir=output_dir)
+    return composer
+
+
+def _render(path: str, content: bytes):
+    """模拟一次合成写出视频"""
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def _read(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_overwritten_output():
+    """测试同名输出被其他脚本覆盖后不再命中"""
+    print("\n" + "="*80)
+    print("📋 测试1: 同名输出被覆盖")
+    print("="*80)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as output_dir:
+        composer = _make_composer(output_dir)
+        out = os.path.join(output_dir, "out.mp4")
+
+        # 脚本A写出out.mp4并记录缓存
+        _render(out, b"video of script A")
+        composer._store_cached_output("key_a", out)
+        if composer._reuse_cached_output("key_a", out) != out:
+            print("❌ 未改动的缓存视频应命中")
+            ok = False
+
+        # 脚本B写到同一文件名
+        _render(out, b"video of script B, longer")
+        composer._store_cached_output("key_b", out)
+
+        index = composer._load_cache_index()
+        if "key_a" in index:
+            print("❌ 指向被覆盖文件的旧缓存键应被清除")
+            ok = False
+
+        if composer._reuse_cached_output("key_a", out) is not None:
+            print("❌ 重新合成脚本A时错误地命中了脚本B的视频")
+            ok = False
+        if composer._reuse_cached_output("key_b", out) != out:
+            print("❌ 脚本B的缓存应命中")
+            ok = False
+
+    if ok:
+        print("✅ 同名输出覆盖测试通过")
+    return ok
+
+
+def test_modified_output():
+    """测试视频在索引之外被改动后视为未命中"""
+    print("\n" + "="*80)
+    print("📋 测试2: 缓存视频被改动")
+    print("="*80)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as output_dir:
+        composer = _make_composer(output_dir)
+        out = os.path.join(output_dir, "a.mp4")
+
+        _render(out, b"original video")
+        composer._store_cached_output("key_a", out)
+
+        # 关闭缓存复用时直接合成写到同一路径(不更新索引)
+        _render(out, b"another video written without the cache")
+        if composer._reuse_cached_output("key_a", out) is not None:
+            print("❌ 大小或修改时间变化的视频不应命中")
+            ok = False
+
+        # 被删除
+        composer._store_cached_output("key_a", out)
+        os.remove(out)
+        if composer._reuse_cached_output("key_a", out) is not None:
+            print("❌ 已删除的视频不应命中")
+            ok = False
+
+        # 旧版索引(只记录路径)视为未命中
+        _render(out, b"original video")
+        with open(composer._cache_index_path(), 'w', encoding='utf-8') as f:
+            json.dump({"key_a": out}, f)
+        if composer._reuse_cached_output("key_a", out) is not None:
+            print("❌ 旧版索引条目不应命中")
+            ok = False
+
+    if ok:
+        print("✅ 缓存视频改动测试通过")
+    return ok
+
+
+def test_copy_to_new_output():
+    """测试命中后复制到新的输出路径"""
+    print("\n" + "="*80)
+    print("📋 测试3: 命中后复制到新路径")
+    print("="*80)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as output_dir:
+        composer = _make_composer(output_dir)
+        a_path = os.path.join(output_dir, "a.mp4")
+        b_path = os.path.join(output_dir, "b.mp4")
+
+        _render(a_path, b"video of script A")
+        composer._store_cached_output("key_a", a_path)
+        _render(b_path, b"video of script B")
+        composer._store_cached_output("key_b", b_path)
+
+        # 脚本A的结果复制到b.mp4,覆盖了脚本B的视频
+        if composer._reuse_cached_output("key_a", b_path) != b_path:
+            print("❌ 应命中并复制到新路径")
+            ok = False
+        if _read(b_path) != b"video of script A":
+            print("❌ 复制后的内容不正确")
+            ok = False
+        if composer._reuse_cached_output("key_b", b_path) is not None:
+            print("❌ 被覆盖的脚本B视频不应再命中")
+            ok = False
+        if composer._reuse_cached_output("key_a", b_path) != b_path:
+            print("❌ 脚本A的缓存应继续命中")
+            ok = False
+
+    if ok:
+        print("✅ 复制到新路径测试通过")
+    return ok
+
+
+def main():
+    """主测试函数"""
+    print("\n" + "="*80)
+    print("🧪 合成结果缓存测试")
+    print("="*80)
+
+    results = []
+    results.append(("同名输出被覆盖", test_overwritten_output()))
+    results.append(("缓存视频被改动", test_modified_output()))
+    results.append(("命中后复制到新路径", test_copy_to_new_output()))
+
+    # 总结
+    print("\n" + "="*80)
+    print("📊 测试结果总结")
+    print("="*80)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} - {name}")
+
+    print(f"\n总计: {passed}/{total} 通过")
+
+    if passed == total:
+        print("\n🎉 所有测试通过！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {total - passed} 个测试失败")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+API成本记录测试脚本
+测试追加式成本记录、旧版costs.json迁移(含中断后重新迁移)与成本汇总
+
+成本文件使用相对路径data/,每个测试都切换到临时目录中运行,不影响项目数据
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import importlib.util
+
+# 加载CostEstimator
+estimator_path = os.path.join(os.path.dirname(__file__), 'scripts', 'utils', 'cost_estimator.py')
+spec = importlib.util.spec_from_file_location("cost_estimator", estimator_path)
+cost_estimator_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(cost_estimator_module)
+CostEstimator = cost_estimator_module.CostEstimator
+
+_LEGACY_DATA = {
+    "total_cost": 3.5,
+    "sessions": [
+        {"timestamp": "2025-01-01T10:00:00", "operation": "image", "cost": 0.04, "details": {"count": 1}},
+        {"timestamp": "2025-01-02T10:00:00", "operation": "script", "cost": 1.46, "details": {}},
+        {"timestamp": "2025-01-03T10:00:00", "operation": "image", "cost": 2.0, "details": {"提示词": "城市夜景"}}
+    ],
+    "last_updated": "2025-01-03T10:00:00"
+}
+
+
+@contextlib.contextmanager
+def _in_temp_dir():
+    """在临时目录中执行(data/相对路径指向临时目录)"""
+    old_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            os.makedirs("data")
+            yield work_dir
+        finally:
+            os.chdir(old_cwd)
+
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _log_lines():
+    with open("data/costs.jsonl", 'r', encoding='utf-8') as f:
+        return [line for line in f if line.strip()]
+
+
+def test_track_cost():
+    """测试追加记录与汇总"""
+    print("\n" + "="*80)
+    print("📋 测试1: 追加成本记录")
+    print("="*80)
+
+    ok = True
+    with _in_temp_dir():
+        # init_project创建的空汇总
+        _write_json("data/costs_summary.json", {"total_cost": 0.0, "last_updated": None})
+
+        CostEstimator.track_cost("image", 0.04, {"count": 1})
+        CostEstimator.track_cost("tts", 0.015)
+        CostEstimator.track_cost("image", 0.08, {"提示词": "海边日落"})
+
+        if abs(CostEstimator.get_total_cost() - 0.135) > 1e-9:
+            print(f"❌ 累计成本不正确: {CostEstimator.get_total_cost()}")
+            ok = False
+
+        lines = _log_lines()
+        if len(lines) != 3:
+            print(f"❌ 记录行数不正确: {len(lines)}")
+            ok = False
+        elif json.loads(lines[2])["details"] != {"提示词": "海边日落"}:
+            print("❌ 记录内容不正确(非ASCII字符)")
+            ok = False
+
+        summary = _read_json("data/costs_summary.json")
+        if summary["last_updated"] != json.loads(lines[-1])["timestamp"]:
+            print("❌ 汇总的最后更新时间应为最后一条记录的时间")
+            ok = False
+        if os.path.exists("data/costs_summary.json.tmp"):
+            print("❌ 写入汇总后残留临时文件")
+            ok = False
+
+    if ok:
+        print("✅ 追加成本记录测试通过")
+    return ok
+
+
+def test_torn_last_line():
+    """测试跳过写入中断留下的不完整行"""
+    print("\n" + "="*80)
+    print("📋 测试2: 不完整的记录行")
+    print("="*80)
+
+    ok = True
+    with _in_temp_dir():
+        CostEstimator.track_cost("script", 0.5)
+        with open("data/costs.jsonl", 'a', encoding='utf-8') as f:
+            f.write('{"timestamp": "2025-01-05T00:00:00", "operation": "ima')
+
+        sessions = list(CostEstimator._iter_sessions())
+        if len(sessions) != 1 or sessions[0]["operation"] != "script":
+            print(f"❌ 应跳过不完整的最后一行: {sessions}")
+            ok = False
+
+    if ok:
+        print("✅ 不完整记录行测试通过")
+    return ok
+
+
+def test_legacy_migration():
+    """测试旧版costs.json迁移"""
+    print("\n" + "="*80)
+    print("📋 测试3: 旧版成本文件迁移")
+    print("="*80)
+
+    ok = True
+    with _in_temp_dir():
+        _write_json("data/costs.json", _LEGACY_DATA)
+        # init_project创建的空汇总不能覆盖旧文件中的累计成本
+        _write_json("data/costs_summary.json", {"total_cost": 0.0, "last_updated": None})
+
+        if abs(CostEstimator.get_total_cost() - 3.5) > 1e-9:
+            print(f"❌ 迁移后累计成本不正确: {CostEstimator.get_total_cost()}")
+            ok = False
+        if os.path.exists("data/costs.json"):
+            print("❌ 迁移完成后应删除旧文件")
+            ok = False
+        if [json.loads(line) for line in _log_lines()] != _LEGACY_DATA["sessions"]:
+            print("❌ 迁移后的记录与旧文件不一致")
+            ok = False
+        if _read_json("data/costs_summary.json")["last_updated"] != "2025-01-03T10:00:00":
+            print("❌ 迁移后的最后更新时间不正确")
+            ok = False
+
+        # 迁移后继续追加
+        CostEstimator.track_cost("tts", 0.5)
+        if abs(CostEstimator.get_total_cost() - 4.0) > 1e-9 or len(_log_lines()) != 4:
+            print("❌ 迁移后追加记录不正确")
+            ok = False
+
+    if ok:
+        print("✅ 旧版成本文件迁移测试通过")
+    return ok
+
+
+def test_interrupted_migration():
+    """测试迁移中断后重新迁移不重复计入"""
+    print("\n" + "="*80)
+    print("📋 测试4: 中断后重新迁移")
+    print("="*80)
+
+    ok = True
+    with _in_temp_dir():
+        # 模拟上次迁移: 记录已追加,但旧文件未删除、汇总未写入
+        _write_json("data/costs.json", _LEGACY_DATA)
+        with open("data/costs.jsonl", 'w', encoding='utf-8') as f:
+            for session in _LEGACY_DATA["sessions"][:2]:
+                f.write(json.dumps(session, ensure_ascii=False) + "\n")
+
+        if abs(CostEstimator.get_total_cost() - 3.5) > 1e-9:
+            print(f"❌ 重新迁移后累计成本不正确: {CostEstimator.get_total_cost()}")
+            ok = False
+        if len(_log_lines()) != 3:
+            print(f"❌ 重新迁移后记录重复: {len(_log_lines())} 行")
+            ok = False
+
+        # 旧文件在删除前又被恢复(再次中断),重复迁移仍不重复计入
+        _write_json("data/costs.json", _LEGACY_DATA)
+        CostEstimator.track_cost("image", 0.04)
+        if abs(CostEstimator.get_total_cost() - 3.54) > 1e-9 or len(_log_lines()) != 4:
+            print(f"❌ 再次迁移后统计不正确: {CostEstimator.get_total_cost()}, {len(_log_lines())} 行")
+            ok = False
+
+    if ok:
+        print("✅ 中断后重新迁移测试通过")
+    return ok
+
+
+def test_cost_summary():
+    """测试按操作类型汇总"""
+    print("\n" + "="*80)
+    print("📋 测试5: 成本汇总输出")
+    print("="*80)
+
+    ok = True
+    with _in_temp_dir():
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            CostEstimator.print_cost_summary()
+        if "暂无数据" not in output.getvalue():
+            print("❌ 没有记录时应提示暂无数据")
+            ok = False
+
+        _write_json("data/costs.json", _LEGACY_DATA)
+        CostEstimator.track_cost("tts", 0.25)
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            CostEstimator.print_cost_summary()
+        text = output.getvalue()
+        for expected in ("累计总成本: $3.7500 USD", "记录数: 4",
+                         "image: 2次, $2.0400", "script: 1次, $1.4600", "tts: 1次, $0.2500"):
+            if expected not in text:
+                print(f"❌ 汇总输出缺少: {expected}")
+                ok = False
+        if text.index("image:") > text.index("script:") or text.index("script:") > text.index("tts:"):
+            print("❌ 操作类型应按成本从高到低排列")
+            ok = False
+
+    if ok:
+        print("✅ 成本汇总测试通过")
+    return ok
+
+
+def main():
+    """主测试函数"""
+    print("\n" + "="*80)
+    print("🧪 API成本记录测试")
+    print("="*80)
+
+    tests = [
+        ("追加成本记录", test_track_cost),
+        ("不完整的记录行", test_torn_last_line),
+        ("旧版成本文件迁移", test_legacy_migration),
+        ("中断后重新迁移", test_interrupted_migration),
+        ("成本汇总输出", test_cost_summary),
+    ]
+
+    results = []
+    for name, test in tests:
+        results.append((name, test()))
+
+    # 未安装orjson时使用标准库json,两条路径都要覆盖
+    if cost_estimator_module.ORJSON_AVAILABLE:
+        print("\n🔁 使用标准库json重复测试")
+        cost_estimator_module.ORJSON_AVAILABLE = False
+        try:
+            for name, test in tests:
+                results.append((f"{name} (标准库json)", test()))
+        finally:
+            cost_estimator_module.ORJSON_AVAILABLE = True
+
+    # 总结
+    print("\n" + "="*80)
+    print("📊 测试结果总结")
+    print("="*80)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} - {name}")
+
+    print(f"\n总计: {passed}/{total} 通过")
+
+    if passed == total:
+        print("\n🎉 所有测试通过！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {total - passed} 个测试失败")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+多进程章节渲染测试脚本
+按main.py的方式(spec_from_file_location)加载智能合成器,确认章节渲染函数可以pickle,
+多进程渲染 + FFmpeg拼接路径真正执行,而不是回退到进程内合成
+
+需要moviepy和FFmpeg(未设置IMAGEIO_FFMPEG_EXE时使用imageio-ffmpeg自带的二进制)
+"""
+
+import contextlib
+import io
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import importlib.util
+
+# 与main.py相同的加载方式
+composer_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'scripts', '3_video_editor', 'smart_composer.py')
+config_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config')
+
+
+def _load_smart_composer():
+    """按main.py的方式加载smart_composer(不注册到sys.modules)"""
+    spec = importlib.util.spec_from_file_location("smart_composer", composer_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _write_config(work_dir: str) -> str:
+    """基于示例配置写一个小分辨率、不走tmpfs的配置(素材推荐器还需要模板文件)"""
+    os.makedirs(os.path.join(work_dir, 'config'))
+    shutil.copy(os.path.join(config_dir, 'templates.json'), os.path.join(work_dir, 'config'))
+    with open(os.path.join(config_dir, 'settings.example.json'), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    config['video'].update({
+        'resolution': {'width': 160, 'height': 90},
+        'fps': 12,
+        'show_narration_text': False,
+        'gpu_acceleration': False,
+    })
+    config['smart_effects'].update({
+        'parallel_render': True,
+        'render_workers': 2,
+        'use_tmpfs': False,
+        'reuse_cached_output': False,
+    })
+
+    config_path = os.path.join(work_dir, 'config', 'settings.json')
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+    return config_path
+
+
+def test_worker_pickles():
+    """测试章节渲染函数按名字pickle"""
+    print("\n" + "="*80)
+    print("📋 测试1: 章节渲染函数可pickle")
+    print("="*80)
+
+    module = _load_smart_composer()
+    worker = module._render_section_to_tempfile
+
+    try:
+        restored = pickle.loads(pickle.dumps(worker))
+    except Exception as e:
+        print(f"❌ pickle失败: {e}")
+        return False
+
+    if restored is not worker:
+        print(f"❌ 反序列化得到的不是同一个函数: {restored.__module__}")
+        return False
+
+    print(f"✅ {worker.__module__}.{worker.__name__} 可按名字pickle")
+    return True
+
+
+def test_parallel_compose():
+    """测试多进程渲染路径完整执行"""
+    print("\n" + "="*80)
+    print("📋 测试2: 多进程渲染 + FFmpeg拼接")
+    print("="*80)
+
+    if not os.environ.get('IMAGEIO_FFMPEG_EXE'):
+        try:
+            import imageio_ffmpeg
+            os.environ['IMAGEIO_FFMPEG_EXE'] = imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            print("⚠️  找不到FFmpeg,跳过")
+            return True
+
+    from PIL import Image
+
+    module = _load_smart_composer()
+    old_cwd = os.getcwd()
+    ok = True
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            composer = module.SmartVideoComposer(_write_config(work_dir))
+
+            image_path = os.path.join(work_dir, 'material.png')
+            Image.new('RGB', (320, 240), (200, 80, 40)).save(image_path)
+            composer.recommender.recommend_for_script_sections = lambda sections, limit=3: {
+                i: [{'name': 'material', 'file_path': image_path, 'match_score': 100}]
+                for i in range(len(sections))
+            }
+
+            script = {
+                'title': 'parallel render',
+                'sections': [
+                    {'section_name': '开场', 'narration': '令人震惊的发现！', 'duration': 1.0},
+                    {'section_name': '解释', 'narration': '我们来慢慢分析原因。', 'duration': 1.0},
+                    {'section_name': '总结', 'narration': '这就是答案。', 'duration': 1.0},
+                ]
+            }
+
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                output_path = composer.compose_from_script(
+                    script, output_filename='parallel.mp4', use_tts_audio=False
+                )
+            log = output.getvalue()
+
+            if '多进程渲染失败' in log:
+                print("❌ 多进程渲染失败,回退到了进程内合成")
+                print(log[log.index('多进程渲染失败') - 200:][:600])
+                ok = False
+            if 'FFmpeg拼接' not in log:
+                print("❌ 没有执行FFmpeg拼接")
+                ok = False
+            if not (output_path and os.path.exists(output_path) and os.path.getsize(output_path) > 0):
+                print(f"❌ 没有生成输出视频: {output_path}")
+                ok = False
+            else:
+                # worker从共享内存读取的素材画面应出现在成片中（纯色素材，取画面中心像素）
+                from moviepy import VideoFileClip
+                with VideoFileClip(output_path) as video:
+                    pixel = video.get_frame(2.5)[45, 80].astype(int)
+                if max(abs(pixel - (200, 80, 40))) > 12:
+                    print(f"❌ 成片画面与素材不一致: {pixel.tolist()}")
+                    ok = False
+        finally:
+            os.chdir(old_cwd)
+
+    if ok:
+        print("✅ 多进程渲染路径测试通过")
+    return ok
+
+
+def main():
+    """主测试函数"""
+    print("\n" + "="*80)
+    print("🧪 多进程章节渲染测试")
+    print("="*80)
+
+    results = []
+    results.append(("章节渲染函数可pickle", test_worker_pickles()))
+    results.append(("多进程渲染 + FFmpeg拼接", test_parallel_compose()))
+
+    # 总结
+    print("\n" + "="*80)
+    print("📊 测试结果总结")
+    print("="*80)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} - {name}")
+
+    print(f"\n总计: {passed}/{total} 通过")
+
+    if passed == total:
+        print("\n🎉 所有测试通过！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {total - passed} 个测试失败")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
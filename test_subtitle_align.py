@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+字幕时间轴对齐回归测试脚本
+将向量化的对齐实现与原先逐条字幕计算的算法逐一比对
+
+原算法内嵌在本脚本中作为参照,随机生成章节与字幕后比较对齐结果
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import importlib.util
+from copy import deepcopy
+
+# 加载SubtitleAligner
+aligner_path = os.path.join(os.path.dirname(__file__), 'scripts', '4_subtitle_generator', 'aligner.py')
+spec = importlib.util.spec_from_file_location("subtitle_aligner", aligner_path)
+aligner_module = importlib.util.module_from_spec(spec)
+# 先注册到sys.modules,Numba读取编译缓存时才能按模块名找到本模块
+sys.modules[spec.name] = aligner_module
+spec.loader.exec_module(aligner_module)
+SubtitleAligner = aligner_module.SubtitleAligner
+
+# 允许的浮点误差(Numba fastmath可能改变运算顺序)
+_TOLERANCE = 1e-9
+
+
+def _reference_timings(audio_files):
+    """原算法: 章节索引 -> 开始时间与时长(重复索引以后出现的为准)"""
+    timings = {}
+    current_time = 0.0
+    for audio_file in audio_files:
+        duration = audio_file.get("duration", 0)
+        timings[audio_file.get("section_index")] = {"start": current_time, "duration": duration}
+        current_time += duration
+    return timings
+
+
+def _reference_align(subtitles, timings):
+    """原算法: 按章节分组,逐条字幕缩放平移后重新编号"""
+    sections = {}
+    for sub in subtitles:
+        sections.setdefault(sub.get("section_index", 1), []).append(sub)
+
+    aligned = []
+    for section_idx in sorted(sections.keys()):
+        section_subs = sections[section_idx]
+        if section_idx not in timings:
+            aligned.extend(section_subs)
+            continue
+
+        audio_start = timings[section_idx]["start"]
+        audio_duration = timings[section_idx]["duration"]
+        original_start = section_subs[0]["start_time"]
+        original_duration = section_subs[-1]["end_time"] - original_start
+        scale = audio_duration / original_duration if original_duration > 0 else 1.0
+
+        for sub in section_subs:
+            aligned_sub = sub.copy()
+            aligned_sub["start_time"] = audio_start + (sub["start_time"] - original_start) * scale
+            aligned_sub["end_time"] = audio_start + (sub["end_time"] - original_start) * scale
+            aligned.append(aligned_sub)
+
+    for i, sub in enumerate(aligned, 1):
+        sub["index"] = i
+    return aligned
+
+
+def _random_case(rng):
+    """随机生成音频元数据与字幕(含缺失章节、重复章节、零时长章节、缺省章节索引)"""
+    section_count = rng.randint(1, 8)
+    audio_files = []
+    for section_index in range(1, section_count + 1):
+        if rng.random() < 0.2:
+            continue  # 该章节没有音频
+        audio_files.append({"section_index": section_index,
+                            "duration": round(rng.uniform(0.5, 30.0), 3)})
+    if audio_files and rng.random() < 0.2:
+        audio_files.append({"section_index": rng.choice(audio_files)["section_index"],
+                            "duration": round(rng.uniform(0.5, 30.0), 3)})
+    rng.shuffle(audio_files)
+
+    subtitles = []
+    clock = 0.0
+    for i in range(rng.randint(1, 40)):
+        section_index = rng.randint(1, section_count + 1)
+        if rng.random() < 0.1:
+            # 零时长字幕,所在章节只有它时缩放比例为1
+            start = end = clock
+        else:
+            start = clock + rng.uniform(0.0, 1.0)
+            end = start + rng.uniform(0.1, 5.0)
+        sub = {"index": i + 1, "start_time": start, "end_time": end, "text": f"字幕{i + 1}"}
+        if rng.random() < 0.9:
+            sub["section_index"] = section_index
+        subtitles.append(sub)
+        clock = end
+    return audio_files, subtitles
+
+
+def _same_result(actual, expected) -> bool:
+    """比较两组对齐结果(时间允许浮点误差,其余字段完全一致)"""
+    if len(actual) != len(expected):
+        return False
+    for a, e in zip(actual, expected):
+        if set(a) != set(e):
+            return False
+        for key in e:
+            if key in ("start_time", "end_time"):
+                if abs(a[key] - e[key]) > _TOLERANCE:
+                    return False
+            elif a[key] != e[key]:
+                return False
+    return True
+
+
+def test_random_cases():
+    """随机比对新旧对齐算法"""
+    print("\n" + "="*80)
+    print("📋 测试1: 随机比对新旧对齐结果")
+    print("="*80)
+
+    rng = random.Random(20241017)
+    aligner = SubtitleAligner()
+    ok = True
+
+    for case in range(500):
+        audio_files, subtitles = _random_case(rng)
+        expected = _reference_align(deepcopy(subtitles), _reference_timings(audio_files))
+        actual = aligner._align_subtitles(deepcopy(subtitles), aligner._build_section_timings(audio_files))
+
+        if not _same_result(actual, expected):
+            print(f"❌ 第{case}组结果不一致")
+            print(f"   音频: {audio_files}")
+            print(f"   期望: {expected}")
+            print(f"   实际: {actual}")
+            ok = False
+            break
+
+    if ok:
+        print("✅ 500组随机用例结果一致")
+    return ok
+
+
+def test_edge_cases():
+    """测试边界情况"""
+    print("\n" + "="*80)
+    print("📋 测试2: 边界情况")
+    print("="*80)
+
+    aligner = SubtitleAligner()
+    ok = True
+    cases = {
+        "所有章节都没有音频": (
+            [{"section_index": 5, "duration": 3.0}],
+            [{"index": 1, "start_time": 0.0, "end_time": 1.0, "text": "a", "section_index": 2}]
+        ),
+        "章节内只有零时长字幕": (
+            [{"section_index": 1, "duration": 4.0}, {"section_index": 2, "duration": 2.0}],
+            [{"index": 1, "start_time": 3.0, "end_time": 3.0, "text": "a", "section_index": 2}]
+        ),
+        "章节乱序且交错": (
+            [{"section_index": 2, "duration": 1.0}, {"section_index": 1, "duration": 2.0}],
+            [{"index": 1, "start_time": 0.0, "end_time": 1.0, "text": "a", "section_index": 2},
+             {"index": 2, "start_time": 1.0, "end_time": 2.0, "text": "b", "section_index": 1},
+             {"index": 3, "start_time": 2.0, "end_time": 4.0, "text": "c", "section_index": 2}]
+        ),
+        "音频缺少时长字段": (
+            [{"section_index": 1}, {"section_index": 2, "duration": 2.0}],
+            [{"index": 1, "start_time": 0.0, "end_time": 1.0, "text": "a", "section_index": 1},
+             {"index": 2, "start_time": 1.0, "end_time": 2.0, "text": "b", "section_index": 2}]
+        ),
+    }
+
+    for name, (audio_files, subtitles) in cases.items():
+        expected = _reference_align(deepcopy(subtitles), _reference_timings(audio_files))
+        actual = aligner._align_subtitles(deepcopy(subtitles), aligner._build_section_timings(audio_files))
+        if _same_result(actual, expected):
+            print(f"   ✓ {name}")
+        else:
+            print(f"❌ {name}: 期望 {expected}, 实际 {actual}")
+            ok = False
+
+    # 对齐后序号从1开始连续
+    audio_files, subtitles = _random_case(random.Random(7))
+    aligned = aligner._align_subtitles(subtitles, aligner._build_section_timings(audio_files))
+    if [sub["index"] for sub in aligned] != list(range(1, len(aligned) + 1)):
+        print("❌ 对齐后序号不连续")
+        ok = False
+
+    if ok:
+        print("✅ 边界情况测试通过")
+    return ok
+
+
+def test_align_srt_file():
+    """测试SRT文件端到端对齐"""
+    print("\n" + "="*80)
+    print("📋 测试3: SRT文件端到端对齐")
+    print("="*80)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as work_dir:
+        srt_path = os.path.join(work_dir, "input.srt")
+        with open(srt_path, 'w', encoding='utf-8') as f:
+            f.write("1\n00:00:00,000 --> 00:00:02,500\n第一条字幕\n\n"
+                    "2\n00:00:02,500 --> 00:00:05,000\n第二条\n字幕换行\n\n"
+                    "3\n00:00:05,000 --> 00:00:10,000\n第三条字幕\n")
+        metadata_path = os.path.join(work_dir, "metadata.json")
+        with open(metadata_path, 'w', encoding='utf-8') as f:
+            json.dump({"audio_files": [{"section_index": 1, "duration": 20.0}]}, f)
+
+        output_path = os.path.join(work_dir, "aligned.srt")
+        result = SubtitleAligner().align_with_audio(srt_path, metadata_path, output_path)
+        if not result["success"] or result["subtitle_count"] != 3:
+            print(f"❌ 对齐失败: {result}")
+            return False
+
+        with open(output_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        expected = ("1\n00:00:00,000 --> 00:00:05,000\n第一条字幕\n\n"
+                    "2\n00:00:05,000 --> 00:00:10,000\n第二条\n字幕换行\n\n"
+                    "3\n00:00:10,000 --> 00:00:20,000\n第三条字幕\n\n")
+        if content != expected:
+            print(f"❌ 输出内容不正确:\n{content}")
+            ok = False
+
+    if ok:
+        print("✅ SRT文件对齐测试通过")
+    return ok
+
+
+def main():
+    """主测试函数"""
+    print("\n" + "="*80)
+    print("🧪 字幕时间轴对齐回归测试")
+    print("="*80)
+
+    results = []
+    results.append(("随机比对新旧算法", test_random_cases()))
+    results.append(("边界情况", test_edge_cases()))
+    results.append(("SRT文件端到端对齐", test_align_srt_file()))
+
+    # 总结
+    print("\n" + "="*80)
+    print("📊 测试结果总结")
+    print("="*80)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} - {name}")
+
+    print(f"\n总计: {passed}/{total} 通过")
+
+    if passed == total:
+        print("\n🎉 所有测试通过！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {total - passed} 个测试失败")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+TTS语音缓存与断点续传测试脚本
+测试语音缓存命中/未命中与硬链接、NDJSON进度恢复、长旁白分句并发合成
+
+不访问网络: 用假的edge_tts模块代替真实服务,合成结果就是文字本身的UTF-8字节
+"""
+
+import json
+import os
+import sys
+import tempfile
+import types
+import importlib.util
+
+# 假的edge_tts: 按7字节一块返回文字内容,并记录每次合成的文字
+_SYNTHESIZED = []
+
+
+class _FakeCommunicate:
+    def __init__(self, text, voice, rate="+0%"):
+        self.text = text
+        _SYNTHESIZED.append(text)
+
+    async def stream(self):
+        data = self.text.encode('utf-8')
+        for i in range(0, len(data), 7):
+            yield {"type": "audio", "data": data[i:i + 7]}
+        yield {"type": "SentenceBoundary", "offset": 0, "duration": 0, "text": self.text}
+
+
+sys.modules['edge_tts'] = types.SimpleNamespace(Communicate=_FakeCommunicate)
+
+# 加载TTSGenerator
+generator_path = os.path.join(os.path.dirname(__file__), 'scripts', '4_tts_generator', 'generator.py')
+spec = importlib.util.spec_from_file_location("tts_generator", generator_path)
+tts_generator_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(tts_generator_module)
+TTSGenerator = tts_generator_module.TTSGenerator
+_split_sentences = tts_generator_module._split_sentences
+
+
+def _make_generator(work_dir: str, **tts_config) -> TTSGenerator:
+    """在临时目录中创建使用Edge TTS的生成器(时长按字数估算,不探测音频)"""
+    config = {
+        "paths": {"audio": os.path.join(work_dir, "audio")},
+        "tts": dict({"provider": "edge", "exact_duration": False}, **tts_config)
+    }
+    config_path = os.path.join(work_dir, "settings.json")
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False)
+    return TTSGenerator(config_path)
+
+
+def _read(path) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_split_sentences():
+    """测试长旁白分句"""
+    print("\n" + "="*80)
+    print("📋 测试1: 长旁白分句")
+    print("="*80)
+
+    text = "第一句话。第二句话！第三句话比较长一些？Fourth sentence. 第五句"
+    ok = True
+
+    for max_chars in (1, 5, 10, 20, 1000):
+        parts = _split_sentences(text, max_chars)
+        # 按顺序拼接后与原文完全一致
+        if ''.join(parts) != text:
+            print(f"❌ max_chars={max_chars}: 拼接结果与原文不一致 {parts}")
+            ok = False
+        # 超长的片段只能是单独一句
+        for part in parts:
+            if len(part) > max_chars and len(_split_sentences(part, 1)) > 1:
+                print(f"❌ max_chars={max_chars}: 片段超长且可再切分: {part!r}")
+                ok = False
+
+    if _split_sentences(text, 1000) != [text]:
+        print("❌ 不超过上限时应整段保留")
+        ok = False
+    if _split_sentences("", 10) != [] or _split_sentences("   ", 10) != []:
+        print("❌ 空白文本应返回空列表")
+        ok = False
+
+    if ok:
+        print("✅ 分句测试通过")
+    return ok
+
+
+def test_speech_cache():
+    """测试语音缓存命中/未命中与硬链接"""
+    print("\n" + "="*80)
+    print("📋 测试2: 语音缓存")
+    print("="*80)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as work_dir:
+        generator = _make_generator(work_dir)
+        _SYNTHESIZED.clear()
+
+        # 未命中: 实际合成并写入缓存
+        first = generator.generate_speech("缓存测试文字。", "a.mp3")
+        key = generator._cache_key("缓存测试文字。", None, 1.0)
+        cache_audio = generator.cache_dir / f"{key}.mp3"
+        if not first["success"] or first.get("cached") or len(_SYNTHESIZED) != 1:
+            print(f"❌ 首次生成应实际合成: {first}")
+            ok = False
+        if not cache_audio.exists() or _read(cache_audio) != "缓存测试文字。".encode('utf-8'):
+            print("❌ 缓存条目未写入或内容不一致")
+            ok = False
+
+        # 命中: 不再合成,输出内容与缓存一致
+        second = generator.generate_speech("缓存测试文字。", "b.mp3")
+        if not second.get("cached") or len(_SYNTHESIZED) != 1:
+            print(f"❌ 相同文字应命中缓存: {second}")
+            ok = False
+        if _read(second["file_path"]) != _read(cache_audio):
+            print("❌ 命中缓存的输出内容与缓存不一致")
+            ok = False
+        if second.get("duration") != first.get("duration"):
+            print("❌ 命中缓存的时长与首次生成不一致")
+            ok = False
+
+        # 硬链接: 缓存与两个输出文件共用同一份数据(文件系统不支持时退回复制)
+        nlink = cache_audio.stat().st_nlink
+        if nlink >= 3:
+            print(f"   - 硬链接数: {nlink}")
+        else:
+            print(f"   - 文件系统不支持硬链接,已退回复制 (链接数 {nlink})")
+
+        # 覆盖a.mp3为新文字: 不能改坏与之共用数据的缓存条目和b.mp3
+        generator.generate_speech("另一段完全不同的文字。", "a.mp3")
+        if _read(cache_audio) != "缓存测试文字。".encode('utf-8'):
+            print("❌ 覆盖输出文件时改坏了缓存条目")
+            ok = False
+        if _read(second["file_path"]) != "缓存测试文字。".encode('utf-8'):
+            print("❌ 覆盖输出文件时改坏了另一个输出文件")
+            ok = False
+
+        # 语速不同视为不同条目
+        generator.generate_speech("缓存测试文字。", "c.mp3", speed=1.5)
+        if len(_SYNTHESIZED) != 3:
+            print("❌ 语速不同时不应命中缓存")
+            ok = False
+
+        # 关闭缓存时每次都实际合成
+        generator.tts_config["cache_enabled"] = False
+        generator.generate_speech("缓存测试文字。", "d.mp3")
+        if len(_SYNTHESIZED) != 4:
+            print("❌ 关闭缓存后仍命中了缓存")
+            ok = False
+
+    if ok:
+        print("✅ 语音缓存测试通过")
+    return ok
+
+
+def test_parallel_split():
+    """测试长旁白分段并发合成后按顺序拼接"""
+    print("\n" + "="*80)
+    print("📋 测试3: 长旁白分段合成")
+    print("="*80)
+
+    ok = True
+    text = "这是第一句。" * 10 + "这是第二部分的句子！" * 10
+    with tempfile.TemporaryDirectory() as work_dir:
+        generator = _make_generator(work_dir, cache_enabled=False, parallel_split_threshold=40)
+        _SYNTHESIZED.clear()
+
+        result = generator.generate_speech(text, "long.mp3")
+        if not result["success"]:
+            print(f"❌ 生成失败: {result}")
+            return False
+
+        print(f"   - 分为 {len(_SYNTHESIZED)} 段合成")
+        if len(_SYNTHESIZED) < 2:
+            print("❌ 超过阈值的旁白应分段合成")
+            ok = False
+        if _SYNTHESIZED != _split_sentences(text, 40):
+            print("❌ 分段与_split_sentences结果不一致")
+            ok = False
+        if _read(result["file_path"]) != text.encode('utf-8'):
+            print("❌ 各段拼接后的音频顺序或内容不正确")
+            ok = False
+
+    if ok:
+        print("✅ 分段合成测试通过")
+    return ok
+
+
+def test_resume_from_progress():
+    """测试从NDJSON进度文件恢复(最后一行不完整)"""
+    print("\n" + "="*80)
+    print("📋 测试4: 断点续传")
+    print("="*80)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as work_dir:
+        generator = _make_generator(work_dir, cache_enabled=False)
+        script = {
+            "title": "续传测试",
+            "sections": [
+                {"section_name": "片段1", "narration": "第一段旁白。"},
+                {"section_name": "片段2", "narration": "第二段旁白。"},
+                {"section_name": "片段3", "narration": ""},
+                {"section_name": "片段4", "narration": "第四段旁白。"}
+            ]
+        }
+        script_path = os.path.join(work_dir, "script.json")
+        with open(script_path, 'w', encoding='utf-8') as f:
+            json.dump(script, f, ensure_ascii=False)
+
+        # 模拟上次中断: 章节1已完成,章节2的记录只写了一半
+        done_path = generator.output_dir / "续传测试_section_01.mp3"
+        done_path.write_bytes("第一段旁白。".encode('utf-8'))
+        done_entry = {
+            "section_index": 1,
+            "section_name": "片段1",
+            "file_path": str(done_path),
+            "duration": 1.5,
+            "text": "第一段旁白。"
+        }
+        progress_path = generator.output_dir / "续传测试_metadata.ndjson"
+        with open(progress_path, 'w', encoding='utf-8') as f:
+            record = {"key": generator._cache_key("第一段旁白。", None, 1.0), "entry": done_entry}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.write('{"key": "abc", "entry": {"section_index": 2, "file_')
+
+        _SYNTHESIZED.clear()
+        result = generator.generate_speech_from_script(script_path)
+
+        if not result["success"]:
+            print(f"❌ 生成失败: {result}")
+            return False
+        if _SYNTHESIZED != ["第二段旁白。", "第四段旁白。"]:
+            print(f"❌ 应只合成未完成的章节2和4,实际: {_SYNTHESIZED}")
+            ok = False
+
+        audio_files = result["audio_files"]
+        if [item["section_index"] for item in audio_files] != [1, 2, 4]:
+            print(f"❌ 章节顺序不正确: {[item['section_index'] for item in audio_files]}")
+            ok = False
+        if audio_files[0] != done_entry:
+            print("❌ 已完成章节应直接复用进度文件中的记录")
+            ok = False
+        if progress_path.exists():
+            print("❌ 元数据写出后进度文件应删除")
+            ok = False
+
+        with open(result["metadata_path"], 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        if metadata["generated_sections"] != 3 or \
+                abs(metadata["total_duration"] - sum(item["duration"] for item in audio_files)) > 1e-9:
+            print("❌ 元数据统计不正确")
+            ok = False
+
+        # 旁白改动过的章节不能沿用旧记录
+        with open(progress_path, 'w', encoding='utf-8') as f:
+            record = {"key": generator._cache_key("旧的旁白。", None, 1.0), "entry": done_entry}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        _SYNTHESIZED.clear()
+        generator.generate_speech_from_script(script_path)
+        if "第一段旁白。" not in _SYNTHESIZED:
+            print("❌ 旁白改动后应重新合成")
+            ok = False
+
+    if ok:
+        print("✅ 断点续传测试通过")
+    return ok
+
+
+def main():
+    """主测试函数"""
+    print("\n" + "="*80)
+    print("🧪 TTS语音缓存与断点续传测试")
+    print("="*80)
+
+    results = []
+    results.append(("长旁白分句", test_split_sentences()))
+    results.append(("语音缓存", test_speech_cache()))
+    results.append(("长旁白分段合成", test_parallel_split()))
+    results.append(("断点续传", test_resume_from_progress()))
+
+    # 总结
+    print("\n" + "="*80)
+    print("📊 测试结果总结")
+    print("="*80)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for name, result in results:
+        status = "✅ 通过" if result else "❌ 失败"
+        print(f"{status} - {name}")
+
+    print(f"\n总计: {passed}/{total} 通过")
+
+    if passed == total:
+        print("\n🎉 所有测试通过！")
+        return 0
+    else:
+        print(f"\n⚠️  有 {total - passed} 个测试失败")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())